@@ -0,0 +1,147 @@
+"""
+Requests per second and p99 of iban routes called at the ASGI level, without
+server and database: the app is called directly and the session is a stand-in.
+Compares the routes with the previous way of rendering: response_model
+validation and jsonable encoding by the default json response.
+
+    python -m benchmarks.asgi_bench [requests] [batch_size]
+"""
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List
+
+from fastapi import Depends, FastAPI
+
+from server.core.database import get_session
+from server.iban.schemas import (IbanPartialValidationResponse,
+                                 IbanValidationResponse, ValidateIbanSchema,
+                                 ValidateIbansSchema)
+from server.iban.services import IbanController
+from server.main import app, middlewares
+
+from .data import percentile, sample_ibans
+
+
+class StandInSession:
+    """Session accepting history writes without database"""
+
+    def add(self, obj):
+        obj.created_at = datetime.utcnow()
+
+    async def commit(self):
+        pass
+
+    async def execute(self, query, values=None):
+        rows = [SimpleNamespace(**{"created_at": datetime.utcnow(), **value}) for value in values or []]
+        return SimpleNamespace(all=lambda: rows)
+
+
+async def stand_in_session():
+    yield StandInSession()
+
+
+def legacy_app() -> FastAPI:
+    """Routes returning models, validated by response_model and rendered by json response"""
+    legacy = FastAPI(middleware=middlewares)
+
+    @legacy.post("/api/v1/iban/validate", response_model=IbanValidationResponse)
+    async def validate_iban(payload: ValidateIbanSchema, session=Depends(get_session)):
+        return await IbanController.validate_iban(payload=payload, session=session)
+
+    @legacy.post("/api/v1/iban/validate_batch", response_model=List[IbanValidationResponse])
+    async def validate_ibans(payload: ValidateIbansSchema, session=Depends(get_session)):
+        results = await IbanController.validate_values(payload.ibans, payload.country)
+        created_at = datetime.utcnow()
+        await IbanController.write_history([
+            {"iban": iban, "status": status, "created_at": created_at}
+            for iban, (status, _) in zip(payload.ibans, results)
+        ], session)
+        return [
+            IbanValidationResponse(**IbanController.response_item(iban, status, suggested_iban, created_at))
+            for iban, (status, suggested_iban) in zip(payload.ibans, results)
+        ]
+
+    @legacy.post("/api/v1/iban/validate_partial", response_model=IbanPartialValidationResponse)
+    async def validate_partial_iban(payload: ValidateIbanSchema):
+        return await IbanController.validate_partial_iban(payload)
+
+    return legacy
+
+
+async def call(asgi_app, path: str, body: bytes) -> bytes:
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+    }
+    chunks = []
+    requests = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = asyncio.Event()
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # streaming responses listen for disconnect until the body is sent
+        await sent.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                sent.set()
+
+    await asgi_app(scope, receive, send)
+    return b"".join(chunks)
+
+
+def without_time(content: bytes):
+    """Parsed response without time of validation"""
+    items = json.loads(content)
+    for item in items if isinstance(items, list) else [items]:
+        item.pop("created_at", None)
+    return items
+
+
+async def measure(name: str, asgi_app, path: str, bodies: List[bytes]):
+    for body in bodies[:50]:
+        await call(asgi_app, path, body)
+    latencies = []
+    for body in bodies:
+        started = time.perf_counter()
+        await call(asgi_app, path, body)
+        latencies.append(time.perf_counter() - started)
+    print(f"{name:<32}{len(bodies) / sum(latencies):9.0f} req/s  p99 {percentile(latencies, 99) * 1000:7.3f} ms")
+
+
+async def run(count: int, batch_size: int):
+    ibans = sample_ibans(max(count, batch_size))
+    single = [json.dumps({"iban": iban}).encode() for iban in ibans[:count]]
+    partial = [json.dumps({"iban": iban[:10]}).encode() for iban in ibans[:count]]
+    batch = [json.dumps({"ibans": ibans[:batch_size]}).encode()] * max(count // batch_size, 20)
+
+    legacy = legacy_app()
+    for asgi_app in (app, legacy):
+        asgi_app.dependency_overrides[get_session] = stand_in_session
+
+    for route, path, bodies in (
+        ("validate", "/api/v1/iban/validate", single),
+        ("validate_partial", "/api/v1/iban/validate_partial", partial),
+        (f"validate_batch[{batch_size}]", "/api/v1/iban/validate_batch", batch),
+    ):
+        assert without_time(await call(app, path, bodies[0])) == without_time(await call(legacy, path, bodies[0]))
+        await measure(f"legacy {route}", legacy, path, bodies)
+        await measure(f"orjson {route}", app, path, bodies)
+
+
+def main(count: int = 10000, batch_size: int = 1000):
+    asyncio.run(run(count, batch_size))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
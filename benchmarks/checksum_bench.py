@@ -0,0 +1,75 @@
+"""
+Microbenchmark of iban checksum validation, ns per iban before and after
+the table-driven mod-97 engine.
+
+    python -m benchmarks.checksum_bench
+"""
+import re
+import timeit
+
+from server.iban.validation import IBAN_REGISTRY, is_valid_checksum
+
+MONTENEGRO_IBAN_RE = IBAN_REGISTRY['ME'].pattern
+
+IBANS = [
+    "ME25505000012345678951",
+    "ME25505000012345638951",
+    "GB29NWBK60161331926819",
+    "FR1420041010050500013M02606",
+]
+
+
+def legacy_is_valid_checksum(iban: str) -> bool:
+    """Implementation replaced by server.iban.validation.checksum"""
+    rearranged_iban = iban[4:] + iban[:4]
+    numeric_iban = ''
+    for char in rearranged_iban:
+        if char.isdigit():
+            numeric_iban += char
+        else:
+            numeric_iban += str(ord(char) - ord('A') + 10)
+    return int(numeric_iban) % 97 == 1
+
+
+def legacy_is_valid(iban: str) -> bool:
+    iban = iban.replace(' ', '').upper()
+    if len(iban) != 22:
+        return False
+    if not re.match(r'^ME\d{2}\d{3}\d{15}$', iban):
+        return False
+    return legacy_is_valid_checksum(iban)
+
+
+def is_valid(iban: str) -> bool:
+    iban = iban.replace(' ', '').upper()
+    if len(iban) != 22:
+        return False
+    if not MONTENEGRO_IBAN_RE.fullmatch(iban):
+        return False
+    return is_valid_checksum(iban)
+
+
+def ns_per_iban(func, ibans, number: int) -> float:
+    def run():
+        for iban in ibans:
+            func(iban)
+
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    return best / (number * len(ibans)) * 1e9
+
+
+def main(number: int = 20000):
+    cases = [
+        ("checksum", legacy_is_valid_checksum, is_valid_checksum, IBANS),
+        ("montenegro is_valid", legacy_is_valid, is_valid, IBANS[:2]),
+    ]
+    for name, before, after, ibans in cases:
+        assert [before(iban) for iban in ibans] == [after(iban) for iban in ibans]
+        before_ns = ns_per_iban(before, ibans, number)
+        after_ns = ns_per_iban(after, ibans, number)
+        print(f"{name:<20} before {before_ns:8.0f} ns/iban  after {after_ns:8.0f} ns/iban  "
+              f"x{before_ns / after_ns:.2f}")
+
+
+if __name__ == '__main__':
+    main()
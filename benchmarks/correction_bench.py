@@ -0,0 +1,66 @@
+"""
+Microbenchmark of iban correction, us per invalid iban of the correction
+engine against brute force validation of every single edit.
+
+    python -m benchmarks.correction_bench
+"""
+import random
+import timeit
+from typing import List
+
+from server.iban.validation import (CHARACTER_SETS, IBAN_REGISTRY,
+                                    CountrySpec, suggest_corrections)
+
+from .data import VALID_IBANS
+
+
+def brute_force_corrections(iban: str, spec: CountrySpec) -> List[str]:
+    """Every substitution and adjacent transposition validated from scratch"""
+    candidates = set()
+    for position in range(2, len(iban)):
+        for char in CHARACTER_SETS[spec.structure[position]]:
+            candidates.add(iban[:position] + char + iban[position + 1:])
+    for position in range(2, len(iban) - 1):
+        candidates.add(iban[:position] + iban[position + 1] + iban[position] + iban[position + 2:])
+    candidates.discard(iban)
+    return [candidate for candidate in candidates if spec.is_valid(candidate)]
+
+
+def mistyped_ibans(count: int, seed: int = 97) -> List[str]:
+    rnd = random.Random(seed)
+    ibans = []
+    while len(ibans) < count:
+        iban = rnd.choice(VALID_IBANS)
+        position = rnd.randrange(4, len(iban))
+        if not iban[position].isdigit():
+            continue
+        mistyped = iban[:position] + rnd.choice("0123456789") + iban[position + 1:]
+        if not IBAN_REGISTRY[iban[:2]].is_valid(mistyped):
+            ibans.append(mistyped)
+    return ibans
+
+
+def us_per_iban(func, ibans, number: int) -> float:
+    def run():
+        for iban in ibans:
+            func(iban, IBAN_REGISTRY[iban[:2]])
+
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    return best / (number * len(ibans)) * 1e6
+
+
+def main(number: int = 20):
+    ibans = mistyped_ibans(100)
+    for iban in ibans:
+        spec = IBAN_REGISTRY[iban[:2]]
+        found = {correction.iban for correction in suggest_corrections(iban, spec, limit=1000)}
+        assert set(brute_force_corrections(iban, spec)) <= found
+
+    before_us = us_per_iban(brute_force_corrections, ibans, number)
+    after_us = us_per_iban(suggest_corrections, ibans, number)
+    print(f"corrections  brute force {before_us:8.1f} us/iban  engine {after_us:8.1f} us/iban  "
+          f"x{before_us / after_us:.1f}")
+
+
+if __name__ == '__main__':
+    main()
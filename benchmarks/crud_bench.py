@@ -0,0 +1,124 @@
+"""
+Round-trips and wall time of CRUD mixins against a postgres stand-in:
+every statement is compiled for postgres and waits for the network latency,
+so the difference comes from the number of round-trips only.
+
+    python -m benchmarks.crud_bench [rows] [latency_ms]
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql
+
+from server.core.crud.mixins import CreateUpdateMixin, DeleteMixin
+from server.core.enums import ValidationStatus
+from server.core.models import IbanModel
+from server.iban.schemas import UpdateIbanCheck
+
+
+class Result:
+    def __init__(self, objs: List[IbanModel]):
+        self.objs = objs
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.objs
+
+    def first(self):
+        return self.objs[0] if self.objs else None
+
+    def one(self):
+        return self.objs[0]
+
+
+class RoundTripSession:
+    """Async session stand-in answering every statement with the same rows after the latency"""
+
+    def __init__(self, objs: List[IbanModel], latency: float):
+        self.objs = objs
+        self.latency = latency
+        self.round_trips = 0
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        await asyncio.sleep(self.latency)
+
+    async def execute(self, query, *args, **kwargs):
+        query.compile(dialect=postgresql.dialect())
+        await self._round_trip()
+        return Result(self.objs)
+
+    async def refresh(self, obj):
+        await self._round_trip()
+
+    async def commit(self):
+        await self._round_trip()
+
+
+class IbanCrud(CreateUpdateMixin, DeleteMixin):
+    table = IbanModel
+    update_scheme = UpdateIbanCheck
+
+
+async def legacy_bulk_retrieve(pks, session):
+    """SELECT and a refresh per object"""
+    res = await session.execute(select(IbanModel).where(IbanModel.id.in_(pks)))
+    objs = res.scalars().all()
+    [await session.refresh(obj) for obj in objs]
+    return objs
+
+
+async def legacy_bulk_update(pks, input_data, session):
+    """bulk_retrieve, then UPDATE, returned objects are stale"""
+    objs = await legacy_bulk_retrieve(pks, session)
+    await session.execute(update(IbanModel).where(IbanModel.id.in_(pks)).values(**input_data.dict()))
+    await session.commit()
+    return objs
+
+
+async def legacy_update(pk, input_data, session):
+    """SELECT with refresh, then UPDATE"""
+    res = await session.execute(select(IbanModel).where(IbanModel.id == pk))
+    obj = res.scalars().first()
+    await session.refresh(obj)
+    await session.execute(update(IbanModel).where(IbanModel.id == pk).values(**input_data.dict()))
+    await session.commit()
+    return obj
+
+
+async def measure(name: str, call, objs, latency: float):
+    session = RoundTripSession(objs, latency)
+    started = time.perf_counter()
+    await call(session)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<26}{session.round_trips:8d} round-trips{elapsed * 1000:10.1f} ms")
+
+
+async def run(rows: int, latency: float):
+    now = datetime.utcnow()
+    objs = [IbanModel(id=pk, iban="GB29NWBK60161331926819", status=ValidationStatus.VALID, created_at=now)
+            for pk in range(rows)]
+    pks = [obj.id for obj in objs]
+    data = UpdateIbanCheck(iban="GB29NWBK60161331926819", status=ValidationStatus.NOT_VALID)
+
+    await measure("legacy bulk_retrieve", lambda session: legacy_bulk_retrieve(pks, session), objs, latency)
+    await measure("bulk_retrieve", lambda session: IbanCrud.bulk_retrieve(pks, session), objs, latency)
+    await measure("legacy bulk_update", lambda session: legacy_bulk_update(pks, data, session), objs, latency)
+    await measure("bulk_update", lambda session: IbanCrud.bulk_update(pks, data, session), objs, latency)
+    await measure("legacy update", lambda session: legacy_update(1, data, session), objs[:1], latency)
+    await measure("update", lambda session: IbanCrud.update(1, data, session), objs[:1], latency)
+    await measure("update_or_create", lambda session: IbanCrud.update_or_create(1, data, session), objs[:1], latency)
+
+
+def main(rows: int = 1000, latency_ms: float = 0.5):
+    asyncio.run(run(rows, latency_ms / 1000))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, *map(float, sys.argv[2:]))
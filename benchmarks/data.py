@@ -0,0 +1,68 @@
+"""Iban samples and statistics shared by benchmarks"""
+import random
+from typing import List, Optional, Sequence
+
+from server.iban.validation import IBAN_REGISTRY, calculate_check_digits
+
+VALID_IBANS = [
+    "ME25505000012345678951",
+    "DE89370400440532013000",
+    "GB29NWBK60161331926819",
+    "FR1420041010050500013M02606",
+    "ES9121000418450200051332",
+    "IT60X0542811101000000123456",
+    "NL91ABNA0417164300",
+    "BE68539007547034",
+    "AT611904300234573201",
+    "PL61109010140000071219812874",
+]
+
+_ALPHABET = "0123456789"
+
+
+def _characters(char_class: str) -> str:
+    return _ALPHABET if char_class == 'n' else "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def random_bban(rnd: random.Random, country_code: str) -> str:
+    return "".join(rnd.choice(_characters(char_class)) for char_class in IBAN_REGISTRY[country_code].structure[4:])
+
+
+def random_iban(rnd: random.Random, country_code: str) -> str:
+    """Iban with correct structure and check digits, national checks are not respected"""
+    bban = random_bban(rnd, country_code)
+    return country_code + calculate_check_digits(country_code, bban) + bban
+
+
+def valid_iban(rnd: random.Random, country_code: str) -> str:
+    """Random iban passing national checks too, a character of the bban is redrawn until it passes them"""
+    spec = IBAN_REGISTRY[country_code]
+    bban = random_bban(rnd, country_code)
+    while spec.national_check is not None and not spec.national_check(bban):
+        position = rnd.randrange(len(bban))
+        bban = bban[:position] + rnd.choice(_characters(spec.structure[4 + position])) + bban[position + 1:]
+    return country_code + calculate_check_digits(country_code, bban) + bban
+
+
+def sample_ibans(count: int, invalid_ratio: float = 0.2, seed: int = 97, distinct: Optional[int] = None) -> List[str]:
+    """
+    Mix of valid ibans and ibans with a single typo of VALID_IBANS countries. Valid ibans are
+    generated, every one distinct unless their number is limited by distinct, so app levels
+    measure validation instead of cache hits
+    """
+    rnd = random.Random(seed)
+    countries = [iban[:2] for iban in VALID_IBANS]
+    generated = [valid_iban(rnd, rnd.choice(countries)) for _ in range(min(count, distinct or count))]
+    ibans = []
+    for index in range(count):
+        iban = generated[index % len(generated)]
+        if rnd.random() < invalid_ratio:
+            position = rnd.randrange(4, len(iban))
+            iban = iban[:position] + rnd.choice(_ALPHABET) + iban[position + 1:]
+        ibans.append(iban)
+    return ibans
+
+
+def percentile(latencies: Sequence[float], percent: float) -> float:
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
@@ -0,0 +1,73 @@
+"""
+Allocations and latency of a single validation with history written by ORM
+session and by prepared statement on the raw asyncpg pool. Needs the database
+of settings with applied migrations:
+
+    python -m benchmarks.history_bench [requests]
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+from typing import Awaitable, Callable, List
+
+from server.core.crud import raw_iban_history
+from server.core.database import async_session, engine
+from server.iban.schemas import ValidateIbanSchema
+from server.iban.services import IbanController
+
+from .data import percentile, sample_ibans
+
+
+async def validate(payload: ValidateIbanSchema):
+    async with async_session() as session:
+        await IbanController.validate_iban(payload=payload, session=session)
+
+
+async def measure(name: str, call: Callable[[ValidateIbanSchema], Awaitable], payloads: List[ValidateIbanSchema]):
+    for payload in payloads[:100]:  # warm up connections, statement caches and validation cache
+        await call(payload)
+
+    latencies = []
+    for payload in payloads:
+        started = time.perf_counter()
+        await call(payload)
+        latencies.append(time.perf_counter() - started)
+
+    # bytes allocated at peak of a single request
+    peaks = []
+    tracemalloc.start()
+    for payload in payloads[:1000]:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        await call(payload)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    print(
+        f"{name:<8}{len(payloads) / sum(latencies):8.0f} req/s"
+        f"  p50 {percentile(latencies, 50) * 1000:6.3f} ms  p99 {percentile(latencies, 99) * 1000:6.3f} ms"
+        f"  peak {sum(peaks) / len(peaks) / 1024:6.1f} KiB/req"
+    )
+
+
+async def run(count: int):
+    payloads = [ValidateIbanSchema(iban=iban) for iban in sample_ibans(count)]
+
+    await measure("orm", validate, payloads)
+
+    raw_iban_history.enabled = True
+    await raw_iban_history.start()
+    try:
+        await measure("asyncpg", validate, payloads)
+    finally:
+        await raw_iban_history.stop()
+        await engine.dispose()
+
+
+def main(count: int = 5000):
+    asyncio.run(run(count))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
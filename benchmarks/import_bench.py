@@ -0,0 +1,68 @@
+"""
+Import time and cold start of validation layers. Every sample is a fresh
+interpreter, so module caches of the parent process do not hide the cost:
+import - time to import the module, cold start - import and the first
+validation of a valid and a mistyped iban. Measured with the bytecode
+cache, without it compilation of sources is measured as well.
+
+    python -m benchmarks.import_bench [runs]
+"""
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+MODULES = (
+    "server.iban.validation",
+    "server.iban.services",
+    "server.main",
+)
+
+# modules the validation core must not import, checked for every run of the core
+HEAVY_MODULES = ("sqlalchemy", "fastapi", "pydantic", "asyncpg", "numpy")
+
+SAMPLE = """
+import sys, time, json
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+from server.iban.validation import validate_iban
+validate_iban("GB29NWBK60161331926819")
+validate_iban("GB28NWBK60161331926819")
+print(json.dumps({{
+    "import": imported - started,
+    "cold_start": time.perf_counter() - started,
+    "heavy": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def sample(module: str) -> Dict:
+    output = subprocess.run(
+        [sys.executable, "-c", SAMPLE.format(module=module, heavy=HEAVY_MODULES)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def measure(module: str, runs: int) -> Dict[str, float]:
+    samples: List[Dict] = [sample(module) for _ in range(runs)]
+    heavy = samples[0]["heavy"]
+    return {
+        "import_ms": statistics.median(item["import"] for item in samples) * 1000,
+        "cold_start_ms": statistics.median(item["cold_start"] for item in samples) * 1000,
+        "heavy": heavy,
+    }
+
+
+def main(runs: int = 10):
+    for module in MODULES:
+        result = measure(module, runs)
+        heavy = ", ".join(result["heavy"]) or "-"
+        print(f"{module:<28}import {result['import_ms']:8.1f} ms  "
+              f"cold start {result['cold_start_ms']:8.1f} ms  heavy: {heavy}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
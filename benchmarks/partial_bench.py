@@ -0,0 +1,46 @@
+"""
+Microbenchmark of partial iban validation on typeahead traffic: every
+prefix of an iban is validated as if it was sent on a keystroke.
+
+    python -m benchmarks.partial_bench
+"""
+import timeit
+
+from server.iban.validation import (CHARACTER_SETS, IBAN_REGISTRY,
+                                    check_partial_iban, normalize_iban)
+
+from .data import VALID_IBANS
+
+PREFIXES = [iban[:length] for iban in VALID_IBANS for length in range(len(iban) + 1)]
+
+
+def legacy_is_valid_partial_iban(partial_iban: str) -> bool:
+    """Per position check of the whole prefix replaced by check_partial_iban"""
+    partial_iban = normalize_iban(partial_iban)
+    if len(partial_iban) < 2:
+        return any(country_code.startswith(partial_iban) for country_code in IBAN_REGISTRY)
+    spec = IBAN_REGISTRY.get(partial_iban[:2])
+    if spec is None or len(partial_iban) > spec.length:
+        return False
+    return all(
+        char in CHARACTER_SETS[char_class]
+        for char, char_class in zip(partial_iban[2:], spec.structure[2:])
+    )
+
+
+def per_second(run, number: int) -> float:
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    return number * len(PREFIXES) / best
+
+
+def main(number: int = 200):
+    cases = [
+        ("legacy whole prefix", lambda: [legacy_is_valid_partial_iban(prefix) for prefix in PREFIXES]),
+        ("stateless fast path", lambda: [check_partial_iban(prefix) for prefix in PREFIXES]),
+    ]
+    for name, run in cases:
+        print(f"{name:<20} {per_second(run, number):12,.0f} validations/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Throughput of bulk validation in the process pool by number of workers.
+
+    python -m benchmarks.pool_bench [count]
+"""
+import asyncio
+import sys
+import time
+
+from server.core.settings import available_cores
+from server.iban.pool import ValidationPool
+from server.iban.validation import validate_ibans
+
+from .data import sample_ibans
+
+
+async def run_pool(pool: ValidationPool, ibans) -> float:
+    await pool.validate(ibans[:pool.threshold])  # start workers
+    started = time.perf_counter()
+    await pool.validate(ibans)
+    return time.perf_counter() - started
+
+
+def main(count: int = 200_000):
+    ibans = sample_ibans(count)
+
+    started = time.perf_counter()
+    validate_ibans(ibans)
+    inline_time = time.perf_counter() - started
+    print(f"inline    {count / inline_time:10.0f} ibans/s")
+
+    workers = 1
+    while workers <= available_cores():
+        pool = ValidationPool(workers=workers, threshold=1000)
+        try:
+            elapsed = asyncio.run(run_pool(pool, ibans))
+        finally:
+            pool.shutdown()
+        print(f"workers {workers:<3}{count / elapsed:10.0f} ibans/s  x{inline_time / elapsed:.2f}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
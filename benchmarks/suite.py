@@ -0,0 +1,253 @@
+"""
+Benchmark suite of three levels, results are written as json to compare commits:
+
+    micro - validation, suggestion and partial check of the validation core
+    asgi  - sequential requests to /iban/validate and /iban/validate_partial of the app
+    load  - concurrent clients sending requests to the app
+
+The app is called at the ASGI level without server. History is written to
+an in-process stand-in session by default, --db postgres uses the database
+of settings (ex. a disposable one started by `make bench-db`).
+
+    python -m benchmarks.suite --output head.json
+    python -m benchmarks.suite --levels asgi,load --db postgres --concurrency 64
+    python -m benchmarks.suite compare base.json head.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from server.core.settings import SettingsValidation
+from server.iban.validation import (IBAN_REGISTRY, check_partial_iban,
+                                    suggest_corrections, validate_iban)
+
+from .data import VALID_IBANS, percentile, sample_ibans
+
+LEVELS = ('micro', 'asgi', 'load')
+DATABASES = ('stand-in', 'postgres')
+MICRO_DISTINCT = 1000
+WARM_UP = 100
+
+
+class Result(NamedTuple):
+    level: str
+    name: str
+    operations: int
+    ops_per_second: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def summarize(level: str, name: str, latencies: Sequence[float], elapsed: Optional[float] = None) -> Result:
+    """Result of operation latencies in seconds, elapsed - wall time of concurrent operations"""
+    elapsed = elapsed if elapsed is not None else sum(latencies)
+    return Result(
+        level=level,
+        name=name,
+        operations=len(latencies),
+        ops_per_second=round(len(latencies) / elapsed, 1),
+        p50_ms=round(percentile(latencies, 50) * 1000, 4),
+        p95_ms=round(percentile(latencies, 95) * 1000, 4),
+        p99_ms=round(percentile(latencies, 99) * 1000, 4),
+    )
+
+
+def print_result(result: Result):
+    print(f"{result.level:<6}{result.name:<28}{result.ops_per_second:12,.0f} ops/s"
+          f"  p50 {result.p50_ms:8.3f}  p95 {result.p95_ms:8.3f}  p99 {result.p99_ms:8.3f} ms", file=sys.stderr)
+
+
+def time_calls(func: Callable[[Any], Any], args: Sequence[Any], warmup: int = 100) -> List[float]:
+    for arg in args[:warmup]:
+        func(arg)
+    latencies = []
+    for arg in args:
+        started = time.perf_counter()
+        func(arg)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run_micro(count: int) -> List[Result]:
+    # validation core has no cache, so a limited number of distinct ibans is measured
+    ibans = sample_ibans(count, invalid_ratio=0.0, distinct=MICRO_DISTINCT)
+    mistyped = [
+        iban for iban in sample_ibans(count * 5, invalid_ratio=1.0, distinct=MICRO_DISTINCT)
+        if not validate_iban(iban)[0]
+    ][:count]
+    prefixes = [iban[:length] for iban in VALID_IBANS for length in range(len(iban) + 1)]
+    prefixes = (prefixes * (count // len(prefixes) + 1))[:count]
+    cases = [
+        ("validate valid", validate_iban, ibans),
+        ("validate mistyped", validate_iban, mistyped),
+        ("suggest corrections", lambda iban: suggest_corrections(iban, IBAN_REGISTRY[iban[:2]]), mistyped),
+        ("partial check", check_partial_iban, prefixes),
+    ]
+    return [summarize('micro', name, time_calls(func, args)) for name, func, args in cases]
+
+
+def route_bodies(count: int, seed: int) -> Dict[str, List[bytes]]:
+    """Bodies of warm-up and measured requests, levels use distinct seeds so they do not hit each other's cache"""
+    ibans = sample_ibans(WARM_UP + count, seed=seed)
+    return {
+        "/api/v1/iban/validate": [json.dumps({"iban": iban}).encode() for iban in ibans],
+        "/api/v1/iban/validate_partial": [json.dumps({"iban": iban[:10]}).encode() for iban in ibans],
+    }
+
+
+async def warm_up(app, path: str, bodies: List[bytes]) -> List[bytes]:
+    """Bodies left to measure, they are not in the validation cache after warm-up"""
+    from .asgi_bench import call
+
+    for body in bodies[:WARM_UP]:
+        await call(app, path, body)
+    return bodies[WARM_UP:]
+
+
+async def run_asgi(app, count: int) -> List[Result]:
+    from .asgi_bench import call
+
+    results = []
+    for path, bodies in route_bodies(count, seed=1).items():
+        bodies = await warm_up(app, path, bodies)
+        latencies = []
+        for body in bodies:
+            started = time.perf_counter()
+            await call(app, path, body)
+            latencies.append(time.perf_counter() - started)
+        results.append(summarize('asgi', path.rsplit('/', 1)[-1], latencies))
+    return results
+
+
+async def run_load(app, count: int, concurrency: int) -> List[Result]:
+    """Every client sends the next request as soon as the previous one is answered"""
+    from .asgi_bench import call
+
+    results = []
+    for path, bodies in route_bodies(count, seed=2).items():
+        bodies = await warm_up(app, path, bodies)
+        latencies: List[float] = []
+        pending = iter(bodies)
+
+        async def client():
+            for body in pending:
+                started = time.perf_counter()
+                await call(app, path, body)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[client() for _ in range(concurrency)])
+        name = f"{path.rsplit('/', 1)[-1]} x{concurrency}"
+        results.append(summarize('load', name, latencies, elapsed=time.perf_counter() - started))
+    return results
+
+
+async def run_app(levels: Sequence[str], db: str, count: int, concurrency: int) -> List[Result]:
+    # the app is imported by app levels only, so micro level runs without database settings
+    from server.core.database import engine, get_session
+    from server.main import app
+
+    from .asgi_bench import stand_in_session
+
+    if db == 'stand-in':
+        app.dependency_overrides[get_session] = stand_in_session
+    results = []
+    try:
+        if 'asgi' in levels:
+            results.extend(await run_asgi(app, count))
+        if 'load' in levels:
+            results.extend(await run_load(app, count, concurrency))
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+        await engine.dispose()
+    return results
+
+
+def commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> int:
+    levels = args.levels.split(',')
+    unknown = set(levels) - set(LEVELS)
+    if unknown:
+        sys.exit(f"Unknown levels: {', '.join(sorted(unknown))}")
+
+    results = run_micro(args.requests * 10) if 'micro' in levels else []
+    if {'asgi', 'load'} & set(levels):
+        results.extend(asyncio.run(run_app(levels, args.db, args.requests, args.concurrency)))
+    for result in results:
+        print_result(result)
+
+    report = {
+        "commit": commit(),
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "db": args.db,
+        # app levels send distinct ibans, the cache only matters for repeated ones
+        "validation_cache_size": SettingsValidation().VALIDATION_CACHE_SIZE,
+        "results": [result._asdict() for result in results],
+    }
+    if args.output == '-':
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Change of throughput and p99 latency of results present in both reports"""
+    with open(args.base) as base_file, open(args.head) as head_file:
+        base, head = json.load(base_file), json.load(head_file)
+    base_results = {(item['level'], item['name']): item for item in base['results']}
+    print(f"{base['commit']} -> {head['commit']}")
+    for item in head['results']:
+        previous = base_results.get((item['level'], item['name']))
+        if previous is None:
+            continue
+        throughput = (item['ops_per_second'] / previous['ops_per_second'] - 1) * 100
+        latency = (item['p99_ms'] / previous['p99_ms'] - 1) * 100 if previous['p99_ms'] else 0.0
+        print(f"{item['level']:<6}{item['name']:<28}ops/s {throughput:+7.1f}%  p99 {latency:+7.1f}%")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description='Iban checker benchmarks')
+    parser.add_argument('--levels', default=','.join(LEVELS), help='comma separated levels: micro, asgi, load')
+    parser.add_argument('--db', choices=DATABASES, default='stand-in', help='history storage of app levels')
+    parser.add_argument('--requests', type=int, default=2000, help='requests of every route, x10 operations of micro')
+    parser.add_argument('--concurrency', type=int, default=32, help='concurrent clients of the load level')
+    parser.add_argument('--output', default='-', help='path to json report, - for stdout')
+    parser.set_defaults(handler=run)
+
+    commands = parser.add_subparsers(dest='command')
+    compare_parser = commands.add_parser('compare', help='compare two json reports')
+    compare_parser.add_argument('base', help='report of the base commit')
+    compare_parser.add_argument('head', help='report of the compared commit')
+    compare_parser.set_defaults(handler=compare)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
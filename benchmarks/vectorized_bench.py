@@ -0,0 +1,36 @@
+"""
+Scalar loop against vectorized check of a column of ibans.
+
+    python -m benchmarks.vectorized_bench [count]
+"""
+import sys
+import time
+
+import numpy as np
+
+from server.iban.validation import check_iban
+from server.iban.validation.vectorized import check_ibans
+
+from .data import sample_ibans
+
+
+def main(count: int = 1_000_000):
+    ibans = sample_ibans(count)
+    column = np.array(ibans, dtype='S34')
+
+    started = time.perf_counter()
+    scalar = [check_iban(iban) for iban in ibans]
+    scalar_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectorized = check_ibans(column)
+    vectorized_time = time.perf_counter() - started
+
+    assert vectorized.tolist() == scalar
+    print(f"{count} ibans: scalar {scalar_time / count * 1e9:.0f} ns/iban, "
+          f"vectorized {vectorized_time / count * 1e9:.0f} ns/iban, "
+          f"x{scalar_time / vectorized_time:.1f}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
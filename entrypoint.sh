@@ -4,5 +4,9 @@ export PYTHONPATH="${PYTHONPATH}:/app"
 
 if [ "${POSTGRES_HOST}" != "localhost" ]; then
   (exec alembic --config server/alembic.ini upgrade head)
+  (exec python -m server.core.maintenance partitions)
 fi
-poetry run python server/main.py
+if [ "${ENV}" = "production" ]; then
+  exec poetry run gunicorn --config server/gunicorn_conf.py server.main:app
+fi
+exec poetry run python -m server.main
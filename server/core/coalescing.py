@@ -0,0 +1,157 @@
+"""
+Coalescing of concurrent work.
+
+SingleFlight shares the result of an in-flight call with concurrent calls
+of the same key. WriteCoalescer folds rows written by concurrent requests
+into a single write: rows arriving while a write is running are written
+together by the next write.
+"""
+import asyncio
+from typing import (Any, Awaitable, Callable, Dict, Generic, Hashable, List,
+                    Optional, Tuple, TypeVar)
+
+from .metrics import registry
+
+T = TypeVar('T')
+
+single_flight_computations = registry.counter(
+    'single_flight_computations_total', 'Calls executed by single flight', labels=('flight',)
+)
+single_flight_coalesced = registry.counter(
+    'single_flight_coalesced_total', 'Calls served by the result of a concurrent identical call', labels=('flight',)
+)
+coalesced_writes = registry.counter(
+    'coalesced_writes_total', 'Writes of coalesced rows', labels=('writer',)
+)
+coalesced_rows = registry.counter(
+    'coalesced_rows_total', 'Rows written by coalesced writes', labels=('writer',)
+)
+
+
+class SingleFlight(Generic[T]):
+    """
+    The first call of a key is executed, concurrent calls of the same key
+    wait for its result instead of repeating the work. When the executing
+    call is cancelled, a waiting call executes it again
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Result of the call and whether it is shared from a concurrent call"""
+        future = self._flights.get(key)
+        while future is not None:
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # the executing call is cancelled, not this one
+                future = self._flights.get(key)
+                continue
+            single_flight_coalesced.inc(self.name)
+            return result, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = future
+        single_flight_computations.inc(self.name)
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # marked as retrieved, so an error nobody waits for is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "computations": single_flight_computations.get(self.name),
+            "coalesced_computations": single_flight_coalesced.get(self.name),
+            "in_flight": self.in_flight,
+        }
+
+
+class WriteCoalescer:
+    """
+    Rows are written at once when no write is running. Rows written meanwhile
+    form the next batch, written by its first writer when the running write
+    finishes, so a write never waits longer than the previous one plus window
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write: Callable[[List[Any], Any], Awaitable],
+        window: float = 0,
+        enabled: bool = True,
+    ):
+        self.name = name
+        self.write_rows = write
+        self.window = window
+        self.enabled = enabled
+        # the next batch, open while it waits for the running write
+        self._rows: Optional[List[Any]] = None
+        self._written: Optional[asyncio.Future] = None
+        self._writing: Optional[asyncio.Future] = None
+
+    async def write(self, rows: List[Any], context: Any = None):
+        """Write rows with others written concurrently, context (ex. session) of the first writer is used"""
+        if self._rows is not None:
+            written = self._written
+            self._rows.extend(rows)
+            try:
+                await asyncio.shield(written)
+                return
+            except asyncio.CancelledError:
+                if not written.cancelled():
+                    raise
+            # the first writer is cancelled, rows are written again
+            return await self.write(rows, context)
+
+        batch, written = list(rows), asyncio.get_running_loop().create_future()
+        running = self._writing
+        try:
+            if running is not None or self.window:
+                self._rows, self._written = batch, written
+                try:
+                    if running is not None:
+                        await asyncio.wait([running])
+                    if self.window:
+                        await asyncio.sleep(self.window)
+                finally:
+                    self._rows = self._written = None
+            self._writing = written
+            await self.write_rows(batch, context)
+        except asyncio.CancelledError:
+            written.cancel()
+            raise
+        except Exception as error:
+            written.set_exception(error)
+            written.exception()
+            raise
+        finally:
+            if self._writing is written:
+                self._writing = None
+        written.set_result(None)
+        coalesced_writes.inc(self.name)
+        coalesced_rows.inc(self.name, amount=len(batch))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "writes": coalesced_writes.get(self.name),
+            "rows": coalesced_rows.get(self.name),
+        }
@@ -1 +1,5 @@
-from .iban import IbanDbService
+from .history import HistoryBuffer, iban_history_buffer
+from .iban import (HISTORY_DB_SERVICES, IbanDbService, IbanDedupDbService,
+                   history_db_service, iban_key)
+from .jobs import ValidationJobDbService
+from .raw import RawIbanHistory, raw_iban_history
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.core.database import async_session, settings
+
+from .iban import history_db_service
+from .mixins import CreateMixin
+
+logger = logging.getLogger(__name__)
+
+# queued by stop, flushes collected rows and finishes background task
+_STOP = object()
+
+
+class HistoryBuffer:
+    """
+    Write-behind sink of history rows. Rows are queued in memory and flushed
+    by a background task in batches when batch size or flush interval is reached.
+    Queue is bounded: when it is full producers wait (backpressure)
+    """
+
+    def __init__(
+        self,
+        db_service: Type[CreateMixin],
+        session_factory: Callable[[], AsyncSession] = async_session,
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        enabled: bool = True,
+    ):
+        self.db_service = db_service
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls, db_service: Type[CreateMixin]) -> 'HistoryBuffer':
+        return cls(
+            db_service=db_service,
+            max_size=settings.HISTORY_BUFFER_SIZE,
+            batch_size=settings.HISTORY_BATCH_SIZE,
+            flush_interval=settings.HISTORY_FLUSH_INTERVAL,
+            enabled=settings.HISTORY_WRITE_MODE == "buffered",
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        """Start background flushing, must be called in the serving event loop"""
+        if not self.enabled or self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush all queued rows and stop background task"""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def put(self, row: Dict[str, Any]):
+        """Queue row, waits while the buffer is full"""
+        await self._queue.put(row)
+
+    async def _collect(self) -> List[Any]:
+        """Wait for rows until batch is full or flush interval passed since the first row"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size and batch[-1] is not _STOP:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def flush(self, batch: List[Dict[str, Any]]):
+        try:
+            async with self.session_factory() as session:
+                await self.db_service.bulk_insert(values=batch, session=session, returning=False)
+        except Exception:
+            logger.exception("Unable to store %s history rows", len(batch))
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            stop = batch[-1] is _STOP
+            rows = batch[:-1] if stop else batch
+            try:
+                if rows:
+                    await self.flush(rows)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+
+iban_history_buffer = HistoryBuffer.from_settings(history_db_service)
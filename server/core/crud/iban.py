@@ -1,10 +1,83 @@
-from server.core.models import IbanModel
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import Row, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.core.database import settings
+from server.core.models import IbanDedupModel, IbanModel
 from server.iban.schemas import CreateIbanCheck, UpdateIbanCheck
+from server.iban.validation import normalize_iban
 
-from .mixins import CreateMixin, UpdateMixin
+from .mixins import CreateMixin, ListMixin, UpdateMixin, UpsertMixin
 
 
 class IbanDbService(CreateMixin, UpdateMixin):
     table = IbanModel
     create_scheme = CreateIbanCheck  # type: ignore
     update_scheme = UpdateIbanCheck
+    keyset_columns = ('created_at', 'id')
+
+
+def iban_key(iban: str) -> bytes:
+    """Fixed width key of normalized iban"""
+    return hashlib.blake2b(iban.encode(), digest_size=16).digest()
+
+
+class IbanDedupDbService(UpsertMixin, ListMixin):
+    """
+    History folded into a row per distinct iban, accepts the same rows as
+    IbanDbService.bulk_insert, so both are interchangeable history storages
+    """
+    table = IbanDedupModel
+    conflict_columns = ('key',)
+    keyset_columns = ('last_seen', 'key')
+
+    @staticmethod
+    def fold(values: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Aggregate history rows by normalized iban, the last status wins"""
+        now = datetime.utcnow()
+        folded: Dict[bytes, Dict[str, Any]] = {}
+        for value in values:
+            iban = normalize_iban(value['iban'])
+            seen_at = value.get('created_at') or now
+            key = iban_key(iban)
+            row = folded.get(key)
+            if row is None:
+                folded[key] = {
+                    'key': key, 'iban': iban, 'status': value['status'],
+                    'first_seen': seen_at, 'last_seen': seen_at, 'hit_count': 1,
+                }
+                continue
+            row['status'] = value['status']
+            row['first_seen'] = min(row['first_seen'], seen_at)
+            row['last_seen'] = max(row['last_seen'], seen_at)
+            row['hit_count'] += 1
+        return list(folded.values())
+
+    @classmethod
+    async def bulk_insert(cls, values: List[Dict[str, Any]],
+                          session: AsyncSession, returning: bool = True) -> List[Row]:
+        """Upsert counters of history rows, a row is returned per distinct iban"""
+        table = cls.table.__table__
+        return await cls.bulk_upsert(
+            values=cls.fold(values),
+            session=session,
+            update=lambda excluded: {
+                'status': excluded.status,
+                'first_seen': func.least(table.c.first_seen, excluded.first_seen),
+                'last_seen': func.greatest(table.c.last_seen, excluded.last_seen),
+                'hit_count': table.c.hit_count + excluded.hit_count,
+            },
+            returning=returning,
+        )
+
+
+HISTORY_DB_SERVICES = {
+    "log": IbanDbService,
+    "dedup": IbanDedupDbService,
+}
+
+# storage of validation history selected by settings
+history_db_service = HISTORY_DB_SERVICES[settings.HISTORY_STORAGE]
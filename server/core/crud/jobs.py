@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy import Row, case, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.core.enums import JobStatus
+from server.core.models import ValidationJobChunkModel, ValidationJobModel
+
+from .mixins import ListMixin
+
+ACTIVE_STATUSES = (JobStatus.PENDING, JobStatus.RUNNING)
+
+
+class ValidationJobDbService(ListMixin):
+    """
+    Postgres backed queue of validation jobs. A job is split into chunks,
+    workers claim chunks with SELECT ... FOR UPDATE SKIP LOCKED, so every
+    chunk is validated once and chunks of a killed worker are unlocked
+    by rollback and claimed again. Nothing but committed chunks is kept
+    """
+    table = ValidationJobModel
+    chunk_table = ValidationJobChunkModel
+
+    @classmethod
+    async def create_job(cls, country: Optional[str], session: AsyncSession) -> int:
+        """Job id, the job is committed together with its chunks"""
+        query = insert(cls.table).values(country=country).returning(cls.table.id)
+        return (await session.execute(query)).scalar_one()
+
+    @classmethod
+    async def add_chunk(cls, job_id: int, number: int, ibans: List[str], session: AsyncSession):
+        await session.execute(insert(cls.chunk_table).values(job_id=job_id, number=number, ibans='\n'.join(ibans)))
+
+    @classmethod
+    async def finish_upload(cls, job_id: int, total: int, total_chunks: int, session: AsyncSession):
+        """Totals of uploaded file, commits the job"""
+        await session.execute(update(cls.table).where(cls.table.id == job_id).values(
+            total=total,
+            total_chunks=total_chunks,
+            status=JobStatus.PENDING if total_chunks else JobStatus.DONE,
+        ))
+        await session.commit()
+
+    @classmethod
+    async def claim_chunk(cls, session: AsyncSession) -> Optional[Row]:
+        """The oldest not validated chunk of active jobs locked until the transaction ends"""
+        chunk = cls.chunk_table
+        query = select(chunk.job_id, chunk.number, chunk.ibans, cls.table.country).join(
+            cls.table, cls.table.id == chunk.job_id
+        ).where(
+            chunk.results.is_(None),
+            cls.table.status.in_(ACTIVE_STATUSES),
+        ).order_by(chunk.job_id, chunk.number).limit(1).with_for_update(of=chunk, skip_locked=True)
+        return (await session.execute(query)).first()
+
+    @classmethod
+    async def complete_chunk(
+        cls,
+        job_id: int,
+        number: int,
+        results: str,
+        count: int,
+        valid: int,
+        session: AsyncSession,
+    ):
+        """Store results of claimed chunk and progress of the job, committed by caller"""
+        chunk, job = cls.chunk_table, cls.table
+        await session.execute(
+            update(chunk).where(chunk.job_id == job_id, chunk.number == number).values(results=results)
+        )
+        await session.execute(update(job).where(job.id == job_id).values(
+            processed=job.processed + count,
+            valid=job.valid + valid,
+            processed_chunks=job.processed_chunks + 1,
+            status=case((job.processed_chunks + 1 >= job.total_chunks, JobStatus.DONE), else_=JobStatus.RUNNING),
+            updated_at=datetime.utcnow(),
+        ))
+
+    @classmethod
+    async def fail_job(cls, job_id: int, error: str, session: AsyncSession):
+        """Failed jobs are not claimed anymore"""
+        await session.execute(update(cls.table).where(cls.table.id == job_id).values(
+            status=JobStatus.FAILED, error=error, updated_at=datetime.utcnow()
+        ))
+        await session.commit()
+
+    @classmethod
+    async def stream_results(cls, job_id: int, session: AsyncSession) -> AsyncIterator[str]:
+        """Results of job chunks in upload order, a chunk is fetched at once"""
+        chunk = cls.chunk_table
+        query = select(chunk.results).where(chunk.job_id == job_id).order_by(chunk.number)
+        result = await session.stream_scalars(query.execution_options(yield_per=1))
+        async for results in result:
+            yield results
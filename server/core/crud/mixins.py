@@ -1,8 +1,11 @@
-from typing import List, TypeVar, Union
+from typing import (Any, AsyncIterator, Callable, Dict, Iterator, List,
+                    Optional, Sequence, Tuple, TypeVar, Union)
 
 from fastapi import HTTPException
 from pydantic import BaseModel
-from sqlalchemy import delete, select, update
+from sqlalchemy import (PrimaryKeyConstraint, Row, UniqueConstraint, delete,
+                        insert, select, tuple_, update)
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import expression
 
@@ -16,6 +19,17 @@ UpdateBaseSchema = TypeVar("UpdateBaseSchema", bound=BaseModel)
 
 class BaseMixin:
     table: TableType = None  # type: ignore
+    # keys of IN lists sent in one statement, postgres protocol allows 32767 parameters
+    in_chunk_size: int = 10000
+    # columns of unique constraint used to detect conflicting rows
+    conflict_columns: Tuple[str, ...] = ()
+
+    @classmethod
+    def _chunks(cls, pks: Sequence[Any]) -> Iterator[Sequence[Any]]:
+        """Distinct keys split into chunks of IN lists"""
+        pks = list(dict.fromkeys(pks))
+        for start in range(0, len(pks), cls.in_chunk_size):
+            yield pks[start:start + cls.in_chunk_size]
 
     @classmethod
     async def _execute_commit(cls, query: expression, session: AsyncSession):
@@ -53,15 +67,64 @@ class CreateMixin(BaseMixin):
 
     @classmethod
     async def bulk_create(cls, input_data: List[create_scheme],
-                          session: AsyncSession):
-        objs = [cls.table(**item.dict()) for item in input_data]
-        session.add_all(objs)
+                          session: AsyncSession) -> List[Row]:
+        """Create models with a single multi-row insert"""
+        return await cls.bulk_insert([item.dict() for item in input_data], session)
+
+    @classmethod
+    async def bulk_insert(cls, values: List[Dict[str, Any]],
+                          session: AsyncSession, returning: bool = True) -> List[Row]:
+        """
+        Insert plain rows without building ORM objects.
+        Rows are returned in the same order as provided values,
+        without returning rows are sent with executemany
+        """
+        if not values:
+            return []
+        table = cls.table.__table__
+        query = insert(table)
+        if returning:
+            query = query.returning(*table.c, sort_by_parameter_order=True)
+        res = await session.execute(query, values)
         await session.commit()
-        return objs
+        return res.all() if returning else []
+
+
+class UpsertMixin(BaseMixin):
+
+    @classmethod
+    async def bulk_upsert(
+            cls,
+            values: List[Dict[str, Any]],
+            session: AsyncSession,
+            update: Optional[Callable[[Any], Dict[str, Any]]] = None,
+            returning: bool = True,
+    ) -> List[Row]:
+        """
+        Insert rows or update conflicting ones with a single INSERT ... ON CONFLICT DO UPDATE.
+        update builds values of conflicting rows from excluded (proposed) row,
+        by default all columns are overwritten. Values must not repeat conflict key
+        """
+        if not values:
+            return []
+        table = cls.table.__table__
+        query = postgresql.insert(table)
+        set_ = update(query.excluded) if update is not None else {
+            column.name: query.excluded[column.name]
+            for column in table.c if column.name not in cls.conflict_columns
+        }
+        query = query.on_conflict_do_update(index_elements=list(cls.conflict_columns), set_=set_)
+        if returning:
+            query = query.returning(*table.c, sort_by_parameter_order=True)
+        res = await session.execute(query, values)
+        await session.commit()
+        return res.all() if returning else []
 
 
 class ListMixin(BaseMixin):
     table: TableType = None  # type: ignore
+    # columns of keyset pagination, newest first, the last column must be unique
+    keyset_columns: Tuple[str, ...] = ()
 
     @classmethod
     async def list(cls, session: AsyncSession) -> table:
@@ -70,28 +133,56 @@ class ListMixin(BaseMixin):
         objects = await session.execute(query)
         return objects.scalars().all()
 
+    @classmethod
+    async def stream_page(
+            cls,
+            session: AsyncSession,
+            filters: Sequence[Any] = (),
+            after: Optional[Sequence[Any]] = None,
+            limit: int = 100,
+            partition_size: int = 500,
+    ) -> AsyncIterator[Row]:
+        """
+        Page of plain rows in descending keyset order after the given keyset values.
+        Rows are fetched from server side cursor by partitions, so the page
+        is never materialized at once
+        """
+        columns = [cls.get_specified_field(name) for name in cls.keyset_columns]
+        query = select(*cls.table.__table__.c).where(*filters)
+        if after is not None:
+            query = query.where(tuple_(*columns) < tuple_(*after))
+        query = query.order_by(*[column.desc() for column in columns]).limit(limit)
+
+        result = await session.stream(query)
+        async for partition in result.partitions(partition_size):
+            for row in partition:
+                yield row
+
     # TODO: retrieve with filters and get with all relations or specified?
     @classmethod
     async def retrieve(cls, pk: int, session: AsyncSession, field: str = None) -> \
             Union[table, HTTPException]:
-        """Get object by primary key"""
-        column = cls.get_specified_field(field) if field else cls.get_pk_attr()
-        query = select(cls.table).where(column == pk)
-        res = await session.execute(query)
-        obj = res.scalars().first()
+        """Get object by primary key, objects already in the session are refreshed by the same query"""
+        obj = await cls.safe_retrieve(pk, session, field)
         cls._check_object(obj)
-        await session.refresh(obj)
         return obj
 
     @classmethod
-    async def bulk_retrieve(cls, pks: List[int], session: AsyncSession) -> \
-            List[table] or HTTPException:
-        """Get object by primary key"""
-        query = select(cls.table).where(cls.get_pk_attr().in_(pks))
+    async def safe_retrieve(cls, pk: int, session: AsyncSession, field: str = None) -> Optional[table]:
+        """Get object by primary key, None if it does not exist"""
+        column = cls.get_specified_field(field) if field else cls.get_pk_attr()
+        query = select(cls.table).where(column == pk).execution_options(populate_existing=True)
         res = await session.execute(query)
-        objs = res.scalars().all()
-        [cls._check_object(obj) for obj in objs]
-        [await session.refresh(obj) for obj in objs]
+        return res.scalars().first()
+
+    @classmethod
+    async def bulk_retrieve(cls, pks: List[int], session: AsyncSession) -> List[table]:
+        """Get objects by primary keys, a query per chunk of keys"""
+        objs = []
+        for chunk in cls._chunks(pks):
+            query = select(cls.table).where(cls.get_pk_attr().in_(chunk)).execution_options(populate_existing=True)
+            res = await session.execute(query)
+            objs.extend(res.scalars().all())
         return objs
 
 
@@ -99,6 +190,13 @@ class UpdateMixin(ListMixin, BaseMixin):
     table: TableType = None  # type: ignore
     update_scheme: UpdateBaseSchema = None  # type: ignore
 
+    @classmethod
+    def _update_query(cls, input_data: update_scheme, partial: bool) -> expression:
+        """UPDATE returning updated objects, objects of the session are overwritten with returned rows"""
+        return update(cls.table).values(**input_data.dict(exclude_unset=partial, exclude_none=True)).returning(
+            cls.table
+        ).execution_options(synchronize_session=False, populate_existing=True)
+
     @classmethod
     async def update(
             cls,
@@ -108,13 +206,13 @@ class UpdateMixin(ListMixin, BaseMixin):
             partial: bool = False,
             field: str = None
     ) -> Union[table, HTTPException]:
-        """Update object by specified primary key"""
+        """Update object by specified primary key, updated object is returned"""
         column = cls.get_specified_field(field) if field else cls.get_pk_attr()
-        retrieved_obj = await cls.retrieve(pk, session, field)
-        query = update(cls.table).where(column == pk).values(
-            **input_data.dict(exclude_unset=partial, exclude_none=True))
-        await cls._execute_commit(query, session)
-        return retrieved_obj
+        res = await session.execute(cls._update_query(input_data, partial).where(column == pk))
+        obj = res.scalars().first()
+        cls._check_object(obj)
+        await session.commit()
+        return obj
 
     @classmethod
     async def bulk_update(
@@ -123,13 +221,14 @@ class UpdateMixin(ListMixin, BaseMixin):
             input_data: update_scheme,
             session: AsyncSession,
             partial: bool = False,
-    ) -> List[table] or HTTPException:
-        """Update object by specified primary key"""
-        retrieved_objs = await cls.bulk_retrieve(pks, session)
-        query = update(cls.table).where(cls.get_pk_attr().in_(pks)).values(
-            **input_data.dict(exclude_unset=partial))
-        await cls._execute_commit(query, session)
-        return retrieved_objs
+    ) -> List[table]:
+        """Update objects by specified primary keys, a statement per chunk of keys in one transaction"""
+        objs = []
+        for chunk in cls._chunks(pks):
+            res = await session.execute(cls._update_query(input_data, partial).where(cls.get_pk_attr().in_(chunk)))
+            objs.extend(res.scalars().all())
+        await session.commit()
+        return objs
 
 
 class DeleteMixin(BaseMixin):
@@ -137,9 +236,10 @@ class DeleteMixin(BaseMixin):
     async def delete(cls, pk: int,
                      session: AsyncSession) -> dict or HTTPException:
         """Delete object by specified primary key"""
-        await cls.retrieve(pk, session)
-        query = delete(cls.table).where(cls.get_pk_attr() == pk)
-        await cls._execute_commit(query, session)
+        query = delete(cls.table).where(cls.get_pk_attr() == pk).returning(cls.get_pk_attr())
+        res = await session.execute(query)
+        cls._check_object(res.first())
+        await session.commit()
         return {"status": StatusEnum.success.value}
 
     @classmethod
@@ -153,6 +253,18 @@ class CreateUpdateMixin(CreateMixin, UpdateMixin):
     table: TableType = None  # type: ignore
     update_scheme: UpdateBaseSchema = None  # type: ignore
 
+    @classmethod
+    def _unique_key(cls, columns: Sequence[str]) -> List[str]:
+        """Columns of ON CONFLICT, they must match primary key, unique constraint or unique index of the table"""
+        table = cls.table.__table__
+        keys = [
+            {column.name for column in constraint.columns} for constraint in table.constraints
+            if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint))
+        ] + [{column.name for column in index.columns} for index in table.indexes if index.unique]
+        if set(columns) not in keys:
+            raise ValueError(f"Table {table.name} has no unique key of columns: {', '.join(columns)}")
+        return list(columns)
+
     @classmethod
     async def update_or_create(
             cls,
@@ -160,11 +272,21 @@ class CreateUpdateMixin(CreateMixin, UpdateMixin):
             input_data: update_scheme,
             session: AsyncSession,
             field: str = None
-    ) -> List[table] or HTTPException:
-        retrieved_obj = cls.safe_retrieve(pk, session, field)
-
-        if not retrieved_obj:
-            return await cls.create(input_data=input_data, session=session)
-
-        return await cls.update(pk=pk, input_data=input_data, session=session,
-                                field=field)
+    ) -> table:
+        """
+        Update object by primary key or unique field, create it if it does not exist.
+        Single INSERT ... ON CONFLICT DO UPDATE, so concurrent calls never create duplicates.
+        Conflicts are detected by conflict_columns or by the field, they must be a unique key of the table
+        """
+        column = cls.get_specified_field(field) if field else cls.get_pk_attr()
+        data = input_data.dict(exclude_none=True)
+        query = postgresql.insert(cls.table).values({**data, column.name: pk})
+        query = query.on_conflict_do_update(
+            index_elements=cls._unique_key(cls.conflict_columns or (column.name,)),
+            # an empty update still locks and returns the existing row
+            set_={name: query.excluded[name] for name in data or [column.name]},
+        ).returning(cls.table).execution_options(populate_existing=True)
+        res = await session.execute(query)
+        obj = res.scalars().one()
+        await session.commit()
+        return obj
@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import asyncpg
+
+from server.core.database import settings
+from server.core.enums import ValidationStatus
+
+INSERT_HISTORY = 'INSERT INTO iban (iban, status, created_at) VALUES ($1, $2, $3)'
+
+
+def asyncpg_dsn(database_uri: str) -> str:
+    """Dsn of sqlalchemy url without the driver"""
+    return database_uri.replace('postgresql+asyncpg://', 'postgresql://', 1)
+
+
+class RawIbanHistory:
+    """
+    History writes of the validation hot path on a raw asyncpg pool: the insert
+    is prepared once per connection by asyncpg statement cache and executed with
+    plain arguments, no schemas, ORM objects or unit of work are built
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        max_size: int = 5,
+        statement_cache_size: int = 100,
+        enabled: bool = True,
+    ):
+        self.dsn = dsn
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.enabled = enabled
+        self._pool: Optional[asyncpg.Pool] = None
+
+    @classmethod
+    def from_settings(cls) -> 'RawIbanHistory':
+        return cls(
+            dsn=asyncpg_dsn(settings.SQLALCHEMY_DATABASE_URI),
+            max_size=settings.POOL_SIZE,
+            statement_cache_size=settings.STATEMENT_CACHE_SIZE,
+            enabled=settings.HISTORY_DRIVER == "asyncpg",
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    async def start(self):
+        """Open the pool, must be called in the serving event loop"""
+        if not self.enabled or self.running:
+            return
+        self._pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=1,
+            max_size=self.max_size,
+            statement_cache_size=self.statement_cache_size,
+        )
+
+    async def stop(self):
+        if not self.running:
+            return
+        pool, self._pool = self._pool, None
+        await pool.close()
+
+    async def insert(self, iban: str, status: ValidationStatus, created_at: datetime):
+        # enum is stored by name
+        await self._pool.execute(INSERT_HISTORY, iban, status.name, created_at)
+
+    async def insert_many(self, rows: List[Dict[str, Any]]):
+        """History rows with iban, status and created_at in a single round-trip"""
+        await self._pool.executemany(
+            INSERT_HISTORY, [(row['iban'], row['status'].name, row['created_at']) for row in rows]
+        )
+
+
+raw_iban_history = RawIbanHistory.from_settings()
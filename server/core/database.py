@@ -1,19 +1,88 @@
-from contextlib import contextmanager
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import AsyncIterator, Dict, List
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from .metrics import CollectedMetric, Histogram, histogram_samples, registry
 from .settings import SettingsPostgres
 
-SQLALCHEMY_DATABASE_URL = SettingsPostgres().SQLALCHEMY_DATABASE_URI
+settings = SettingsPostgres()
+
+SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URI
 
 Base = declarative_base()
 
+
+class PoolStats:
+    """Time spent waiting for a connection and time connections are checked out"""
+
+    def __init__(self):
+        self.wait_time = Histogram()
+        self.checkout_time = Histogram()
+        self.checkouts = 0
+        self.timeouts = 0
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+        connection_record.info['checked_out_at'] = perf_counter()
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop('checked_out_at', None)
+        if checked_out_at is not None:
+            self.checkout_time.observe(perf_counter() - checked_out_at)
+
+    def snapshot(self, pool) -> Dict:
+        return {
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': pool.overflow(),
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'wait_time': self.wait_time.snapshot(),
+            'checkout_time': self.checkout_time.snapshot(),
+        }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool measuring how long callers wait for a connection"""
+
+    def _do_get(self):
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.wait_time.observe(perf_counter() - started)
+
+
 engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
     echo=False,
+    poolclass=InstrumentedAsyncPool,
+    pool_size=settings.POOL_SIZE,
+    max_overflow=settings.POOL_MAX_OVERFLOW,
+    pool_timeout=settings.POOL_TIMEOUT,
+    pool_recycle=settings.POOL_RECYCLE,
+    pool_pre_ping=settings.POOL_PRE_PING,
+    connect_args={
+        # asyncpg statements cache and sqlalchemy prepared statements cache
+        'statement_cache_size': settings.STATEMENT_CACHE_SIZE,
+        'prepared_statement_cache_size': settings.STATEMENT_CACHE_SIZE,
+    },
 )
+event.listen(engine.sync_engine, 'checkout', pool_stats.on_checkout)
+event.listen(engine.sync_engine, 'checkin', pool_stats.on_checkin)
 
 async_session = sessionmaker(
     engine,
@@ -34,12 +103,36 @@ async def get_session() -> AsyncSession:
             await session.close()
 
 
-@contextmanager
-async def session_context() -> AsyncSession:
+@asynccontextmanager
+async def session_context() -> AsyncIterator[AsyncSession]:
     async with async_session() as session:
         try:
             yield session
         except Exception:
             await session.rollback()
+            raise
         finally:
             await session.close()
+
+
+def get_pool_stats() -> Dict:
+    return pool_stats.snapshot(engine.pool)
+
+
+def collect_pool_metrics() -> List[CollectedMetric]:
+    pool = engine.pool
+    return [
+        ('db_pool_size', 'gauge', 'Configured size of db connection pool',
+         [('db_pool_size', {}, pool.size())]),
+        ('db_pool_checked_out', 'gauge', 'Db connections in use',
+         [('db_pool_checked_out', {}, pool.checkedout())]),
+        ('db_pool_checkouts_total', 'counter', 'Number of db connection checkouts',
+         [('db_pool_checkouts_total', {}, pool_stats.checkouts)]),
+        ('db_pool_timeouts_total', 'counter', 'Number of failed waits for db connection',
+         [('db_pool_timeouts_total', {}, pool_stats.timeouts)]),
+        ('db_pool_wait_seconds', 'histogram', 'Time waiting for db connection',
+         histogram_samples('db_pool_wait_seconds', pool_stats.wait_time)),
+    ]
+
+
+registry.register_collector(collect_pool_metrics)
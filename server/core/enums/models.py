@@ -9,3 +9,10 @@ class ValidationStatus(str, BaseEnum):
 class StatusEnum(str, BaseEnum):
     success = "Success"
     failure = "Failure"
+
+
+class JobStatus(str, BaseEnum):
+    PENDING = "Pending"
+    RUNNING = "Running"
+    DONE = "Done"
+    FAILED = "Failed"
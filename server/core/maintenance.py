@@ -0,0 +1,167 @@
+"""
+Maintenance of the validation history, run daily (ex. by cron) and on deploy:
+
+    python -m server.core.maintenance all
+    python -m server.core.maintenance partitions --ahead 6
+
+rollup     - recalculates daily stats of the last days from raw history
+retention  - drops monthly partitions older than retention
+partitions - creates monthly partitions of the next months
+
+Rows of months without a partition are written to the default partition,
+they are moved to the monthly partition when it is created.
+
+Rollup runs before retention, so stats of dropped months are kept.
+"""
+import argparse
+import asyncio
+import logging
+import re
+import sys
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from server.core.database import engine, settings
+
+logger = logging.getLogger(__name__)
+
+HISTORY_TABLE = 'iban'
+DEFAULT_PARTITION = f'{HISTORY_TABLE}_default'
+_PARTITION_RE = re.compile(rf'^{HISTORY_TABLE}_y(\d{{4}})m(\d{{2}})$')
+
+LIST_PARTITIONS = text("""
+    SELECT child.relname FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :table
+""")
+
+ROLLUP = text("""
+    INSERT INTO iban_daily_stats (day, country, status, count)
+    SELECT created_at::date, upper(left(replace(iban, ' ', ''), 2)), status, count(*)
+    FROM iban
+    WHERE created_at >= :since AND iban IS NOT NULL AND status IS NOT NULL
+    GROUP BY 1, 2, 3
+    ON CONFLICT (day, country, status) DO UPDATE SET count = EXCLUDED.count
+""")
+
+
+def add_months(month: date, months: int) -> date:
+    """The first day of the month shifted by number of months"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f'{HISTORY_TABLE}_y{month.year:04d}m{month.month:02d}'
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month of the partition, None for tables not created by maintenance"""
+    match = _PARTITION_RE.match(name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def future_partitions(today: date, ahead: int) -> List[date]:
+    """Months of the current and the next partitions"""
+    current = today.replace(day=1)
+    return [add_months(current, months) for months in range(ahead + 1)]
+
+
+def expired_partitions(names: Iterable[str], today: date, retention_months: int) -> List[str]:
+    """Partitions with all rows older than retention, 0 - nothing is expired"""
+    if retention_months <= 0:
+        return []
+    oldest_kept = add_months(today.replace(day=1), -retention_months)
+    months = {name: partition_month(name) for name in names}
+    return sorted(name for name, month in months.items() if month is not None and month < oldest_kept)
+
+
+async def list_partitions(connection: AsyncConnection) -> List[str]:
+    return (await connection.execute(LIST_PARTITIONS, {'table': HISTORY_TABLE})).scalars().all()
+
+
+async def create_partitions(connection: AsyncConnection, today: date, ahead: int) -> List[str]:
+    """
+    Missing partitions are created detached, filled with rows of the month from
+    the default partition and attached, so the default partition never holds
+    rows of an attached month
+    """
+    existing = set(await list_partitions(connection))
+    names = []
+    for month in future_partitions(today, ahead):
+        name = partition_name(month)
+        names.append(name)
+        if name in existing:
+            continue
+        start, end = month.isoformat(), add_months(month, 1).isoformat()
+        await connection.execute(text(f'CREATE TABLE {name} (LIKE {HISTORY_TABLE} INCLUDING DEFAULTS)'))
+        await connection.execute(text(
+            f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} '
+            f"WHERE created_at >= '{start}' AND created_at < '{end}' RETURNING id, iban, status, created_at) "
+            f'INSERT INTO {name} (id, iban, status, created_at) SELECT * FROM moved'
+        ))
+        await connection.execute(text(
+            f"ALTER TABLE {HISTORY_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+    return names
+
+
+async def drop_expired_partitions(connection: AsyncConnection, today: date, retention_months: int) -> List[str]:
+    expired = expired_partitions(await list_partitions(connection), today, retention_months)
+    for name in expired:
+        # detached first, so the lock on the parent table is short
+        await connection.execute(text(f'ALTER TABLE {HISTORY_TABLE} DETACH PARTITION {name}'))
+        await connection.execute(text(f'DROP TABLE {name}'))
+    return expired
+
+
+async def rollup(connection: AsyncConnection, today: date, days: int):
+    since = datetime.combine(today - timedelta(days=max(days - 1, 0)), datetime.min.time())
+    await connection.execute(ROLLUP, {'since': since})
+
+
+async def run(command: str, today: date, ahead: int, retention_months: int, rollup_days: int):
+    async with engine.begin() as connection:
+        if command in ('rollup', 'all'):
+            await rollup(connection, today, rollup_days)
+            logger.info('Rolled up history of %s days', rollup_days)
+        if command in ('retention', 'all'):
+            dropped = await drop_expired_partitions(connection, today, retention_months)
+            logger.info('Dropped partitions: %s', ', '.join(dropped) or 'none')
+        if command in ('partitions', 'all'):
+            created = await create_partitions(connection, today, ahead)
+            logger.info('Partitions in place: %s', ', '.join(created))
+    await engine.dispose()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m server.core.maintenance', description='History maintenance')
+    parser.add_argument('command', choices=('partitions', 'retention', 'rollup', 'all'))
+    parser.add_argument('--ahead', type=int, default=settings.HISTORY_PARTITIONS_AHEAD,
+                        help='number of monthly partitions created in advance')
+    parser.add_argument('--retention-months', type=int, default=settings.HISTORY_RETENTION_MONTHS,
+                        help='months of history kept, 0 - history is kept forever')
+    parser.add_argument('--rollup-days', type=int, default=settings.HISTORY_ROLLUP_DAYS,
+                        help='number of the last days recalculated in daily stats')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    asyncio.run(run(
+        command=args.command,
+        today=datetime.utcnow().date(),
+        ahead=args.ahead,
+        retention_months=args.retention_months,
+        rollup_days=args.rollup_days,
+    ))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
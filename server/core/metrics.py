@@ -0,0 +1,168 @@
+"""
+Minimal metrics in Prometheus text exposition format.
+
+Metrics are plain counters updated from the event loop without locks,
+every worker process keeps its own values.
+"""
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+# (sample name, labels, value)
+Sample = Tuple[str, Dict[str, str], float]
+# (metric name, type, documentation, samples)
+CollectedMetric = Tuple[str, str, str, List[Sample]]
+
+
+class Histogram:
+    """
+    Distribution of observed values by fixed buckets.
+    Only plain counters are updated, so observing is cheap and
+    safe without locks inside a single event loop
+    """
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # the last counter is for values greater than the last bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> Dict:
+        """Cumulative counts by upper bound of bucket"""
+        cumulative, total = {}, 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            cumulative[_format_bound(bound)] = total
+        return {'count': self.count, 'sum': self.sum, 'buckets': cumulative}
+
+
+class Metric:
+    type: str = None  # type: ignore
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def _labels(self, values: Labels) -> Dict[str, str]:
+        return dict(zip(self.label_names, values))
+
+    def render(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self.values.get(labels, 0)
+
+    def render(self) -> Iterable[str]:
+        for labels, value in self.values.items():
+            yield _sample(self.name, self._labels(labels), value)
+
+
+class HistogramMetric(Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        self.values: Dict[Labels, Histogram] = {}
+
+    def observe(self, value: float, *labels: str):
+        histogram = self.values.get(labels)
+        if histogram is None:
+            histogram = self.values[labels] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def get(self, *labels: str) -> Histogram:
+        return self.values.get(labels) or Histogram(self.buckets)
+
+    def render(self) -> Iterable[str]:
+        for labels, histogram in self.values.items():
+            for sample in histogram_samples(self.name, histogram, self._labels(labels)):
+                yield _sample(*sample)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        # callbacks returning current values of gauges owned by other components
+        self.collectors: List[Callable[[], Iterable[CollectedMetric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))  # type: ignore
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> HistogramMetric:
+        return self.register(HistogramMetric(name, documentation, labels, buckets))  # type: ignore
+
+    def register_collector(self, collector: Callable[[], Iterable[CollectedMetric]]):
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines += _header(metric.name, metric.type, metric.documentation)
+            lines += metric.render()
+        for collector in self.collectors:
+            for name, metric_type, documentation, samples in collector():
+                lines += _header(name, metric_type, documentation)
+                lines += [_sample(*sample) for sample in samples]
+        return '\n'.join(lines) + '\n'
+
+
+def histogram_samples(name: str, histogram: Histogram, labels: Dict[str, str] = None) -> List[Sample]:
+    labels = labels or {}
+    samples = [
+        (f'{name}_bucket', {**labels, 'le': bound}, count)
+        for bound, count in histogram.snapshot()['buckets'].items()
+    ]
+    samples.append((f'{name}_sum', labels, histogram.sum))
+    samples.append((f'{name}_count', labels, histogram.count))
+    return samples
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else str(bound)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _header(name: str, metric_type: str, documentation: str) -> List[str]:
+    return [f'# HELP {name} {documentation}', f'# TYPE {name} {metric_type}']
+
+
+def _sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        label_pairs = ','.join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+        return f'{name}{{{label_pairs}}} {value}'
+    return f'{name} {value}'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,60 @@
+from time import perf_counter
+from typing import Dict
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import registry
+
+http_requests = registry.counter(
+    'http_requests_total', 'Number of handled http requests', labels=('method', 'route', 'status')
+)
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds', 'Latency of http requests', labels=('method', 'route')
+)
+
+# requests not matched by any route are counted together to keep number of labels bounded
+UNMATCHED_ROUTE = 'unmatched'
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware counting requests and their latency by route template.
+    Does not wrap request or response bodies, so streaming is not affected
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._routes: Dict = {}
+
+    def route_path(self, scope: Scope) -> str:
+        # router stores matched endpoint in the scope, it is mapped back to the route path
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        if endpoint not in self._routes:
+            self._routes.update({
+                getattr(route, 'endpoint', None): route.path for route in scope['app'].routes
+            })
+        return self._routes.get(endpoint, UNMATCHED_ROUTE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = self.route_path(scope)
+            method = scope['method']
+            http_requests.inc(method, route, str(status_code))
+            http_request_duration.observe(perf_counter() - started, method, route)
@@ -1,16 +1,86 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, Column, DateTime, Enum, String
+from sqlalchemy import (BigInteger, Column, Date, DateTime, Enum, ForeignKey,
+                        Index, Integer, LargeBinary, String, Text, text)
 
-from server.core.enums import ValidationStatus
+from server.core.enums import JobStatus, ValidationStatus
 from server.core.models.base_model import BaseModel
 
 
 class IbanModel(BaseModel):
+    """History of validations, partitioned by month of created_at"""
     __tablename__ = 'iban'
+    __table_args__ = (
+        # keyset pagination of history, newest first, with optional filters
+        Index('ix_iban_created_at_id', 'created_at', 'id'),
+        Index('ix_iban_iban_created_at_id', 'iban', 'created_at', 'id'),
+        Index('ix_iban_status_created_at_id', 'status', 'created_at', 'id'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
 
-    id = Column(BigInteger, primary_key=True, index=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=True, index=True)
     iban = Column(String)
     status = Column(Enum(ValidationStatus))
 
-    created_at = Column(DateTime, default=datetime.utcnow())
+    # partition key is a part of the primary key
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True)
+
+
+class IbanDailyStatsModel(BaseModel):
+    """Number of validations per day, country and status, rolled up from history"""
+    __tablename__ = 'iban_daily_stats'
+
+    day = Column(Date, primary_key=True)
+    country = Column(String(2), primary_key=True)
+    status = Column(Enum(ValidationStatus), primary_key=True)
+    count = Column(BigInteger, nullable=False)
+
+
+class IbanDedupModel(BaseModel):
+    """Deduplicated history: a row per distinct normalized iban with counters of validations"""
+    __tablename__ = 'iban_dedup'
+    __table_args__ = (
+        # keyset pagination of history, the last validated first
+        Index('ix_iban_dedup_last_seen_key', 'last_seen', 'key'),
+        Index('ix_iban_dedup_status_last_seen_key', 'status', 'last_seen', 'key'),
+    )
+
+    # blake2b digest of normalized iban
+    key = Column(LargeBinary(16), primary_key=True)
+    iban = Column(String, nullable=False)
+    status = Column(Enum(ValidationStatus), nullable=False)
+    first_seen = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_seen = Column(DateTime, default=datetime.utcnow, nullable=False)
+    hit_count = Column(BigInteger, default=1, nullable=False)
+
+
+class ValidationJobModel(BaseModel):
+    """Validation of uploaded file, progress is updated by workers chunk by chunk"""
+    __tablename__ = 'validation_job'
+
+    id = Column(BigInteger, primary_key=True)
+    status = Column(Enum(JobStatus), default=JobStatus.PENDING, nullable=False)
+    country = Column(String(2))
+    total = Column(BigInteger, default=0, nullable=False)
+    processed = Column(BigInteger, default=0, nullable=False)
+    valid = Column(BigInteger, default=0, nullable=False)
+    total_chunks = Column(Integer, default=0, nullable=False)
+    processed_chunks = Column(Integer, default=0, nullable=False)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ValidationJobChunkModel(BaseModel):
+    """Ibans of a job chunk and ndjson results, results are null until the chunk is validated"""
+    __tablename__ = 'validation_job_chunk'
+    __table_args__ = (
+        # queue of chunks to validate
+        Index('ix_validation_job_chunk_pending', 'job_id', 'number', postgresql_where=text('results IS NULL')),
+    )
+
+    job_id = Column(BigInteger, ForeignKey('validation_job.id', ondelete='CASCADE'), primary_key=True)
+    number = Column(Integer, primary_key=True)
+    # newline separated
+    ibans = Column(Text, nullable=False)
+    results = Column(Text)
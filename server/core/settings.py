@@ -1,8 +1,16 @@
-from typing import Any, Dict, Optional
+import os
+from typing import Any, Dict, Literal, Optional
 
 from pydantic import BaseSettings, PostgresDsn, validator
 
 
+def available_cores() -> int:
+    """Cores available to the process, respects cpu affinity"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
 class CustomPostgresDsn(PostgresDsn):
     allowed_schemes = {"postgres", "postgresql", "postgresql+asyncpg"}
 
@@ -15,6 +23,40 @@ class SettingsPostgres(BaseSettings):
 
     SQLALCHEMY_DATABASE_URI: Optional[CustomPostgresDsn] = None
 
+    POOL_SIZE: int = 5
+    POOL_MAX_OVERFLOW: int = 10
+    # connections of all serving workers of the host, split between workers by the production server,
+    # 0 - every worker uses POOL_SIZE and POOL_MAX_OVERFLOW
+    POOL_BUDGET: int = 0
+    # seconds to wait for a connection
+    POOL_TIMEOUT: float = 30
+    # seconds after which connection is recreated, -1 - never
+    POOL_RECYCLE: int = -1
+    POOL_PRE_PING: bool = False
+    # prepared statements cached per connection, 0 - disabled (ex. for pgbouncer)
+    STATEMENT_CACHE_SIZE: int = 100
+
+    # sync - history is stored before response, buffered - written behind in batches,
+    # coalesced - stored before response by one write of concurrent requests
+    HISTORY_WRITE_MODE: Literal["sync", "buffered", "coalesced"] = "sync"
+    # log - a row per validation, dedup - a row per distinct iban with hit counters
+    HISTORY_STORAGE: Literal["log", "dedup"] = "log"
+    # orm - history row is written by sqlalchemy session,
+    # asyncpg - by a prepared statement on a raw asyncpg pool, only for log storage
+    HISTORY_DRIVER: Literal["orm", "asyncpg"] = "orm"
+    HISTORY_BUFFER_SIZE: int = 10000
+    HISTORY_BATCH_SIZE: int = 500
+    HISTORY_FLUSH_INTERVAL: float = 1.0
+    # seconds rows of concurrent requests are collected before a coalesced write, 0 - rows are written at once
+    # when no write is running, rows arriving during a write are written together by the next one
+    HISTORY_COALESCE_WINDOW: float = 0
+    # monthly partitions of history created in advance
+    HISTORY_PARTITIONS_AHEAD: int = 3
+    # months of history kept, older partitions are dropped, 0 - history is kept forever
+    HISTORY_RETENTION_MONTHS: int = 0
+    # days of history rolled up on every maintenance run
+    HISTORY_ROLLUP_DAYS: int = 2
+
     @validator("SQLALCHEMY_DATABASE_URI", pre=True)
     def assemble_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
         if isinstance(v, str):
@@ -30,3 +72,59 @@ class SettingsPostgres(BaseSettings):
     class Config:
         case_sensitive = True
         env_file = ".env"
+
+
+class SettingsValidation(BaseSettings):
+    # batches of at least this size are validated in the process pool
+    VALIDATION_POOL_THRESHOLD: int = 5000
+    VALIDATION_POOL_CHUNK_SIZE: int = 2000
+    # 0 - number of available cores, -1 - process pool is disabled
+    VALIDATION_POOL_WORKERS: int = 0
+
+    # max number of cached validation results, 0 - cache is disabled
+    VALIDATION_CACHE_SIZE: int = 100000
+    # seconds, 0 - results do not expire
+    VALIDATION_CACHE_TTL: float = 0
+
+    # csv with country, bank_code, bic and name columns, the shipped sample by default
+    BANK_DIRECTORY_FILE: Optional[str] = None
+
+    # ibans of uploaded file validated and committed at once by a job worker
+    JOB_CHUNK_SIZE: int = 5000
+    # job workers of every app process, 0 - jobs are validated by standalone workers only
+    JOB_WORKERS: int = 1
+    # seconds between polls of the job queue when it is empty
+    JOB_POLL_INTERVAL: float = 1.0
+
+    # messages of a websocket connection received ahead of validation, the socket is not read when it is full
+    WS_QUEUE_SIZE: int = 100
+    # max number of ibans in a batch message of websocket
+    WS_MAX_BATCH_SIZE: int = 1000
+
+    class Config:
+        case_sensitive = True
+        env_file = ".env"
+
+
+class SettingsServer(BaseSettings):
+    APP_HOST: str = "0.0.0.0"
+    APP_PORT: int = 8000
+
+    # processes of the production server, 0 - number of available cores
+    WEB_WORKERS: int = 0
+    # a worker is gracefully restarted after this number of requests (plus random jitter), 0 - never
+    WEB_MAX_REQUESTS: int = 10000
+    WEB_MAX_REQUESTS_JITTER: int = 1000
+    # seconds a silent worker is alive before it is killed and restarted
+    WEB_TIMEOUT: int = 30
+    # seconds to finish requests of a restarted worker
+    WEB_GRACEFUL_TIMEOUT: int = 30
+    # seconds to wait for requests on keep-alive connection
+    WEB_KEEPALIVE: int = 5
+
+    # token of X-Internal-Token header required by internal actions (ex. bank directory reload), not set - disabled
+    INTERNAL_TOKEN: Optional[str] = None
+
+    class Config:
+        case_sensitive = True
+        env_file = ".env"
@@ -0,0 +1,22 @@
+"""
+Gunicorn settings of the production server, see server.serving:
+
+    gunicorn --config server/gunicorn_conf.py server.main:app
+"""
+import os
+
+from server.core.settings import SettingsServer
+from server.serving import (gunicorn_options, preload, worker_count,
+                            worker_environ)
+
+settings = SettingsServer()
+
+# read by settings of the app, so it must be set before the app is preloaded
+os.environ.update(worker_environ(worker_count(settings)))
+
+# bind, workers, worker_class, preload_app, max_requests, timeouts
+globals().update(gunicorn_options(settings))
+
+
+def on_starting(server):
+    preload()
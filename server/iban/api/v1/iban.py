@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends
+from typing import List
+
+from fastapi import APIRouter, Depends, WebSocket
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from server.core.database import get_session
-from server.iban.schemas import (IbanPartialValidationResponse,
-                                 IbanValidationResponse, ValidateIbanSchema)
-from server.iban.services import IbanController
+from server.iban.schemas import (IbanHistoryFilters,
+                                 IbanPartialValidationResponse,
+                                 IbanValidationResponse, ValidateIbanSchema,
+                                 ValidateIbansSchema)
+from server.iban.services import (HistoryController, IbanController,
+                                  ValidationChannel)
 
 router = APIRouter(prefix="/iban")
 controller = IbanController()
@@ -16,12 +22,59 @@ async def validate_iban(
     session: AsyncSession = Depends(get_session)
 ):
     """
-    Validate iban. For now Montenegro ibans supported only
+    Validate iban of any country from the IBAN registry,
+    country restricts validation to the specified country
+    """
+    # response is built by the controller, response_model is not validated again
+    response = await controller.validate_iban(payload=payload, session=session)
+    return ORJSONResponse(response.dict())
+
+
+@router.post("/validate_batch", response_model=List[IbanValidationResponse])
+async def validate_ibans(
+    payload: ValidateIbansSchema,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Validate list of ibans in one pass, results are streamed in input order
     """
-    return await controller.validate_iban(payload=payload, session=session)
+    return StreamingResponse(
+        await controller.stream_ibans(payload=payload, session=session),
+        media_type="application/json"
+    )
 
 
 @router.post("/validate_partial", response_model=IbanPartialValidationResponse)
 async def validate_partial_iban(payload: ValidateIbanSchema):
     """Validate partial iban provided (ex. when searching)"""
-    return await controller.validate_partial_iban(payload)
+    response = await controller.validate_partial_iban(payload)
+    return ORJSONResponse(response.dict())
+
+
+@router.websocket("/validate_stream")
+async def validate_stream(
+    websocket: WebSocket,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Validate ibans sent over one connection: plain ibans, {"id", "iban", "country"}
+    or batches {"id", "ibans", "country"}, results are sent in the receiving order
+    """
+    await websocket.accept()
+    await ValidationChannel.from_settings(websocket, session).run()
+
+
+@router.get("/history")
+async def history(
+    filters: IbanHistoryFilters = Depends(),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Validation history, newest first, filtered by iban, status and time range.
+    Pass next_cursor of the response as cursor to get the next page.
+    Dedup storage returns a row per iban with the time of the first and the last validation
+    """
+    return StreamingResponse(
+        HistoryController.stream_history(filters=filters, session=session),
+        media_type="application/json"
+    )
@@ -0,0 +1,51 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.core.database import get_session
+from server.core.settings import SettingsValidation
+from server.iban.schemas import ValidationJobResponse
+from server.iban.services import JobController
+
+router = APIRouter(prefix="/iban/jobs")
+controller = JobController()
+settings = SettingsValidation()
+
+
+@router.post("", response_model=ValidationJobResponse, status_code=202)
+async def upload(
+    request: Request,
+    input_format: str = Query("csv", alias="format", regex="^(csv|ndjson)$"),
+    field: str = "iban",
+    country: Optional[str] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Validate csv or ndjson file sent as the request body in background,
+    check progress of the returned job and download results when it is done
+    """
+    return await controller.upload(
+        stream=request.stream(),
+        input_format=input_format,
+        session=session,
+        field=field,
+        country=country,
+        chunk_size=settings.JOB_CHUNK_SIZE,
+    )
+
+
+@router.get("/{job_id}", response_model=ValidationJobResponse)
+async def get_job(job_id: int, session: AsyncSession = Depends(get_session)):
+    """Status and progress of validation job"""
+    return await controller.get_job(job_id=job_id, session=session)
+
+
+@router.get("/{job_id}/results")
+async def results(job_id: int, session: AsyncSession = Depends(get_session)):
+    """Results of done job as json lines with iban, status and suggested_iban in upload order"""
+    return StreamingResponse(
+        await controller.stream_results(job_id=job_id, session=session),
+        media_type="application/x-ndjson"
+    )
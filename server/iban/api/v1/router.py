@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
 from .iban import router as iban_router
+from .jobs import router as jobs_router
 
 router = APIRouter(prefix="/v1")
 router.include_router(iban_router)
+router.include_router(jobs_router)
@@ -0,0 +1,168 @@
+"""
+Command line validation of iban files.
+
+    python -m server.iban.cli validate ibans.csv --output results.ndjson --persist
+    python -m server.iban.cli worker --concurrency 4
+
+Input is streamed through a generator pipeline in chunks of bounded size,
+so memory usage does not depend on the file size. Results are written
+as soon as a chunk is validated.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import sys
+from contextlib import AsyncExitStack, ExitStack
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from server.core.enums import ValidationStatus
+from server.iban.formats import FORMATS, chunked, detect_format, read_ibans
+from server.iban.pool import ValidationPool
+from server.iban.validation import validate_ibans
+
+RESULT_FIELDS = ('iban', 'status', 'suggested_iban')
+
+
+async def validate_chunk(
+    chunk: List[str],
+    country: Optional[str] = None,
+    pool: Optional[ValidationPool] = None,
+) -> List[Dict[str, Any]]:
+    """Validate chunk at once by the validation core, large chunks are validated in the process pool"""
+    results = await pool.validate(chunk, country) if pool is not None else validate_ibans(chunk, country)
+    return [
+        {
+            'iban': iban,
+            'status': ValidationStatus.VALID if is_valid else ValidationStatus.NOT_VALID,
+            'suggested_iban': suggested_iban,
+        }
+        for iban, (is_valid, suggested_iban) in zip(chunk, results)
+    ]
+
+
+class ResultWriter:
+    """Streaming writer of validation results"""
+
+    def __init__(self, file: TextIO, output_format: str):
+        self.file = file
+        self.output_format = output_format
+        self.csv_writer = None
+        if output_format == 'csv':
+            self.csv_writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, results: List[Dict[str, Any]]):
+        rows = [{**result, 'status': result['status'].value} for result in results]
+        if self.csv_writer is not None:
+            self.csv_writer.writerows(rows)
+        else:
+            self.file.writelines(json.dumps(row) + '\n' for row in rows)
+        self.file.flush()
+
+
+async def persist_chunk(results: List[Dict[str, Any]], session):
+    """Store validation history of chunk with a single bulk write"""
+    from server.iban.services import IbanController
+
+    await IbanController.write_history(
+        [{'iban': result['iban'], 'status': result['status']} for result in results], session
+    )
+
+
+async def validate_stream(
+    ibans: Iterable[str],
+    writer: ResultWriter,
+    chunk_size: int = 1000,
+    country: Optional[str] = None,
+    persist: bool = False,
+) -> int:
+    """
+    Validate stream of ibans chunk by chunk, returns number of validated ibans.
+    Services and database are imported by --persist only, so validation works without db settings
+    """
+    total = 0
+    pool = ValidationPool.from_settings()
+    async with AsyncExitStack() as stack:
+        stack.callback(pool.shutdown)
+        session = None
+        if persist:
+            from server.core.database import async_session
+
+            session = await stack.enter_async_context(async_session())
+
+        for chunk in chunked(ibans, chunk_size):
+            results = await validate_chunk(chunk, country=country, pool=pool)
+            writer.write(results)
+            if session is not None:
+                await persist_chunk(results, session)
+            total += len(results)
+    return total
+
+
+def validate_command(args: argparse.Namespace) -> int:
+    input_format = args.format or detect_format(args.input)
+    if input_format is None:
+        sys.exit('Unable to detect input format, use --format')
+    output_format = args.output_format or (detect_format(args.output) if args.output != '-' else None) \
+        or input_format
+
+    with ExitStack() as stack:
+        input_file = sys.stdin if args.input == '-' else \
+            stack.enter_context(open(args.input, newline='', encoding='utf-8'))
+        output_file = sys.stdout if args.output == '-' else \
+            stack.enter_context(open(args.output, 'w', newline='', encoding='utf-8'))
+
+        try:
+            total = asyncio.run(validate_stream(
+                ibans=read_ibans(input_file, input_format, args.field),
+                writer=ResultWriter(output_file, output_format),
+                chunk_size=args.chunk_size,
+                country=args.country,
+                persist=args.persist,
+            ))
+        except ValueError as error:
+            # broken input line, results of the previous chunks are written
+            sys.exit(f'Invalid {input_format} input: {error}')
+
+    print(f'Validated {total} ibans', file=sys.stderr)
+    return 0
+
+
+def worker_command(args: argparse.Namespace) -> int:
+    from server.iban.services import JobWorker
+
+    asyncio.run(JobWorker(concurrency=args.concurrency, poll_interval=args.poll_interval).run_forever())
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m server.iban.cli', description='Iban checker tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    validate = commands.add_parser('validate', help='validate csv or ndjson file of ibans')
+    validate.add_argument('input', help='path to input file, - for stdin')
+    validate.add_argument('--format', choices=FORMATS, help='input format, detected by extension by default')
+    validate.add_argument('--field', default='iban', help='csv column or json field with iban')
+    validate.add_argument('--country', help='validate ibans of the specified country only')
+    validate.add_argument('--output', default='-', help='path to output file, - for stdout')
+    validate.add_argument('--output-format', choices=FORMATS, help='output format, same as input by default')
+    validate.add_argument('--chunk-size', type=int, default=1000, help='number of ibans validated at once')
+    validate.add_argument('--persist', action='store_true', help='store validation history in db')
+    validate.set_defaults(handler=validate_command)
+
+    worker = commands.add_parser('worker', help='validate uploaded files of the job queue')
+    worker.add_argument('--concurrency', type=int, default=1, help='number of chunks validated at once')
+    worker.add_argument('--poll-interval', type=float, default=1.0, help='seconds between polls of empty queue')
+    worker.set_defaults(handler=worker_command)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
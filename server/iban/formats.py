@@ -0,0 +1,99 @@
+"""
+Input formats of iban files: csv with a column of ibans or ndjson lines.
+Readers accept any iterable of lines, so both files and received parts
+of uploaded body are parsed the same way.
+"""
+import codecs
+import csv
+import json
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator, List, Optional
+
+FORMATS = ('csv', 'ndjson')
+CONTROL_CHARACTERS = dict.fromkeys([*range(32), 127])
+
+
+def detect_format(path: str) -> Optional[str]:
+    """File format by extension"""
+    if path.endswith('.csv'):
+        return 'csv'
+    if path.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return None
+
+
+def read_csv(file: Iterable[str], field: str = 'iban') -> Iterator[str]:
+    """Ibans from the specified column of csv file with header"""
+    for row in csv.DictReader(file):
+        iban = row.get(field)
+        if iban:
+            yield iban
+
+
+def read_ndjson(file: Iterable[str], field: str = 'iban') -> Iterator[str]:
+    """Ibans from json lines, a line is either an object or a string"""
+    for number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f'Invalid json at line {number}: {error.msg}') from None
+        iban = item.get(field) if isinstance(item, dict) else item
+        if iban:
+            yield iban
+
+
+def strip_control_characters(iban: str) -> str:
+    """Iban without control characters (ex. a new line decoded from json), so it is a single line of a job chunk"""
+    if not isinstance(iban, str):
+        raise TypeError(f'Iban must be a string, not {type(iban).__name__}')
+    return iban.translate(CONTROL_CHARACTERS)
+
+
+def read_ibans(file: Iterable[str], input_format: str, field: str = 'iban') -> Iterator[str]:
+    readers = {'csv': read_csv, 'ndjson': read_ndjson}
+    return readers[input_format](file, field)
+
+
+def chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Split stream to lists of at most size items"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def read_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """Complete utf-8 lines of every received part of byte stream"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    tail = ''
+    async for data in stream:
+        lines = (tail + decoder.decode(data)).split('\n')
+        tail = lines.pop()
+        if lines:
+            yield lines
+    tail += decoder.decode(b'', final=True)
+    if tail:
+        yield [tail]
+
+
+async def read_ibans_stream(
+    stream: AsyncIterator[bytes],
+    input_format: str,
+    field: str = 'iban',
+) -> AsyncIterator[List[str]]:
+    """Ibans of every received part of csv or ndjson byte stream"""
+    header: Optional[str] = None
+    async for lines in read_lines(stream):
+        if input_format == 'csv':
+            # header is repeated for every part, so parts are parsed independently
+            if header is None:
+                header, lines = lines[0], lines[1:]
+            lines = [header] + lines
+        ibans = [iban for iban in map(strip_control_characters, read_ibans(lines, input_format, field)) if iban]
+        if ibans:
+            yield ibans
@@ -0,0 +1,68 @@
+"""
+Process pool of batch validation, free of web and database dependencies,
+so it is shared by the service layer and the command line.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import List, Optional, Sequence
+
+from server.core.settings import SettingsValidation, available_cores
+from server.iban.validation import ValidationResult, validate_ibans
+
+
+class ValidationPool:
+    """
+    Validation of large batches in worker processes, so CPU bound work
+    does not block the event loop. Batches are split to chunks, chunks
+    are validated in parallel and results are reassembled in input order.
+    Small batches are validated inline
+    """
+
+    def __init__(self, workers: int = 0, threshold: int = 5000, chunk_size: int = 2000):
+        self.workers = workers or available_cores()
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_settings(cls, settings: SettingsValidation = None) -> 'ValidationPool':
+        settings = settings or SettingsValidation()
+        return cls(
+            workers=settings.VALIDATION_POOL_WORKERS,
+            threshold=settings.VALIDATION_POOL_THRESHOLD,
+            chunk_size=settings.VALIDATION_POOL_CHUNK_SIZE,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Executor is started on the first large batch"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def chunks(self, ibans: Sequence[str]) -> List[Sequence[str]]:
+        # at least one chunk per worker, so all cores are busy
+        chunk_size = max(1, min(self.chunk_size, -(-len(ibans) // self.workers)))
+        return [ibans[start:start + chunk_size] for start in range(0, len(ibans), chunk_size)]
+
+    async def validate(self, ibans: Sequence[str], country: Optional[str] = None) -> List[ValidationResult]:
+        """Validate ibans, results keep the input order"""
+        if not self.enabled or len(ibans) < self.threshold:
+            return validate_ibans(ibans, country)
+
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(self.executor, validate_ibans, chunk, country)
+            for chunk in self.chunks(ibans)
+        ])
+        return list(chain.from_iterable(results))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -1,2 +1,4 @@
-from .iban import (CreateIbanCheck, IbanPartialValidationResponse,
-                   IbanValidationResponse, UpdateIbanCheck, ValidateIbanSchema)
+from .iban import (CreateIbanCheck, IbanHistoryFilters,
+                   IbanPartialValidationResponse, IbanValidationResponse,
+                   UpdateIbanCheck, ValidateIbanSchema, ValidateIbansSchema,
+                   ValidationJobResponse)
@@ -1,8 +1,9 @@
-from typing import Any, Optional
+from datetime import datetime
+from typing import Any, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, conint
 
-from server.core.enums import ValidationStatus
+from server.core.enums import JobStatus, ValidationStatus
 
 
 class BaseIban(BaseModel):
@@ -13,6 +14,11 @@ class ValidateIbanSchema(BaseIban):
     country: Optional[str]
 
 
+class ValidateIbansSchema(BaseModel):
+    ibans: List[str]
+    country: Optional[str]
+
+
 class CreateIbanCheck(BaseIban):
     status: ValidationStatus
 
@@ -29,10 +35,43 @@ class IbanValidationResponse(BaseValidationResponse):
     iban: str
     suggested_iban: Optional[str]
     created_at: Any
+    # bank of valid iban found in the bank directory
+    bank_code: Optional[str]
+    bic: Optional[str]
+    bank_name: Optional[str]
 
     class Config:
         orm_mode = True
 
 
 class IbanPartialValidationResponse(BaseValidationResponse):
-    pass
+    # number of characters left to type, unknown before country code is typed
+    remaining_length: Optional[int]
+    # class of the next character: digit, letter or alphanumeric
+    next_char_class: Optional[str]
+
+
+class IbanHistoryFilters(BaseModel):
+    iban: Optional[str]
+    status: Optional[ValidationStatus]
+    created_from: Optional[datetime]
+    created_to: Optional[datetime]
+    # next_cursor of the previous page
+    cursor: Optional[str]
+    limit: conint(gt=0, le=10000) = 100  # type: ignore
+
+
+class ValidationJobResponse(BaseModel):
+    id: int
+    status: JobStatus
+    country: Optional[str]
+    # number of uploaded, validated and valid ibans
+    total: int
+    processed: int
+    valid: int
+    error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
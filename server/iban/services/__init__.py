@@ -1 +1,10 @@
-from .iban import IbanController, MontenegroIbanService
+from .banks import Bank, BankDirectory, BankIndex, bank_directory
+from .cache import (CacheBackend, LocalCacheBackend, ValidationCache,
+                    validation_cache)
+from .channel import ValidationChannel
+from .history import HistoryController
+from .iban import (IBAN_SERVICES, BaseIbanService, IbanController,
+                   MontenegroIbanService, get_iban_service, history_coalescer,
+                   validation_flight)
+from .jobs import JobController, JobWorker, job_worker
+from .pool import ValidationPool, validation_pool
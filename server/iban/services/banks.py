@@ -0,0 +1,103 @@
+import asyncio
+import csv
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from server.core.settings import SettingsValidation
+from server.iban.validation import get_bank_code, normalize_iban
+
+DEFAULT_BANKS_FILE = Path(__file__).resolve().parent.parent / 'data' / 'banks.csv'
+
+
+class Bank(NamedTuple):
+    bank_code: str
+    bic: Optional[str]
+    name: Optional[str]
+
+
+class BankIndex:
+    """
+    Immutable index of banks by country and bank code: sorted keys
+    and parallel columns, lookup is a binary search
+    """
+    __slots__ = ('keys', 'bics', 'names')
+
+    def __init__(self, rows: Iterable[Tuple[str, str, str, str]]):
+        # the last row wins for duplicated keys
+        rows = {f'{country.upper()}{bank_code}': (bic, name) for country, bank_code, bic, name in rows}
+        self.keys: List[str] = sorted(rows)
+        self.bics: List[Optional[str]] = [rows[key][0] or None for key in self.keys]
+        self.names: List[Optional[str]] = [rows[key][1] or None for key in self.keys]
+
+    @classmethod
+    def from_csv(cls, path: Path) -> 'BankIndex':
+        """Csv with country, bank_code, bic and name columns"""
+        with open(path, newline='', encoding='utf-8') as file:
+            return cls(
+                (row['country'], row['bank_code'], row.get('bic'), row.get('name'))
+                for row in csv.DictReader(file)
+            )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, country_code: str, bank_code: str) -> Optional[Bank]:
+        key = country_code + bank_code
+        index = bisect_left(self.keys, key)
+        if index == len(self.keys) or self.keys[index] != key:
+            return None
+        return Bank(bank_code, self.bics[index], self.names[index])
+
+
+class BankDirectory:
+    """
+    Banks of validated ibans. The file is loaded on the first lookup,
+    reload builds a new index aside and swaps the reference, so lookups
+    are never blocked and never see a partially loaded index
+    """
+
+    def __init__(self, path: Path = DEFAULT_BANKS_FILE):
+        self.path = Path(path)
+        self._index: Optional[BankIndex] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: SettingsValidation = None) -> 'BankDirectory':
+        settings = settings or SettingsValidation()
+        return cls(settings.BANK_DIRECTORY_FILE or DEFAULT_BANKS_FILE)
+
+    @property
+    def index(self) -> BankIndex:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = BankIndex.from_csv(self.path)
+        return self._index
+
+    def lookup(self, iban: str) -> Optional[Bank]:
+        """Bank of normalized iban"""
+        bank_code = get_bank_code(iban)
+        if bank_code is None:
+            return None
+        return self.index.lookup(iban[:2], bank_code)
+
+    def lookup_iban(self, iban: str) -> Optional[Bank]:
+        return self.lookup(normalize_iban(iban))
+
+    async def reload(self, path: Optional[Path] = None) -> int:
+        """Load the file in a thread and swap the index, returns number of banks"""
+        path = Path(path) if path else self.path
+        index = await asyncio.get_running_loop().run_in_executor(None, BankIndex.from_csv, path)
+        self.path, self._index = path, index
+        return len(index)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._index is not None,
+            "size": len(self._index) if self._index is not None else 0,
+        }
+
+
+bank_directory = BankDirectory.from_settings()
@@ -0,0 +1,118 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from server.core.settings import SettingsValidation
+from server.iban.validation import ValidationResult, normalize_iban
+
+
+class CacheBackend:
+    """
+    Storage of cached validation results. Backends shared between
+    workers (ex. redis) implement the same interface
+    """
+
+    async def get(self, key: Hashable) -> Optional[ValidationResult]:
+        raise NotImplementedError
+
+    async def set(self, key: Hashable, value: ValidationResult):
+        raise NotImplementedError
+
+    async def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class LocalCacheBackend(CacheBackend):
+    """In-memory LRU cache of the process with optional TTL (in seconds)"""
+
+    def __init__(self, max_size: int = 100000, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.evictions = 0
+        self.expirations = 0
+        # key -> (expiration time, value)
+        self._items: 'OrderedDict[Hashable, Tuple[float, ValidationResult]]' = OrderedDict()
+
+    async def get(self, key: Hashable) -> Optional[ValidationResult]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if self.ttl and expires_at < time.monotonic():
+            del self._items[key]
+            self.expirations += 1
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    async def set(self, key: Hashable, value: ValidationResult):
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+        self._items[key] = (expires_at, value)
+        self._items.move_to_end(key)
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    async def clear(self):
+        self._items.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._items),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class ValidationCache:
+    """Results of iban validation keyed by normalized iban and requested country"""
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls, settings: SettingsValidation = None) -> 'ValidationCache':
+        settings = settings or SettingsValidation()
+        if settings.VALIDATION_CACHE_SIZE <= 0:
+            return cls()
+        return cls(LocalCacheBackend(
+            max_size=settings.VALIDATION_CACHE_SIZE,
+            ttl=settings.VALIDATION_CACHE_TTL or None,
+        ))
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def key(iban: str, country: Optional[str] = None) -> Tuple[str, str]:
+        return normalize_iban(iban), (country or '').upper()
+
+    async def get(self, iban: str, country: Optional[str] = None) -> Optional[ValidationResult]:
+        if not self.enabled:
+            return None
+        value = await self.backend.get(self.key(iban, country))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, iban: str, country: Optional[str], value: ValidationResult):
+        if self.enabled:
+            await self.backend.set(self.key(iban, country), value)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            **(self.backend.stats() if self.enabled else {}),
+        }
+
+
+validation_cache = ValidationCache.from_settings()
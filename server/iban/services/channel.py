@@ -0,0 +1,141 @@
+"""
+Validation of ibans streamed over a websocket connection.
+
+A message is a plain iban, a json string or an object:
+
+    GB29NWBK60161331926819
+    {"id": 1, "iban": "GB29NWBK60161331926819", "country": "GB"}
+    {"id": 2, "ibans": ["GB29NWBK60161331926819", "ME25505000012345678951"]}
+
+every message is answered in the receiving order with the validation result,
+{"id": 2, "results": [...]} for batches or {"id": 1, "error": "..."}.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.websockets import WebSocket
+
+from server.core.settings import SettingsValidation
+from server.iban.services.iban import IbanController
+
+# queued by the receiving task when the client is gone
+_CLOSED = object()
+
+
+class MessageError(ValueError):
+    pass
+
+
+class ValidationChannel:
+    """
+    Messages are received by a background task into a bounded queue and
+    validated one by one. While the queue is full the socket is not read,
+    so a fast producer is slowed down by transport flow control instead of
+    growing server memory. History of all messages is written with one session
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        session: AsyncSession,
+        queue_size: int = 100,
+        max_batch_size: int = 1000,
+    ):
+        self.websocket = websocket
+        self.session = session
+        self.max_batch_size = max_batch_size
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    @classmethod
+    def from_settings(
+        cls,
+        websocket: WebSocket,
+        session: AsyncSession,
+        settings: SettingsValidation = None,
+    ) -> 'ValidationChannel':
+        settings = settings or SettingsValidation()
+        return cls(websocket, session, queue_size=settings.WS_QUEUE_SIZE, max_batch_size=settings.WS_MAX_BATCH_SIZE)
+
+    def parse(self, message: Union[str, bytes]) -> Tuple[Any, List[str], Optional[str], bool]:
+        """Id, ibans and country of the message and whether it is a batch"""
+        if isinstance(message, bytes):
+            try:
+                message = message.decode()
+            except UnicodeDecodeError:
+                raise MessageError("Message must be utf-8")
+        message = message.strip()
+        if not message:
+            raise MessageError("Message is empty")
+        if not message.startswith(('{', '[', '"')):
+            return None, [message], None, False
+        try:
+            request = orjson.loads(message)
+        except orjson.JSONDecodeError:
+            raise MessageError("Invalid json")
+        if isinstance(request, str):
+            if not request.strip():
+                raise MessageError("Message is empty")
+            return None, [request], None, False
+        if not isinstance(request, dict):
+            raise MessageError("Message must be an iban or an object")
+
+        message_id, country = request.get("id"), request.get("country")
+        if country is not None and not isinstance(country, str):
+            raise MessageError("country must be a string")
+        if isinstance(request.get("iban"), str):
+            if not request["iban"].strip():
+                raise MessageError("iban is empty")
+            return message_id, [request["iban"]], country, False
+        ibans = request.get("ibans")
+        if not isinstance(ibans, list) or not all(isinstance(iban, str) for iban in ibans):
+            raise MessageError("Message must have iban or ibans")
+        if len(ibans) > self.max_batch_size:
+            raise MessageError(f"Batch is larger than {self.max_batch_size} ibans")
+        return message_id, ibans, country, True
+
+    async def handle(self, message: Union[str, bytes]) -> Dict[str, Any]:
+        """Validation result of the message"""
+        message_id = None
+        try:
+            message_id, ibans, country, is_batch = self.parse(message)
+        except MessageError as error:
+            return {"id": message_id, "error": str(error)}
+
+        results = await IbanController.validate_values(ibans, country)
+        created_at = datetime.utcnow()
+        if ibans:
+            await IbanController.write_history([
+                {"iban": iban, "status": status, "created_at": created_at}
+                for iban, (status, _) in zip(ibans, results)
+            ], self.session)
+        items = [
+            IbanController.response_item(iban, status, suggested_iban, created_at)
+            for iban, (status, suggested_iban) in zip(ibans, results)
+        ]
+        if is_batch:
+            return {"id": message_id, "results": items}
+        return {"id": message_id, **items[0]} if message_id is not None else items[0]
+
+    async def _receive(self):
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            # waits while the queue is full, the socket is not read meanwhile
+            await self._queue.put(message.get("text") or message.get("bytes") or "")
+        await self._queue.put(_CLOSED)
+
+    async def run(self):
+        """Answer messages until the client disconnects"""
+        receiver = asyncio.create_task(self._receive())
+        try:
+            while True:
+                message = await self._queue.get()
+                if message is _CLOSED:
+                    return
+                await self.websocket.send_text(orjson.dumps(await self.handle(message)).decode())
+        finally:
+            receiver.cancel()
@@ -0,0 +1,123 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import (Any, AsyncIterator, Callable, Dict, List, NamedTuple,
+                    Optional, Tuple, Union)
+
+from fastapi import HTTPException
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.core.crud import (IbanDbService, IbanDedupDbService,
+                              history_db_service, iban_key)
+from server.core.models import IbanDedupModel, IbanModel
+from server.iban.schemas import IbanHistoryFilters
+from server.iban.validation import normalize_iban
+
+
+def encode_cursor(created_at: datetime, pk: Union[int, bytes]) -> str:
+    """Opaque cursor of keyset position"""
+    key = pk.hex() if isinstance(pk, bytes) else pk
+    return base64.urlsafe_b64encode(f'{created_at.isoformat()},{key}'.encode()).decode()
+
+
+def decode_cursor(cursor: str, parse_key: Callable[[str], Any] = int) -> Tuple[datetime, Any]:
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split(',')
+        return datetime.fromisoformat(created_at), parse_key(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _history_item(row: Row) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "iban": row.iban,
+        "status": row.status.value if row.status else None,
+        "created_at": row.created_at.isoformat(),
+    }
+
+
+def _dedup_item(row: Row) -> Dict[str, Any]:
+    return {
+        "iban": row.iban,
+        "status": row.status.value,
+        "first_seen": row.first_seen.isoformat(),
+        "last_seen": row.last_seen.isoformat(),
+        "hit_count": row.hit_count,
+    }
+
+
+class HistoryStore(NamedTuple):
+    """Paginated history of a storage: a row per validation or a row per distinct iban"""
+    service: Any
+    # time of the validation, of the last one for dedup storage
+    created_at: Any
+    item: Callable[[Row], Dict[str, Any]]
+    # keyset position of the row, time and unique key
+    position: Callable[[Row], Tuple[datetime, Any]]
+    parse_key: Callable[[str], Any]
+
+
+HISTORY_STORES = {
+    IbanDbService: HistoryStore(
+        IbanDbService, IbanModel.created_at, _history_item, lambda row: (row.created_at, row.id), int
+    ),
+    IbanDedupDbService: HistoryStore(
+        IbanDedupDbService, IbanDedupModel.last_seen, _dedup_item, lambda row: (row.last_seen, row.key), bytes.fromhex
+    ),
+}
+
+
+class HistoryController:
+
+    @staticmethod
+    def store() -> HistoryStore:
+        """History is read from the storage it is written to"""
+        return HISTORY_STORES[history_db_service]
+
+    @classmethod
+    def _conditions(cls, filters: IbanHistoryFilters) -> List[Any]:
+        store = cls.store()
+        conditions = []
+        if filters.iban:
+            # dedup storage keeps a row per normalized iban
+            conditions.append(
+                IbanDedupModel.key == iban_key(normalize_iban(filters.iban))
+                if store.service is IbanDedupDbService else IbanModel.iban == filters.iban
+            )
+        if filters.status:
+            conditions.append(store.service.table.status == filters.status)
+        if filters.created_from:
+            conditions.append(store.created_at >= filters.created_from)
+        if filters.created_to:
+            conditions.append(store.created_at < filters.created_to)
+        return conditions
+
+    @staticmethod
+    async def _render_page(rows: AsyncIterator[Row], limit: int, store: HistoryStore) -> AsyncIterator[str]:
+        yield '{"items":['
+        count, last = 0, None
+        async for row in rows:
+            yield (',' if count else '') + json.dumps(store.item(row))
+            count, last = count + 1, row
+        next_cursor = encode_cursor(*store.position(last)) if last is not None and count == limit else None
+        yield f'],"next_cursor":{json.dumps(next_cursor)}}}'
+
+    @classmethod
+    def stream_history(cls, filters: IbanHistoryFilters, session: AsyncSession) -> AsyncIterator[str]:
+        """
+        Page of validation history, newest first, streamed as json object
+        with items and next_cursor, next_cursor is null on the last page.
+        Dedup storage returns a row per iban, the last validated first
+        """
+        store = cls.store()
+        # cursor is checked before streaming, so invalid one is reported with status code
+        after: Optional[Tuple[datetime, Any]] = (
+            decode_cursor(filters.cursor, store.parse_key) if filters.cursor else None
+        )
+        rows = store.service.stream_page(
+            session=session, filters=cls._conditions(filters), after=after, limit=filters.limit
+        )
+        return cls._render_page(rows, filters.limit, store)
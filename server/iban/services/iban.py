@@ -1,119 +1,319 @@
-import re
-from typing import Optional
+from datetime import datetime
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
 
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from server.core.crud import IbanDbService
+from server.core.coalescing import SingleFlight, WriteCoalescer
+from server.core.crud import (IbanDbService, history_db_service,
+                              iban_history_buffer, raw_iban_history)
+from server.core.database import settings
 from server.core.enums import ValidationStatus
 from server.iban.schemas import (CreateIbanCheck,
                                  IbanPartialValidationResponse,
-                                 IbanValidationResponse, ValidateIbanSchema)
+                                 IbanValidationResponse, ValidateIbanSchema,
+                                 ValidateIbansSchema)
+from server.iban.services.banks import Bank, bank_directory
+from server.iban.services.cache import validation_cache
+from server.iban.services.metrics import (STAGE_DB_WRITE, STAGE_NORMALIZATION,
+                                          STAGE_SUGGESTION, STAGE_VALIDATION,
+                                          count_validation, stage_duration)
+from server.iban.services.pool import validation_pool
+from server.iban.validation import (IBAN_REGISTRY, CountrySpec,
+                                    ValidationResult, check_partial_iban,
+                                    normalize_iban, suggest_iban)
 
 
 class BaseIbanService:
-    pass
+    """Validation of ibans of a single country from the iban registry"""
+    country_code: str = None  # type: ignore
+
+    @classmethod
+    def spec(cls) -> CountrySpec:
+        return IBAN_REGISTRY[cls.country_code]
+
+    @classmethod
+    async def is_valid_partial_iban(cls, partial_iban: str) -> bool:
+        """Check if partial iban can be a beginning of the country iban"""
+        return check_partial_iban(partial_iban, cls.country_code).is_valid
+
+    @classmethod
+    async def is_valid(cls, iban: str) -> bool:
+        """Check structure, checksum and national check digits of iban"""
+        return cls.spec().is_valid(normalize_iban(iban))
+
+    @classmethod
+    async def suggest_correct_iban(cls, invalid_iban: str) -> Optional[str]:
+        """
+        Suggest valid iban of the country: extra characters are cut, typos
+        (a wrong character or swapped neighbours) and check digits are corrected
+        """
+        return suggest_iban(invalid_iban, cls.spec())
 
 
 class MontenegroIbanService(BaseIbanService):
-    @staticmethod
-    async def is_valid_partial_iban(partial_iban: str) -> bool:
-        # Remove spaces and convert to uppercase
-        partial_iban = partial_iban.replace(' ', '').upper()
+    country_code = 'ME'
 
-        # Check if the IBAN has the correct length for Montenegro
-        if len(partial_iban) > 22:
-            return False
 
-        # Check if the country code and check digits are valid
-        if not partial_iban.startswith('ME'):
-            return False
+IBAN_SERVICES: Dict[str, Type[BaseIbanService]] = {
+    country_code: type(f'{country_code}IbanService', (BaseIbanService,), {'country_code': country_code})
+    for country_code in IBAN_REGISTRY
+}
+IBAN_SERVICES[MontenegroIbanService.country_code] = MontenegroIbanService
 
-        # Check if the rest of the IBAN is numeric
-        if not partial_iban[2:].isdigit():
-            return False
 
-        return True
+def get_iban_service(iban: str, country: Optional[str] = None) -> Optional[Type[BaseIbanService]]:
+    """Service of specified country or of the iban country code"""
+    country_code = country or normalize_iban(iban[:2])
+    return IBAN_SERVICES.get(country_code.upper())
 
-    @staticmethod
-    async def is_valid(iban: str) -> bool:
-        # Remove spaces and convert to uppercase
-        iban = iban.replace(' ', '').upper()
 
-        # Check if the IBAN has the correct length for Montenegro
-        if len(iban) != 22:
-            return False
+class IbanController:
 
-        # Check if the country code and check digits are valid
-        if not re.match(r'^ME\d{2}\d{3}\d{15}$', iban):
-            return False
+    # results rendered by one json dump of streamed batch
+    stream_chunk_size: int = 500
 
-        # Rearrange IBAN to create a new string for checksum calculation
-        rearranged_iban = iban[4:] + iban[:4]
+    @staticmethod
+    def _bank(iban: str, status: ValidationStatus) -> Optional[Bank]:
+        """Bank of valid iban from the bank directory"""
+        return bank_directory.lookup_iban(iban) if status == ValidationStatus.VALID else None
 
-        # Replace letters with corresponding numbers
-        numeric_iban = ''
-        for char in rearranged_iban:
-            if char.isdigit():
-                numeric_iban += char
-            else:
-                numeric_iban += str(ord(char) - ord('A') + 10)
+    @classmethod
+    def _add_bank(cls, response: IbanValidationResponse) -> IbanValidationResponse:
+        bank = cls._bank(response.iban, response.status)
+        if bank is not None:
+            response.bank_code, response.bic, response.bank_name = bank
+        return response
 
-        # Perform modulo operation to calculate the checksum
-        remainder = int(numeric_iban) % 97
+    @classmethod
+    def _build_response(
+        cls,
+        iban: str,
+        status: ValidationStatus,
+        suggested_iban: Optional[str],
+        created_at: datetime,
+    ) -> IbanValidationResponse:
+        """Response of values produced by the service, built without validation"""
+        return cls._add_bank(IbanValidationResponse.construct(
+            status=status, iban=iban, suggested_iban=suggested_iban, created_at=created_at
+        ))
 
-        # Check if the remainder is 1 (valid IBAN)
-        return remainder == 1
+    @staticmethod
+    async def _check_value(iban: str, country: Optional[str]) -> ValidationResult:
+        started = perf_counter()
+        iban = normalize_iban(iban)
+        iban_service = get_iban_service(iban=iban, country=country)
+        normalized = perf_counter()
+        stage_duration.observe(normalized - started, STAGE_NORMALIZATION)
+        if iban_service is None:
+            return False, None
 
-    async def suggest_correct_iban(self, invalid_iban: str) -> Optional[str]:
-        # TODO: need to improve the algo
-        invalid_iban = invalid_iban.replace(' ', '').upper()
+        is_valid = await iban_service.is_valid(iban=iban)
+        validated = perf_counter()
+        stage_duration.observe(validated - normalized, STAGE_VALIDATION)
+        if is_valid:
+            return True, None
 
-        # Check if the IBAN has the correct length for Montenegro
-        if len(invalid_iban) > 22:
-            invalid_iban = invalid_iban[:22]
+        suggested_iban = await iban_service.suggest_correct_iban(invalid_iban=iban)
+        stage_duration.observe(perf_counter() - validated, STAGE_SUGGESTION)
+        return False, suggested_iban
 
-        if len(invalid_iban) != 22:
-            return None
+    @classmethod
+    async def validate_value(cls, iban: str, country: Optional[str]) -> Tuple[ValidationStatus, Optional[str]]:
+        """Validation status and suggested iban for not valid one"""
+        result = await validation_cache.get(iban, country)
+        if result is None:
+            result = await cls._check_value(iban, country)
+            await validation_cache.set(iban, country, result)
 
-        # Check if the country code and check digits are valid
-        if not invalid_iban[2:].isdigit():
-            return None
+        is_valid, suggested_iban = result
+        status = ValidationStatus.VALID if is_valid else ValidationStatus.NOT_VALID
+        count_validation(iban, country, status)
+        return status, suggested_iban
 
-        suggested_iban = 'ME25' + invalid_iban[4:]
+    @staticmethod
+    async def validate_values(
+        ibans: List[str],
+        country: Optional[str],
+    ) -> List[Tuple[ValidationStatus, Optional[str]]]:
+        """Validate list of ibans, only ibans missing in cache are validated"""
+        # cache and validation see the same normalized iban
+        normalized = [normalize_iban(iban) for iban in ibans]
+        cached = [await validation_cache.get(iban, country) for iban in normalized]
+        started = perf_counter()
+        computed = iter(await validation_pool.validate(
+            [iban for iban, result in zip(normalized, cached) if result is None], country
+        ))
+        # suggestions are computed together with validation in the pool
+        stage_duration.observe(perf_counter() - started, STAGE_VALIDATION)
 
-        return suggested_iban if await self.is_valid(iban=suggested_iban) else None
+        results = []
+        for iban, result in zip(normalized, cached):
+            if result is None:
+                result = next(computed)
+                await validation_cache.set(iban, country, result)
+            is_valid, suggested_iban = result
+            status = ValidationStatus.VALID if is_valid else ValidationStatus.NOT_VALID
+            count_validation(iban, country, status)
+            results.append((status, suggested_iban))
+        return results
 
+    @classmethod
+    async def write_history(cls, rows: List[Dict[str, Any]], session: AsyncSession):
+        """
+        Store history rows without returning them: queued to the history buffer,
+        written together with rows of concurrent requests when they are enabled
+        """
+        if iban_history_buffer.running:
+            for row in rows:
+                await iban_history_buffer.put(row)
+        elif history_coalescer.enabled:
+            await history_coalescer.write(rows, session)
+        else:
+            await cls.store_history(rows, session)
 
-class IbanController:
+    @staticmethod
+    async def store_history(rows: List[Dict[str, Any]], session: AsyncSession):
+        """Insert history rows by the raw driver when it is running, folded into counters by dedup storage"""
+        if history_db_service is IbanDbService and raw_iban_history.running:
+            await raw_iban_history.insert_many(rows)
+        else:
+            await history_db_service.bulk_insert(values=rows, session=session, returning=False)
 
     @staticmethod
+    def _history_without_rows() -> bool:
+        """
+        History is stored by write_history when it is written behind, with concurrent requests,
+        folded into counters or by raw driver, responses are built without db rows then
+        """
+        return (
+            iban_history_buffer.running or history_coalescer.enabled or raw_iban_history.running
+            or history_db_service is not IbanDbService
+        )
+
+    @classmethod
     async def validate_iban(
+        cls,
         payload: ValidateIbanSchema,
         session: AsyncSession,
     ) -> IbanValidationResponse:
         """
         Check if provided iban is valid and return result of validation
-        need to create validation check as a history in db
+        need to create validation check as a history in db.
+        Concurrent requests of the same iban share one validation and history write,
+        every joined request adds its own history row
         """
-        iban_service = MontenegroIbanService()  # hardcoded to montenegro
-        is_valid = await iban_service.is_valid(iban=payload.iban)
-        status = ValidationStatus.VALID if is_valid else ValidationStatus.NOT_VALID
-
-        iban_check = await IbanDbService.create(
-            input_data=CreateIbanCheck(iban=payload.iban, status=status),
-            session=session
+        key = (normalize_iban(payload.iban), payload.country)
+        (status, suggested_iban, created_at), shared = await validation_flight.do(
+            key, lambda: cls._validate_and_store(payload, session)
         )
-        response = IbanValidationResponse.from_orm(iban_check)
-        response.suggested_iban = await iban_service.suggest_correct_iban(
-            invalid_iban=payload.iban) if not is_valid else None
+        if shared:
+            count_validation(payload.iban, payload.country, status)
+            started = perf_counter()
+            created_at = datetime.utcnow()
+            await cls.write_history([{"iban": payload.iban, "status": status, "created_at": created_at}], session)
+            stage_duration.observe(perf_counter() - started, STAGE_DB_WRITE)
+        return cls._build_response(payload.iban, status, suggested_iban, created_at)
 
-        return response
+    @classmethod
+    async def _validate_and_store(
+        cls,
+        payload: ValidateIbanSchema,
+        session: AsyncSession,
+    ) -> Tuple[ValidationStatus, Optional[str], datetime]:
+        """Status, suggested iban and time of the stored history row"""
+        status, suggested_iban = await cls.validate_value(iban=payload.iban, country=payload.country)
+
+        started = perf_counter()
+        if cls._history_without_rows():
+            created_at = datetime.utcnow()
+            await cls.write_history([{"iban": payload.iban, "status": status, "created_at": created_at}], session)
+        else:
+            iban_check = await IbanDbService.create(
+                input_data=CreateIbanCheck(iban=payload.iban, status=status),
+                session=session
+            )
+            created_at = iban_check.created_at
+        stage_duration.observe(perf_counter() - started, STAGE_DB_WRITE)
+        return status, suggested_iban, created_at
+
+    @classmethod
+    def response_item(
+        cls,
+        iban: str,
+        status: ValidationStatus,
+        suggested_iban: Optional[str],
+        created_at: datetime,
+    ) -> Dict[str, Any]:
+        """Fields of IbanValidationResponse as a plain dict ready for json dump"""
+        bank = cls._bank(iban, status)
+        return {
+            "status": status,
+            "iban": iban,
+            "suggested_iban": suggested_iban,
+            "created_at": created_at,
+            "bank_code": bank.bank_code if bank else None,
+            "bic": bank.bic if bank else None,
+            "bank_name": bank.name if bank else None,
+        }
+
+    @classmethod
+    async def _render_items(
+        cls,
+        ibans: List[str],
+        results: List[Tuple[ValidationStatus, Optional[str]]],
+        created_at: datetime,
+    ) -> AsyncIterator[bytes]:
+        yield b'['
+        for start in range(0, len(ibans), cls.stream_chunk_size):
+            items: List[Dict[str, Any]] = []
+            for iban, (status, suggested_iban) in zip(
+                ibans[start:start + cls.stream_chunk_size], results[start:start + cls.stream_chunk_size]
+            ):
+                items.append(cls.response_item(iban, status, suggested_iban, created_at))
+            # items of the chunk without array brackets
+            yield (b',' if start else b'') + orjson.dumps(items)[1:-1]
+        yield b']'
+
+    @classmethod
+    async def stream_ibans(
+        cls,
+        payload: ValidateIbansSchema,
+        session: AsyncSession,
+    ) -> AsyncIterator[bytes]:
+        """
+        Validate list of ibans in one pass and store the whole history with a single write.
+        Large lists are validated in the process pool. Results are rendered to json array
+        in input order by chunks while the response is sent, so response objects of the whole
+        list are never built
+        """
+        results = await cls.validate_values(payload.ibans, payload.country)
+
+        started = perf_counter()
+        created_at = datetime.utcnow()
+        await cls.write_history([
+            {"iban": iban, "status": status, "created_at": created_at}
+            for iban, (status, _) in zip(payload.ibans, results)
+        ], session)
+        stage_duration.observe(perf_counter() - started, STAGE_DB_WRITE)
+        return cls._render_items(payload.ibans, results, created_at)
 
     @staticmethod
     async def validate_partial_iban(payload: ValidateIbanSchema) -> IbanPartialValidationResponse:
-        iban_service = MontenegroIbanService  # hardcoded to montenegro
-        is_valid = await iban_service.is_valid_partial_iban(partial_iban=payload.iban)
-
-        return IbanPartialValidationResponse(
-            status=ValidationStatus.VALID if is_valid else ValidationStatus.NOT_VALID
+        result = check_partial_iban(payload.iban, payload.country)
+        return IbanPartialValidationResponse.construct(
+            status=ValidationStatus.VALID if result.is_valid else ValidationStatus.NOT_VALID,
+            remaining_length=result.remaining_length,
+            next_char_class=result.next_char_class,
         )
+
+
+validation_flight: SingleFlight[Tuple[ValidationStatus, Optional[str], datetime]] = SingleFlight("validation")
+
+history_coalescer = WriteCoalescer(
+    "history",
+    IbanController.store_history,
+    window=settings.HISTORY_COALESCE_WINDOW,
+    enabled=settings.HISTORY_WRITE_MODE == "coalesced",
+)
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import signal
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.core.crud import ValidationJobDbService, history_db_service
+from server.core.database import async_session
+from server.core.enums import JobStatus, ValidationStatus
+from server.core.models import ValidationJobModel
+from server.core.settings import SettingsValidation
+from server.iban.formats import read_ibans_stream
+from server.iban.services.iban import IbanController
+from server.iban.validation import IBAN_REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+def render_results(ibans: List[str], results: List[Tuple[ValidationStatus, Optional[str]]]) -> str:
+    """Ndjson lines of chunk results"""
+    return b''.join(
+        orjson.dumps({'iban': iban, 'status': status, 'suggested_iban': suggested_iban}) + b'\n'
+        for iban, (status, suggested_iban) in zip(ibans, results)
+    ).decode()
+
+
+class JobController:
+
+    @staticmethod
+    async def upload(
+        stream: AsyncIterator[bytes],
+        input_format: str,
+        session: AsyncSession,
+        field: str = 'iban',
+        country: Optional[str] = None,
+        chunk_size: int = 5000,
+    ) -> ValidationJobModel:
+        """
+        Store ibans of uploaded file as job chunks while the body is received,
+        the job is visible to workers once the whole file is stored
+        """
+        if country is not None and country.upper() not in IBAN_REGISTRY:
+            raise HTTPException(status_code=400, detail=f"Unknown country {country}")
+        job_id = await ValidationJobDbService.create_job(country=country, session=session)
+        total, number, pending = 0, 0, []
+        try:
+            async for ibans in read_ibans_stream(stream, input_format, field):
+                pending.extend(ibans)
+                while len(pending) >= chunk_size:
+                    await ValidationJobDbService.add_chunk(job_id, number, pending[:chunk_size], session)
+                    del pending[:chunk_size]
+                    total, number = total + chunk_size, number + 1
+            if pending:
+                await ValidationJobDbService.add_chunk(job_id, number, pending, session)
+                total, number = total + len(pending), number + 1
+        except (ValueError, TypeError):
+            # broken utf-8, not a json line, iban is not a string
+            await session.rollback()
+            raise HTTPException(status_code=400, detail=f"Invalid {input_format} file")
+
+        await ValidationJobDbService.finish_upload(job_id, total=total, total_chunks=number, session=session)
+        return await ValidationJobDbService.retrieve(job_id, session)
+
+    @staticmethod
+    async def get_job(job_id: int, session: AsyncSession) -> ValidationJobModel:
+        return await ValidationJobDbService.retrieve(job_id, session)
+
+    @staticmethod
+    async def stream_results(job_id: int, session: AsyncSession) -> AsyncIterator[str]:
+        """Ndjson results of done job in upload order, checked before streaming starts"""
+        job = await ValidationJobDbService.retrieve(job_id, session)
+        if job.status != JobStatus.DONE:
+            raise HTTPException(status_code=409, detail=f"Job is {job.status.value.lower()}")
+        return ValidationJobDbService.stream_results(job_id, session)
+
+
+class JobWorker:
+    """
+    Background validation of job chunks. Every chunk is claimed, validated and
+    committed with its results, job progress and history in one transaction,
+    so a restarted worker resumes jobs from the last committed chunk
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session,
+        concurrency: int = 1,
+        poll_interval: float = 1.0,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._stopping: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_settings(cls, settings: SettingsValidation = None) -> 'JobWorker':
+        settings = settings or SettingsValidation()
+        return cls(concurrency=settings.JOB_WORKERS, poll_interval=settings.JOB_POLL_INTERVAL)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Start workers, must be called in the serving event loop"""
+        if self.concurrency <= 0 or self.running:
+            return
+        self._stopping = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """Wait for chunks in progress and stop workers"""
+        if not self.running:
+            return
+        self._stopping.set()
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+
+    async def process_chunk(self) -> bool:
+        """Validate the next chunk of the queue, False when the queue is empty"""
+        async with self.session_factory() as session:
+            chunk = await ValidationJobDbService.claim_chunk(session)
+            if chunk is None:
+                return False
+            try:
+                ibans = chunk.ibans.split('\n')
+                results = await IbanController.validate_values(ibans, chunk.country)
+                await ValidationJobDbService.complete_chunk(
+                    job_id=chunk.job_id,
+                    number=chunk.number,
+                    results=render_results(ibans, results),
+                    count=len(ibans),
+                    valid=sum(status == ValidationStatus.VALID for status, _ in results),
+                    session=session,
+                )
+                await history_db_service.bulk_insert(
+                    values=[{'iban': iban, 'status': status} for iban, (status, _) in zip(ibans, results)],
+                    session=session,
+                    returning=False,
+                )
+                await session.commit()
+            except Exception as error:
+                logger.exception('Validation of chunk %s of job %s failed', chunk.number, chunk.job_id)
+                await session.rollback()
+                await ValidationJobDbService.fail_job(chunk.job_id, str(error) or type(error).__name__, session)
+            return True
+
+    async def _wait(self, timeout: float) -> bool:
+        """Sleep until timeout or stop, True when stopping"""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._stopping.is_set()
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                claimed = await self.process_chunk()
+            except Exception:
+                logger.exception('Job queue is not available')
+                claimed = False
+            if not claimed and await self._wait(self.poll_interval):
+                return
+
+    async def run_forever(self):
+        """Standalone workers, stopped by SIGINT or SIGTERM after chunks in progress are committed"""
+        await self.start()
+        if not self.running:
+            return
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self._stopping.set)
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+
+
+job_worker = JobWorker.from_settings()
@@ -0,0 +1,43 @@
+from typing import List, Optional
+
+from server.core.enums import ValidationStatus
+from server.core.metrics import CollectedMetric, registry
+from server.iban.services.cache import validation_cache
+from server.iban.validation import IBAN_REGISTRY, normalize_iban
+
+stage_duration = registry.histogram(
+    'iban_stage_duration_seconds', 'Time spent in stages of iban validation', labels=('stage',)
+)
+validations = registry.counter(
+    'iban_validations_total', 'Validation outcomes by country and status', labels=('country', 'status')
+)
+
+STAGE_NORMALIZATION = 'normalization'
+STAGE_VALIDATION = 'validation'
+STAGE_SUGGESTION = 'suggestion'
+STAGE_DB_WRITE = 'db_write'
+
+# ibans of unsupported countries are counted together to keep number of labels bounded
+UNKNOWN_COUNTRY = 'unknown'
+
+
+def country_label(iban: str, country: Optional[str] = None) -> str:
+    country_code = (country or normalize_iban(iban)[:2]).upper()
+    return country_code if country_code in IBAN_REGISTRY else UNKNOWN_COUNTRY
+
+
+def count_validation(iban: str, country: Optional[str], status: ValidationStatus):
+    validations.inc(country_label(iban, country), status.value)
+
+
+def collect_cache_metrics() -> List[CollectedMetric]:
+    metrics = []
+    for name, value in validation_cache.stats().items():
+        # size is the only gauge, other stats only grow
+        metric_type, metric_name = ('gauge', f'iban_validation_cache_{name}') if name == 'size' \
+            else ('counter', f'iban_validation_cache_{name}_total')
+        metrics.append((metric_name, metric_type, f'Validation cache {name}', [(metric_name, {}, value)]))
+    return metrics
+
+
+registry.register_collector(collect_cache_metrics)
@@ -0,0 +1,3 @@
+from server.iban.pool import ValidationPool
+
+validation_pool = ValidationPool.from_settings()
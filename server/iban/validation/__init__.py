@@ -0,0 +1,14 @@
+"""
+Synchronous iban validation without web and database dependencies,
+countries are compiled on the first use. The async service layer wraps it.
+"""
+from .checksum import (calculate_check_digits, iban_remainder,
+                       is_valid_checksum, mod97)
+from .correction import Correction, suggest_corrections
+from .partial import PartialCheck, check_partial_iban
+from .registry import (BANK_CODE_POSITIONS, CHARACTER_SETS, IBAN_REGISTRY,
+                       CheckCode, CountryRegistry, CountrySpec, check_iban,
+                       get_bank_code, get_country_spec, is_valid_iban,
+                       normalize_iban)
+from .validator import (ValidationResult, get_spec_for, suggest_iban,
+                        validate_iban, validate_ibans)
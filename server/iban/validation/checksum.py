@@ -0,0 +1,59 @@
+"""
+ISO 7064 MOD 97-10 checksum used by IBAN check digits.
+
+Letters are expanded to two digits (A=10 ... Z=35), so instead of building the
+numeric string the remainder is folded char by char through a precomputed
+transition table: ``_TRANSITIONS[char][remainder]`` is the remainder after
+appending ``char`` to a number with the given remainder.
+"""
+from string import ascii_uppercase, digits
+from typing import Dict, Tuple
+
+CHAR_VALUES: Dict[str, int] = {
+    **{char: value for value, char in enumerate(digits)},
+    **{char: value for value, char in enumerate(ascii_uppercase, start=10)},
+}
+
+_TRANSITIONS: Dict[str, Tuple[int, ...]] = {
+    char: tuple(
+        (remainder * (10 if value < 10 else 100) + value) % 97
+        for remainder in range(97)
+    )
+    for char, value in CHAR_VALUES.items()
+}
+
+
+def mod97(value: str, remainder: int = 0) -> int:
+    """
+    Remainder of the numeric expansion of value divided by 97.
+    Value must be normalized (uppercase alphanumeric), remainder allows to
+    continue calculation started on a previous part of the string
+    """
+    if value.isdecimal():
+        # int parsing is done in C and is way faster than any python loop
+        return (remainder * pow(10, len(value), 97) + int(value)) % 97
+
+    transitions = _TRANSITIONS
+    for char in value:
+        remainder = transitions[char][remainder]
+    return remainder
+
+
+def iban_remainder(iban: str) -> int:
+    """Remainder of rearranged (BBAN + country code + check digits) iban"""
+    remainder = mod97(iban[4:])
+    transitions = _TRANSITIONS
+    for char in iban[:4]:
+        remainder = transitions[char][remainder]
+    return remainder
+
+
+def is_valid_checksum(iban: str) -> bool:
+    """Check digits of normalized iban are correct"""
+    return iban_remainder(iban) == 1
+
+
+def calculate_check_digits(country_code: str, bban: str) -> str:
+    """Check digits for given country code and BBAN"""
+    remainder = mod97(country_code + '00', mod97(bban))
+    return f'{98 - remainder:02d}'
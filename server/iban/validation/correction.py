@@ -0,0 +1,149 @@
+"""
+Correction of mistyped ibans.
+
+Candidates are single character substitutions, transpositions of adjacent
+characters and recalculated check digits. Checksum of a candidate is never
+recalculated from scratch: remainders of every prefix and suffix of the
+rearranged iban are computed once, so the remainder of an edited iban is
+combined from them in O(1). For substitutions the only character making the
+remainder equal to 1 is solved directly with the modular inverse of the
+position weight, so every position is O(1) instead of trying every character.
+Only candidates passing the checksum are validated completely.
+"""
+from typing import Dict, List, NamedTuple, Tuple
+
+from .checksum import CHAR_VALUES, calculate_check_digits, iban_remainder
+from .registry import CountrySpec, normalize_iban
+
+# letters are expanded to two digits, so the longest iban has at most 68 digits
+_MAX_DIGITS = 70
+_POW10 = [pow(10, power, 97) for power in range(_MAX_DIGITS)]
+# modular inverse by Fermat's little theorem, 97 is prime
+_INV_POW10 = [pow(value, 95, 97) for value in _POW10]
+_VALUE_CHARS = {value: char for char, value in CHAR_VALUES.items()}
+
+FORMAT = 'format'
+SUBSTITUTION = 'substitution'
+TRANSPOSITION = 'transposition'
+CHECK_DIGITS = 'check_digits'
+
+# preferred kind of correction when the number of changed characters is equal
+_KIND_ORDER = {FORMAT: 0, CHECK_DIGITS: 1, SUBSTITUTION: 2, TRANSPOSITION: 3}
+
+
+class Correction(NamedTuple):
+    iban: str
+    kind: str
+    # index of the first edited character of the iban
+    position: int
+    # number of edits, transposition is a single edit
+    cost: int
+
+    @property
+    def changes_bban(self) -> bool:
+        return self.position >= 4 or (self.kind == TRANSPOSITION and self.position == 3)
+
+    @property
+    def rank(self) -> Tuple[int, bool, int, int]:
+        # the less edits the better, then suggestions keeping the account number (BBAN) win
+        return self.cost, self.changes_bban, _KIND_ORDER[self.kind], self.position
+
+
+# number of digits of the expanded character allowed by the character class
+_CLASS_DIGITS = {'n': (1,), 'a': (2,), 'c': (1, 2)}
+
+
+def _substitutions(iban: str, spec: CountrySpec) -> List[Correction]:
+    length = len(iban)
+    rearranged = iban[4:] + iban[:4]
+    values = [CHAR_VALUES[char] for char in rearranged]
+    digits = [1 if value < 10 else 2 for value in values]
+    pow10 = _POW10
+
+    # remainder of rearranged[:i]
+    prefixes = [0] * (length + 1)
+    for i, value in enumerate(values):
+        prefixes[i + 1] = (prefixes[i] * pow10[digits[i]] + value) % 97
+    # remainder and number of digits of rearranged[i:]
+    suffixes, suffix_digits = [0] * (length + 1), [0] * (length + 1)
+    for i in range(length - 1, -1, -1):
+        suffixes[i] = (values[i] * pow10[suffix_digits[i + 1]] + suffixes[i + 1]) % 97
+        suffix_digits[i] = suffix_digits[i + 1] + digits[i]
+
+    corrections = []
+    structure = spec.structure[4:] + spec.structure[:4]
+    for i in range(length - 4):
+        tail_digits = suffix_digits[i + 1]
+        for char_digits in _CLASS_DIGITS[structure[i]]:
+            # prefix * 10^(char digits + tail) + value * 10^tail + suffix = 1 (mod 97)
+            rest = prefixes[i] * pow10[char_digits + tail_digits] + suffixes[i + 1]
+            value = (1 - rest) * _INV_POW10[tail_digits] % 97
+            if (value < 10) == (char_digits == 1) and value < 36 and value != values[i]:
+                position = i + 4
+                char = _VALUE_CHARS[value]
+                corrections.append(Correction(iban[:position] + char + iban[position + 1:], SUBSTITUTION, position, 1))
+    # check digits, country code is not corrected
+    for i in (length - 2, length - 1):
+        rest = prefixes[i] * pow10[1 + suffix_digits[i + 1]] + suffixes[i + 1]
+        value = (1 - rest) * _INV_POW10[suffix_digits[i + 1]] % 97
+        if value < 10 and value != values[i]:
+            position = i + 4 - length
+            candidate = iban[:position] + str(value) + iban[position + 1:]
+            corrections.append(Correction(candidate, SUBSTITUTION, position, 1))
+
+    for i in range(length - 5):
+        first, second = values[i], values[i + 1]
+        if first == second:
+            continue
+        tail_digits = suffix_digits[i + 2]
+        remainder = (
+            prefixes[i] * pow10[digits[i] + digits[i + 1] + tail_digits]
+            + second * pow10[digits[i] + tail_digits]
+            + first * pow10[tail_digits]
+            + suffixes[i + 2]
+        ) % 97
+        if remainder == 1:
+            position = i + 4
+            corrections.append(Correction(
+                iban[:position] + iban[position + 1] + iban[position] + iban[position + 2:],
+                TRANSPOSITION, position, 1
+            ))
+
+    # check digits and the last check digit with the first BBAN character, which
+    # are not adjacent in the rearranged iban
+    for position in (2, 3):
+        if iban[position] != iban[position + 1]:
+            candidate = iban[:position] + iban[position + 1] + iban[position] + iban[position + 2:]
+            if iban_remainder(candidate) == 1:
+                corrections.append(Correction(candidate, TRANSPOSITION, position, 1))
+
+    return corrections
+
+
+def suggest_corrections(invalid_iban: str, spec: CountrySpec, limit: int = 5) -> List[Correction]:
+    """
+    Valid ibans of the country closest to the invalid one, best first.
+    Extra characters are cut and country code is replaced by the country one
+    """
+    iban = normalize_iban(invalid_iban)[:spec.length]
+    iban = spec.country_code + iban[2:]
+    if len(iban) != spec.length or not (iban.isascii() and iban.isalnum()):
+        return []
+
+    if spec.is_valid(iban):
+        return [Correction(iban, FORMAT, 0, 0)]
+
+    check_digits = calculate_check_digits(spec.country_code, iban[4:])
+    candidates = _substitutions(iban, spec)
+    candidates.append(Correction(
+        spec.country_code + check_digits + iban[4:], CHECK_DIGITS, 2,
+        sum(old != new for old, new in zip(iban[2:4], check_digits))
+    ))
+
+    corrections: Dict[str, Correction] = {}
+    for correction in sorted(candidates, key=lambda candidate: candidate.rank):
+        if correction.iban not in corrections and spec.is_valid(correction.iban):
+            corrections[correction.iban] = correction
+            if len(corrections) == limit:
+                break
+    return list(corrections.values())
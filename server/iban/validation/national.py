@@ -0,0 +1,144 @@
+"""
+National check digit rules applied to the BBAN after the IBAN checksum.
+Only well documented rules are implemented, countries that are not listed
+here are validated by IBAN structure and checksum only.
+"""
+from string import ascii_uppercase, digits
+from typing import Callable, Dict
+
+from .checksum import mod97
+
+NationalCheck = Callable[[str], bool]
+
+_ES_WEIGHTS = (1, 2, 4, 8, 5, 10, 9, 7, 3, 6)
+_NO_WEIGHTS = (5, 4, 3, 2, 7, 6, 5, 4, 3, 2)
+_CZ_PREFIX_WEIGHTS = (10, 5, 8, 4, 2, 1)
+_CZ_ACCOUNT_WEIGHTS = (6, 3, 7, 9, 10, 5, 8, 4, 2, 1)
+_PL_WEIGHTS = (3, 9, 7, 1, 3, 9, 7, 1)
+_HU_WEIGHTS = (9, 7, 3, 1)
+
+# French RIB letters substitution: A-I, J-R -> 1-9, S-Z -> 2-9
+_RIB_TRANSLATION = str.maketrans(ascii_uppercase, '123456789' '123456789' '23456789')
+
+# Italian CIN values of characters placed at odd (1-based) positions
+_CIN_ODD_VALUES = (1, 0, 5, 7, 9, 13, 15, 17, 19, 21, 2, 4, 18, 20, 11, 3, 6, 8, 12, 14, 16, 10, 22, 25, 24, 23)
+_CIN_INDEX = {
+    **{char: value for value, char in enumerate(digits)},
+    **{char: value for value, char in enumerate(ascii_uppercase)},
+}
+
+
+def _weighted_sum(value: str, weights) -> int:
+    return sum(int(char) * weight for char, weight in zip(value, weights))
+
+
+def _mod11_es(value: str) -> int:
+    check = 11 - _weighted_sum(value, _ES_WEIGHTS) % 11
+    return {10: 1, 11: 0}.get(check, check)
+
+
+def _mod11_10(value: str) -> bool:
+    """ISO 7064 MOD 11,10 for value with trailing check digit"""
+    product = 10
+    for char in value[:-1]:
+        total = (int(char) + product) % 10 or 10
+        product = total * 2 % 11
+    return (11 - product) % 10 == int(value[-1])
+
+
+def _luhn(value: str) -> bool:
+    total = 0
+    for position, char in enumerate(reversed(value)):
+        number = int(char)
+        if position % 2:
+            number = number * 2 - 9 if number > 4 else number * 2
+        total += number
+    return total % 10 == 0
+
+
+def check_mod97_10(bban: str) -> bool:
+    """Whole BBAN is ISO 7064 MOD 97-10 valid (ME, RS, SI, MK, BA, PT, TL)"""
+    return mod97(bban) == 1
+
+
+def check_belgium(bban: str) -> bool:
+    return (int(bban[:10]) % 97 or 97) == int(bban[10:])
+
+
+def check_france(bban: str) -> bool:
+    """RIB key of bank, branch and account"""
+    rib = bban.translate(_RIB_TRANSLATION)
+    bank, branch, account, key = int(rib[:5]), int(rib[5:10]), int(rib[10:21]), int(rib[21:])
+    return 97 - (89 * bank + 15 * branch + 3 * account) % 97 == key
+
+
+def check_spain(bban: str) -> bool:
+    return (
+        _mod11_es('00' + bban[:8]) == int(bban[8])
+        and _mod11_es(bban[10:]) == int(bban[9])
+    )
+
+
+def check_italy(bban: str) -> bool:
+    """CIN letter calculated over ABI, CAB and account number"""
+    total = sum(
+        _CIN_INDEX[char] if position % 2 else _CIN_ODD_VALUES[_CIN_INDEX[char]]
+        for position, char in enumerate(bban[1:])
+    )
+    return ascii_uppercase[total % 26] == bban[0]
+
+
+def check_norway(bban: str) -> bool:
+    check = 11 - _weighted_sum(bban, _NO_WEIGHTS) % 11
+    return check != 10 and check % 11 == int(bban[-1])
+
+
+def check_finland(bban: str) -> bool:
+    return _luhn(bban)
+
+
+def check_croatia(bban: str) -> bool:
+    return _mod11_10(bban[:7]) and _mod11_10(bban[7:])
+
+
+def check_czech(bban: str) -> bool:
+    """Account prefix and number are mod 11 valid (CZ, SK)"""
+    return (
+        _weighted_sum(bban[4:10], _CZ_PREFIX_WEIGHTS) % 11 == 0
+        and _weighted_sum(bban[10:], _CZ_ACCOUNT_WEIGHTS) % 11 == 0
+    )
+
+
+def check_poland(bban: str) -> bool:
+    return _weighted_sum(bban[:8], _PL_WEIGHTS) % 10 == 0
+
+
+def check_hungary(bban: str) -> bool:
+    return (
+        _weighted_sum(bban[:8], _HU_WEIGHTS * 2) % 10 == 0
+        and _weighted_sum(bban[8:], _HU_WEIGHTS * 4) % 10 == 0
+    )
+
+
+NATIONAL_CHECKS: Dict[str, NationalCheck] = {
+    'BA': check_mod97_10,
+    'BE': check_belgium,
+    'CZ': check_czech,
+    'ES': check_spain,
+    'FI': check_finland,
+    'FR': check_france,
+    'HR': check_croatia,
+    'HU': check_hungary,
+    'IT': check_italy,
+    'MC': check_france,
+    'ME': check_mod97_10,
+    'MK': check_mod97_10,
+    'NO': check_norway,
+    'PL': check_poland,
+    'PT': check_mod97_10,
+    'RS': check_mod97_10,
+    'SI': check_mod97_10,
+    'SK': check_czech,
+    'SM': check_italy,
+    'TL': check_mod97_10,
+}
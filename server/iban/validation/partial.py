@@ -0,0 +1,89 @@
+"""
+Validation of incomplete ibans typed by users.
+
+Requests carry the whole prefix, so the check is stateless: the prefix is
+completed with a filler valid for the country structure and matched by the
+compiled country regex in a single call.
+"""
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from .registry import IBAN_REGISTRY, CountrySpec, normalize_iban
+
+CLASS_NAMES = {
+    'n': 'digit',
+    'a': 'letter',
+    'c': 'alphanumeric',
+}
+
+
+class _CountryTable(dict):
+    """Value derived from the country spec, built on the first lookup of the country"""
+
+    def __init__(self, build: Callable[[CountrySpec], Any]):
+        super().__init__()
+        self.build = build
+
+    def __missing__(self, country_code: str) -> Any:
+        value = self[country_code] = self.build(IBAN_REGISTRY[country_code])
+        return value
+
+
+# the most simple iban of the country structure, tail of it completes prefix to the full length
+_FILLERS: Dict[str, str] = _CountryTable(
+    lambda spec: spec.country_code + ''.join('A' if char_class == 'a' else '0' for char_class in spec.structure[2:])
+)
+
+# beginnings of country codes: empty, the first letter and complete codes
+_COUNTRY_PREFIXES = frozenset(
+    [''] + [country_code[:1] for country_code in IBAN_REGISTRY] + list(IBAN_REGISTRY)
+)
+
+
+class PartialCheck(NamedTuple):
+    # prefix can be completed to a valid iban, complete iban is valid
+    is_valid: bool
+    country_code: Optional[str] = None
+    # number of characters to type, unknown before country code is typed
+    remaining_length: Optional[int] = None
+    # class of the next character, None for complete or invalid iban
+    next_char_class: Optional[str] = None
+
+
+_INVALID = PartialCheck(False)
+
+
+def _valid_check_digits(check_digits: str) -> bool:
+    # 98 - remainder, so 00, 01 and 99 are never calculated
+    return '02' <= check_digits <= '98'
+
+
+def _country_prefix_check(iban: str, country: Optional[str]) -> PartialCheck:
+    """Check of the prefix shorter than country code"""
+    if country:
+        spec = IBAN_REGISTRY.get(country.upper())
+        if spec is None or not spec.country_code.startswith(iban):
+            return _INVALID
+        return PartialCheck(True, spec.country_code, spec.length - len(iban), CLASS_NAMES['a'])
+    if iban not in _COUNTRY_PREFIXES:
+        return _INVALID
+    return PartialCheck(True, None, None, CLASS_NAMES['a'])
+
+
+def check_partial_iban(partial_iban: str, country: Optional[str] = None) -> PartialCheck:
+    """Check if partial iban can be a beginning of a valid iban"""
+    iban = normalize_iban(partial_iban)
+    if len(iban) < 2:
+        return _country_prefix_check(iban, country)
+
+    spec = IBAN_REGISTRY.get(iban[:2])
+    if spec is None or (country and country.upper() != spec.country_code):
+        return _INVALID
+
+    length = len(iban)
+    if length > spec.length or spec.pattern.fullmatch(iban + _FILLERS[spec.country_code][length:]) is None:
+        return PartialCheck(False, spec.country_code)
+    if length >= 4 and not _valid_check_digits(iban[2:4]):
+        return PartialCheck(False, spec.country_code)
+    if length == spec.length:
+        return PartialCheck(spec.is_valid(iban), spec.country_code, 0)
+    return PartialCheck(True, spec.country_code, spec.length - length, CLASS_NAMES[spec.structure[length]])
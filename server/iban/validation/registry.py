@@ -0,0 +1,274 @@
+"""
+IBAN registry: length and BBAN structure of every country from the SWIFT
+IBAN registry. Every country is compiled once, on the first lookup, into
+a CountrySpec holding precompiled regular expression of the full iban and
+per-position character classes, so import does not pay for countries
+that are never validated.
+"""
+import re
+from enum import IntEnum
+from itertools import groupby
+from string import ascii_uppercase, digits
+from typing import Dict, FrozenSet, Iterator, Mapping, Optional, Pattern, Tuple
+
+from .checksum import is_valid_checksum
+from .national import NATIONAL_CHECKS, NationalCheck
+
+# n - digits, a - upper case letters, c - upper case alphanumeric
+CHARACTER_CLASSES = {
+    'n': '[0-9]',
+    'a': '[A-Z]',
+    'c': '[A-Z0-9]',
+}
+
+CHARACTER_SETS: Dict[str, FrozenSet[str]] = {
+    'n': frozenset(digits),
+    'a': frozenset(ascii_uppercase),
+    'c': frozenset(digits + ascii_uppercase),
+}
+
+_BBAN_FORMAT_RE = re.compile(r'(\d+)!([nac])')
+
+# BBAN format of each country in SWIFT notation
+BBAN_FORMATS: Dict[str, str] = {
+    'AD': '4!n4!n12!c',
+    'AE': '3!n16!n',
+    'AL': '8!n16!c',
+    'AT': '5!n11!n',
+    'AZ': '4!a20!c',
+    'BA': '3!n3!n8!n2!n',
+    'BE': '3!n7!n2!n',
+    'BG': '4!a4!n2!n8!c',
+    'BH': '4!a14!c',
+    'BI': '5!n5!n11!n2!n',
+    'BR': '8!n5!n10!n1!a1!c',
+    'BY': '4!c4!n16!c',
+    'CH': '5!n12!c',
+    'CR': '4!n14!n',
+    'CY': '3!n5!n16!c',
+    'CZ': '4!n6!n10!n',
+    'DE': '8!n10!n',
+    'DJ': '5!n5!n11!n2!n',
+    'DK': '4!n9!n1!n',
+    'DO': '4!c20!n',
+    'EE': '2!n2!n11!n1!n',
+    'EG': '4!n4!n17!n',
+    'ES': '4!n4!n1!n1!n10!n',
+    'FI': '3!n11!n',
+    'FK': '2!a12!n',
+    'FO': '4!n9!n1!n',
+    'FR': '5!n5!n11!c2!n',
+    'GB': '4!a6!n8!n',
+    'GE': '2!a16!n',
+    'GI': '4!a15!c',
+    'GL': '4!n9!n1!n',
+    'GR': '3!n4!n16!c',
+    'GT': '4!c20!c',
+    'HR': '7!n10!n',
+    'HU': '3!n4!n1!n15!n1!n',
+    'IE': '4!a6!n8!n',
+    'IL': '3!n3!n13!n',
+    'IQ': '4!a3!n12!n',
+    'IS': '4!n2!n6!n10!n',
+    'IT': '1!a5!n5!n12!c',
+    'JO': '4!a4!n18!c',
+    'KW': '4!a22!c',
+    'KZ': '3!n13!c',
+    'LB': '4!n20!c',
+    'LC': '4!a24!c',
+    'LI': '5!n12!c',
+    'LT': '5!n11!n',
+    'LU': '3!n13!c',
+    'LV': '4!a13!c',
+    'LY': '3!n3!n15!n',
+    'MC': '5!n5!n11!c2!n',
+    'MD': '2!c18!c',
+    'ME': '3!n13!n2!n',
+    'MK': '3!n10!c2!n',
+    'MN': '4!n12!n',
+    'MR': '5!n5!n11!n2!n',
+    'MT': '4!a5!n18!c',
+    'MU': '4!a2!n2!n12!n3!n3!a',
+    'NI': '4!a20!n',
+    'NL': '4!a10!n',
+    'NO': '4!n6!n1!n',
+    'OM': '3!n16!c',
+    'PK': '4!a16!c',
+    'PL': '8!n16!n',
+    'PS': '4!a21!c',
+    'PT': '4!n4!n11!n2!n',
+    'QA': '4!a21!c',
+    'RO': '4!a16!c',
+    'RS': '3!n13!n2!n',
+    'RU': '9!n5!n15!c',
+    'SA': '2!n18!c',
+    'SC': '4!a2!n2!n16!n3!a',
+    'SD': '2!n12!n',
+    'SE': '3!n16!n1!n',
+    'SI': '5!n8!n2!n',
+    'SK': '4!n6!n10!n',
+    'SM': '1!a5!n5!n12!c',
+    'SO': '4!n3!n12!n',
+    'ST': '4!n4!n11!n2!n',
+    'SV': '4!a20!n',
+    'TL': '3!n14!n2!n',
+    'TN': '2!n3!n13!n2!n',
+    'TR': '5!n1!n16!c',
+    'UA': '6!n19!c',
+    'VA': '3!n15!n',
+    'VG': '4!a16!n',
+    'XK': '4!n10!n2!n',
+}
+
+
+# position of the bank identifier within the BBAN (start, end)
+BANK_CODE_POSITIONS: Dict[str, Tuple[int, int]] = {
+    'AD': (0, 4), 'AT': (0, 5), 'BA': (0, 3), 'BE': (0, 3), 'BG': (0, 4), 'CH': (0, 5),
+    'CY': (0, 3), 'CZ': (0, 4), 'DE': (0, 8), 'DK': (0, 4), 'EE': (0, 2), 'ES': (0, 4),
+    'FI': (0, 3), 'FR': (0, 5), 'GB': (0, 4), 'GI': (0, 4), 'GR': (0, 3), 'HR': (0, 7),
+    'HU': (0, 3), 'IE': (0, 4), 'IT': (1, 6), 'LI': (0, 5), 'LT': (0, 5), 'LU': (0, 3),
+    'LV': (0, 4), 'MC': (0, 5), 'ME': (0, 3), 'MK': (0, 3), 'MT': (0, 4), 'NL': (0, 4),
+    'NO': (0, 4), 'PL': (0, 8), 'PT': (0, 4), 'RO': (0, 4), 'RS': (0, 3), 'SE': (0, 3),
+    'SI': (0, 5), 'SK': (0, 4), 'SM': (1, 6),
+}
+
+
+class CheckCode(IntEnum):
+    """Result of iban check, the first failed step is reported"""
+    VALID = 0
+    UNKNOWN_COUNTRY = 1
+    COUNTRY_MISMATCH = 2
+    INVALID_LENGTH = 3
+    INVALID_STRUCTURE = 4
+    INVALID_CHECKSUM = 5
+    INVALID_NATIONAL_CHECK = 6
+
+
+class CountrySpec:
+    """Compiled IBAN structure of a single country"""
+    __slots__ = ('country_code', 'length', 'bban_format', 'structure', 'pattern', 'national_check')
+
+    def __init__(self, country_code: str, bban_format: str,
+                 national_check: Optional[NationalCheck] = None):
+        self.country_code = country_code
+        self.bban_format = bban_format
+        # character class of every position of the iban
+        self.structure: str = 'aann' + ''.join(
+            char_class * int(count) for count, char_class in _BBAN_FORMAT_RE.findall(bban_format)
+        )
+        self.length: int = len(self.structure)
+        self.pattern: Pattern[str] = re.compile(country_code + ''.join(
+            f'{CHARACTER_CLASSES[char_class]}{{{len(list(group))}}}'
+            for char_class, group in groupby(self.structure[2:])
+        ))
+        self.national_check = national_check
+
+    def __repr__(self) -> str:
+        return f'CountrySpec({self.country_code!r}, {self.bban_format!r})'
+
+    def matches(self, iban: str) -> bool:
+        """Normalized iban has the length and structure of the country"""
+        return len(iban) == self.length and self.pattern.fullmatch(iban) is not None
+
+    def check(self, iban: str) -> CheckCode:
+        """Check structure, checksum and national check digits of normalized iban"""
+        if len(iban) != self.length:
+            return CheckCode.INVALID_LENGTH
+        if self.pattern.fullmatch(iban) is None:
+            return CheckCode.INVALID_STRUCTURE
+        if not is_valid_checksum(iban):
+            return CheckCode.INVALID_CHECKSUM
+        if self.national_check is not None and not self.national_check(iban[4:]):
+            return CheckCode.INVALID_NATIONAL_CHECK
+        return CheckCode.VALID
+
+    def is_valid(self, iban: str) -> bool:
+        """Normalized iban matches structure, checksum and national check digits"""
+        return self.check(iban) == CheckCode.VALID
+
+
+class CountryRegistry(Mapping[str, CountrySpec]):
+    """Specs of BBAN formats by country code, a spec is compiled on the first lookup"""
+
+    def __init__(self, bban_formats: Dict[str, str]):
+        self.bban_formats = bban_formats
+        self._specs: Dict[str, CountrySpec] = {}
+
+    def _compile(self, country_code: str) -> CountrySpec:
+        spec = self._specs[country_code] = CountrySpec(
+            country_code, self.bban_formats[country_code], NATIONAL_CHECKS.get(country_code)
+        )
+        return spec
+
+    def __getitem__(self, country_code: str) -> CountrySpec:
+        spec = self._specs.get(country_code)
+        return spec if spec is not None else self._compile(country_code)
+
+    def get(self, country_code: str, default: Optional[CountrySpec] = None) -> Optional[CountrySpec]:
+        spec = self._specs.get(country_code)
+        if spec is not None:
+            return spec
+        return self._compile(country_code) if country_code in self.bban_formats else default
+
+    def __contains__(self, country_code: object) -> bool:
+        return country_code in self.bban_formats
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.bban_formats)
+
+    def __len__(self) -> int:
+        return len(self.bban_formats)
+
+    @property
+    def compiled(self) -> int:
+        """Number of compiled specs"""
+        return len(self._specs)
+
+    def preload(self):
+        """Compile specs of all countries, ex. before worker processes are forked"""
+        for country_code in self.bban_formats:
+            self[country_code]
+
+
+IBAN_REGISTRY = CountryRegistry(BBAN_FORMATS)
+
+
+def normalize_iban(iban: str) -> str:
+    """Remove spaces and convert to uppercase"""
+    return iban.replace(' ', '').upper()
+
+
+def get_bank_code(iban: str) -> Optional[str]:
+    """Bank identifier of normalized iban, None for countries without known position"""
+    position = BANK_CODE_POSITIONS.get(iban[:2])
+    if position is None:
+        return None
+    start, end = position
+    return iban[4 + start:4 + end] or None
+
+
+def get_country_spec(country_code: Optional[str]) -> Optional[CountrySpec]:
+    """Spec of the country, None for countries not in the registry"""
+    return IBAN_REGISTRY.get(country_code.upper()) if country_code else None
+
+
+def check_iban(iban: str, country: Optional[str] = None) -> CheckCode:
+    """
+    Check iban of any registry country,
+    country restricts iban to the specified country
+    """
+    iban = normalize_iban(iban)
+    spec = IBAN_REGISTRY.get(iban[:2])
+    if spec is None:
+        return CheckCode.UNKNOWN_COUNTRY
+    if country and country.upper() != spec.country_code:
+        return CheckCode.COUNTRY_MISMATCH
+    return spec.check(iban)
+
+
+def is_valid_iban(iban: str, country: Optional[str] = None) -> bool:
+    """
+    Validate iban of any registry country,
+    country restricts iban to the specified country
+    """
+    return check_iban(iban, country) == CheckCode.VALID
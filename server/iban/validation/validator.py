@@ -0,0 +1,41 @@
+"""
+Synchronous validation of raw user input: country dispatch, check and
+suggestion of a correct iban. Used directly by bulk paths and wrapped
+by the async service layer.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from .correction import suggest_corrections
+from .registry import IBAN_REGISTRY, CountrySpec, normalize_iban
+
+ValidationResult = Tuple[bool, Optional[str]]
+
+
+def get_spec_for(iban: str, country: Optional[str] = None) -> Optional[CountrySpec]:
+    """Spec of the specified country or of the iban country code"""
+    country_code = country or normalize_iban(iban)[:2]
+    return IBAN_REGISTRY.get(country_code.upper())
+
+
+def suggest_iban(invalid_iban: str, spec: CountrySpec) -> Optional[str]:
+    """The best correction of invalid iban to a valid iban of the country"""
+    corrections = suggest_corrections(invalid_iban, spec, limit=1)
+    return corrections[0].iban if corrections else None
+
+
+def validate_iban(iban: str, country: Optional[str] = None) -> ValidationResult:
+    """Validity of iban and suggested iban for not valid one"""
+    iban = normalize_iban(iban)
+    spec = get_spec_for(iban, country)
+    if spec is None:
+        return False, None
+
+    if spec.is_valid(iban):
+        return True, None
+
+    return False, suggest_iban(iban, spec)
+
+
+def validate_ibans(ibans: Iterable[str], country: Optional[str] = None) -> List[ValidationResult]:
+    """Validate ibans in input order, top level function so it can be sent to worker processes"""
+    return [validate_iban(iban, country) for iban in ibans]
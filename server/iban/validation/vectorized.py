@@ -0,0 +1,309 @@
+"""
+Vectorized iban check for columnar data, requires numpy (``bulk`` extra).
+
+Ibans are handled as a (N, width) matrix of ASCII bytes, every step of the
+scalar check (country, length, structure, mod-97 checksum, national check
+digits) is done with array operations over the whole column. National rules
+are applied per country to rows that passed everything else, a rule without
+vectorized implementation falls back to the scalar check of these rows.
+
+Non-ASCII characters and NUL bytes inside ibans are not supported:
+they are reported as invalid structure.
+"""
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from . import national
+from .registry import IBAN_REGISTRY, CheckCode
+
+IbanArray = Union[np.ndarray, Sequence[str], Sequence[bytes]]
+
+MAX_IBAN_LENGTH = max(spec.length for spec in IBAN_REGISTRY.values())
+
+_SPACE = ord(' ')
+_DIGIT, _LETTER = 1, 2
+_CLASS_BITS = {'n': _DIGIT, 'a': _LETTER, 'c': _DIGIT | _LETTER}
+
+_SPECS = list(IBAN_REGISTRY.values())
+
+# (first letter, second letter) -> index of spec in _SPECS, -1 for unknown
+_COUNTRY_INDEX = np.full(26 * 26, -1, dtype=np.int16)
+for _index, _spec in enumerate(_SPECS):
+    _COUNTRY_INDEX[(ord(_spec.country_code[0]) - 65) * 26 + ord(_spec.country_code[1]) - 65] = _index
+
+_LENGTHS = np.array([spec.length for spec in _SPECS], dtype=np.int16)
+# allowed character classes of every position, 0 after the end of iban
+_STRUCTURES = np.zeros((len(_SPECS), MAX_IBAN_LENGTH), dtype=np.uint8)
+for _index, _spec in enumerate(_SPECS):
+    _STRUCTURES[_index, :_spec.length] = [_CLASS_BITS[char_class] for char_class in _spec.structure]
+_HAS_NATIONAL_CHECK = np.array([spec.national_check is not None for spec in _SPECS])
+
+_CHAR_CLASSES = np.zeros(256, dtype=np.uint8)
+_CHAR_CLASSES[ord('0'):ord('9') + 1] = _DIGIT
+_CHAR_CLASSES[ord('A'):ord('Z') + 1] = _LETTER
+# remainder * multiplier + value stays below 2 ** 15
+_CHAR_VALUES = np.zeros(256, dtype=np.int16)
+_CHAR_VALUES[ord('0'):ord('9') + 1] = np.arange(10)
+_CHAR_VALUES[ord('A'):ord('Z') + 1] = np.arange(10, 36)
+# padding after the end of iban keeps remainder as is
+_CHAR_MULTIPLIERS = np.where(_CHAR_VALUES >= 10, 100, 10).astype(np.int16)
+_CHAR_MULTIPLIERS[0] = 1
+
+
+def _table(mapping) -> np.ndarray:
+    """Lookup table of ASCII codes"""
+    table = np.zeros(256, dtype=np.int32)
+    for char, value in mapping.items():
+        table[ord(char)] = value
+    return table
+
+
+def _weights(values) -> np.ndarray:
+    return np.array(values, dtype=np.int32)
+
+
+_DIGIT_VALUES = _table({str(digit): digit for digit in range(10)})
+_RIB_VALUES = _table({
+    char: int(char.translate(national._RIB_TRANSLATION))
+    for char in '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+})
+_CIN_EVEN_VALUES = _table(national._CIN_INDEX)
+_CIN_ODD_VALUES = _table({char: national._CIN_ODD_VALUES[index] for char, index in national._CIN_INDEX.items()})
+_LUHN_DOUBLED = np.array([0, 2, 4, 6, 8, 1, 3, 5, 7, 9], dtype=np.int32)
+
+_BE_WEIGHTS = _weights([pow(10, power, 97) for power in range(9, -1, -1)])
+_FR_WEIGHTS = _weights(
+    [89 * pow(10, power, 97) % 97 for power in range(4, -1, -1)]
+    + [15 * pow(10, power, 97) % 97 for power in range(4, -1, -1)]
+    + [3 * pow(10, power, 97) % 97 for power in range(10, -1, -1)]
+)
+_ES_WEIGHTS = _weights(national._ES_WEIGHTS)
+_NO_WEIGHTS = _weights(national._NO_WEIGHTS)
+_CZ_PREFIX_WEIGHTS = _weights(national._CZ_PREFIX_WEIGHTS)
+_CZ_ACCOUNT_WEIGHTS = _weights(national._CZ_ACCOUNT_WEIGHTS)
+_PL_WEIGHTS = _weights(national._PL_WEIGHTS)
+_HU_BRANCH_WEIGHTS = _weights(national._HU_WEIGHTS * 2)
+_HU_ACCOUNT_WEIGHTS = _weights(national._HU_WEIGHTS * 4)
+
+
+def _mod11_es(digits: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    check = 11 - digits @ weights % 11
+    return np.where(check == 11, 0, np.where(check == 10, 1, check))
+
+
+def _mod11_10(digits: np.ndarray) -> np.ndarray:
+    product = np.full(len(digits), 10, dtype=np.int32)
+    for position in range(digits.shape[1] - 1):
+        total = (digits[:, position] + product) % 10
+        product = np.where(total == 0, 10, total) * 2 % 11
+    return (11 - product) % 10 == digits[:, -1]
+
+
+def _check_belgium(bbans: np.ndarray) -> np.ndarray:
+    digits = _DIGIT_VALUES[bbans]
+    remainders = digits[:, :10] @ _BE_WEIGHTS % 97
+    return np.where(remainders == 0, 97, remainders) == digits[:, 10] * 10 + digits[:, 11]
+
+
+def _check_france(bbans: np.ndarray) -> np.ndarray:
+    digits = _RIB_VALUES[bbans]
+    keys = 97 - digits[:, :21] @ _FR_WEIGHTS % 97
+    return keys == digits[:, 21] * 10 + digits[:, 22]
+
+
+def _check_spain(bbans: np.ndarray) -> np.ndarray:
+    digits = _DIGIT_VALUES[bbans]
+    return (
+        (_mod11_es(digits[:, :8], _ES_WEIGHTS[2:]) == digits[:, 8])
+        & (_mod11_es(digits[:, 10:], _ES_WEIGHTS) == digits[:, 9])
+    )
+
+
+def _check_italy(bbans: np.ndarray) -> np.ndarray:
+    chars = bbans[:, 1:]
+    totals = _CIN_ODD_VALUES[chars[:, ::2]].sum(axis=1) + _CIN_EVEN_VALUES[chars[:, 1::2]].sum(axis=1)
+    return totals % 26 + ord('A') == bbans[:, 0]
+
+
+def _check_norway(bbans: np.ndarray) -> np.ndarray:
+    digits = _DIGIT_VALUES[bbans]
+    check = 11 - digits[:, :10] @ _NO_WEIGHTS % 11
+    return (check != 10) & (check % 11 == digits[:, 10])
+
+
+def _check_finland(bbans: np.ndarray) -> np.ndarray:
+    digits = _DIGIT_VALUES[bbans][:, ::-1]
+    totals = digits[:, ::2].sum(axis=1) + _LUHN_DOUBLED[digits[:, 1::2]].sum(axis=1)
+    return totals % 10 == 0
+
+
+def _check_croatia(bbans: np.ndarray) -> np.ndarray:
+    digits = _DIGIT_VALUES[bbans]
+    return _mod11_10(digits[:, :7]) & _mod11_10(digits[:, 7:])
+
+
+def _check_czech(bbans: np.ndarray) -> np.ndarray:
+    digits = _DIGIT_VALUES[bbans]
+    return (
+        (digits[:, 4:10] @ _CZ_PREFIX_WEIGHTS % 11 == 0)
+        & (digits[:, 10:] @ _CZ_ACCOUNT_WEIGHTS % 11 == 0)
+    )
+
+
+def _check_poland(bbans: np.ndarray) -> np.ndarray:
+    return _DIGIT_VALUES[bbans[:, :8]] @ _PL_WEIGHTS % 10 == 0
+
+
+def _check_hungary(bbans: np.ndarray) -> np.ndarray:
+    digits = _DIGIT_VALUES[bbans]
+    return (
+        (digits[:, :8] @ _HU_BRANCH_WEIGHTS % 10 == 0)
+        & (digits[:, 8:] @ _HU_ACCOUNT_WEIGHTS % 10 == 0)
+    )
+
+
+# vectorized versions of national checks, each gets (N, BBAN length) matrix
+_VECTORIZED_NATIONAL_CHECKS = {
+    national.check_belgium: _check_belgium,
+    national.check_croatia: _check_croatia,
+    national.check_czech: _check_czech,
+    national.check_finland: _check_finland,
+    national.check_france: _check_france,
+    national.check_hungary: _check_hungary,
+    national.check_italy: _check_italy,
+    national.check_norway: _check_norway,
+    national.check_poland: _check_poland,
+    national.check_spain: _check_spain,
+}
+
+
+def as_byte_matrix(ibans: IbanArray, width: Optional[int] = None) -> np.ndarray:
+    """
+    Convert ibans to (N, width) uint8 matrix padded with zeros.
+    Accepts numpy string/bytes arrays, sequences of strings and
+    buffers of fixed-width ibans (width is required then)
+    """
+    if isinstance(ibans, (bytes, bytearray, memoryview)):
+        if not width:
+            raise ValueError("width is required for buffer of ibans")
+        ibans = np.frombuffer(ibans, dtype=f'S{width}')
+
+    ibans = np.asarray(ibans)
+    if ibans.size == 0:
+        return np.zeros((0, 1), dtype=np.uint8)
+    if ibans.dtype.kind == 'U':
+        ibans = np.char.encode(ibans, 'ascii', 'replace')
+    elif ibans.dtype.kind == 'u' and ibans.ndim == 2:
+        return np.ascontiguousarray(ibans, dtype=np.uint8)
+    elif ibans.dtype.kind != 'S':
+        raise TypeError(f"unsupported dtype of ibans: {ibans.dtype}")
+
+    ibans = np.ascontiguousarray(ibans.reshape(-1))
+    return ibans.view(np.uint8).reshape(len(ibans), ibans.dtype.itemsize)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """Remove spaces (moving characters to the left) and convert to uppercase"""
+    spaces = matrix == _SPACE
+    if spaces.any():
+        # stable sort keeps order of characters and moves spaces to the end
+        order = np.argsort(spaces | (matrix == 0), axis=1, kind='stable')
+        matrix = np.take_along_axis(np.where(spaces, 0, matrix), order, axis=1)
+    lower = (matrix >= ord('a')) & (matrix <= ord('z'))
+    return np.where(lower, matrix - 32, matrix).astype(np.uint8)
+
+
+def _remainders(matrix: np.ndarray):
+    """
+    Mod-97 remainders of BBANs and of rearranged ibans
+    (BBAN + country code + check digits)
+    """
+    # positions are iterated, so keep every position contiguous
+    columns = np.ascontiguousarray(matrix.T)
+    values = _CHAR_VALUES[columns]
+    multipliers = _CHAR_MULTIPLIERS[columns]
+    remainders = np.zeros(len(matrix), dtype=np.int16)
+    for position in range(4, len(columns)):
+        remainders = (remainders * multipliers[position] + values[position]) % 97
+    bban_remainders = remainders
+    for position in range(4):
+        remainders = (remainders * multipliers[position] + values[position]) % 97
+    return bban_remainders, remainders
+
+
+def check_ibans(ibans: IbanArray, country: Optional[str] = None,
+                width: Optional[int] = None) -> np.ndarray:
+    """
+    Check every iban of array, returns uint8 array of CheckCode values
+    equal to the scalar check_iban result for each iban
+    """
+    matrix = _normalize(as_byte_matrix(ibans, width))
+    count = len(matrix)
+    if matrix.shape[1] < MAX_IBAN_LENGTH + 1:
+        # at least one padding column so longer ibans are not cut
+        matrix = np.pad(matrix, ((0, 0), (0, MAX_IBAN_LENGTH + 1 - matrix.shape[1])))
+    lengths = np.count_nonzero(matrix, axis=1)
+    codes = np.full(count, CheckCode.VALID, dtype=np.uint8)
+
+    first, second = matrix[:, 0].astype(np.int16) - 65, matrix[:, 1].astype(np.int16) - 65
+    is_letters = (first >= 0) & (first < 26) & (second >= 0) & (second < 26)
+    spec_index = np.where(is_letters, _COUNTRY_INDEX[np.where(is_letters, first * 26 + second, 0)], -1)
+    pending = spec_index >= 0
+    codes[~pending] = CheckCode.UNKNOWN_COUNTRY
+
+    if country:
+        country = country.upper()
+        spec = IBAN_REGISTRY.get(country)
+        expected = _SPECS.index(spec) if spec is not None else -1
+        mismatch = pending & (spec_index != expected)
+        codes[mismatch] = CheckCode.COUNTRY_MISMATCH
+        pending &= ~mismatch
+
+    spec_index = np.where(pending, spec_index, 0)
+    wrong_length = pending & (lengths != _LENGTHS[spec_index])
+    codes[wrong_length] = CheckCode.INVALID_LENGTH
+    pending &= ~wrong_length
+
+    matrix, lengths = matrix[:, :MAX_IBAN_LENGTH], np.minimum(lengths, MAX_IBAN_LENGTH)
+    structures = _STRUCTURES[spec_index]
+    structure_ok = ((structures == 0) | (_CHAR_CLASSES[matrix] & structures != 0)).all(axis=1)
+    wrong_structure = pending & ~structure_ok
+    codes[wrong_structure] = CheckCode.INVALID_STRUCTURE
+    pending &= ~wrong_structure
+
+    rows = np.flatnonzero(pending)
+    width = lengths[rows].max(initial=4)
+    bban_remainders, remainders = _remainders(matrix[rows, :width])
+    wrong_checksum = remainders != 1
+    codes[rows[wrong_checksum]] = CheckCode.INVALID_CHECKSUM
+
+    rows, bban_remainders = rows[~wrong_checksum], bban_remainders[~wrong_checksum]
+    with_national = _HAS_NATIONAL_CHECK[spec_index[rows]]
+    rows, bban_remainders = rows[with_national], bban_remainders[with_national]
+    row_specs = spec_index[rows]
+    for index in np.unique(row_specs):
+        spec = _SPECS[index]
+        country_rows = row_specs == index
+        codes[rows[country_rows]] = np.where(
+            _check_national(spec, matrix[rows[country_rows], 4:spec.length], bban_remainders[country_rows]),
+            CheckCode.VALID, CheckCode.INVALID_NATIONAL_CHECK
+        )
+
+    return codes
+
+
+def _check_national(spec, bbans: np.ndarray, bban_remainders: np.ndarray) -> np.ndarray:
+    """National check digits of BBANs of a single country"""
+    if spec.national_check is national.check_mod97_10:
+        return bban_remainders == 1
+    vectorized_check = _VECTORIZED_NATIONAL_CHECKS.get(spec.national_check)
+    if vectorized_check is not None:
+        return vectorized_check(bbans)
+    return np.array([spec.national_check(bban.tobytes().decode('ascii')) for bban in bbans], dtype=bool)
+
+
+def is_valid_ibans(ibans: IbanArray, country: Optional[str] = None,
+                   width: Optional[int] = None) -> np.ndarray:
+    """Boolean array of iban validity"""
+    return check_ibans(ibans, country=country, width=width) == CheckCode.VALID
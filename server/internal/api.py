@@ -0,0 +1,45 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from server.core.database import get_pool_stats
+from server.core.settings import SettingsServer
+from server.iban.services import (bank_directory, history_coalescer,
+                                  validation_cache, validation_flight)
+
+settings = SettingsServer()
+
+
+async def require_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """Internal actions are allowed to callers with the configured token only"""
+    token = (x_internal_token or '').encode()
+    if not settings.INTERNAL_TOKEN or not secrets.compare_digest(token, settings.INTERNAL_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid internal token")
+
+
+router = APIRouter(prefix="/internal", dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/stats")
+async def stats():
+    """
+    Runtime statistics of the worker: db connection pool, validation cache,
+    bank directory, coalesced validations and history writes
+    """
+    return {
+        "db_pool": get_pool_stats(),
+        "validation_cache": validation_cache.stats(),
+        "bank_directory": bank_directory.stats(),
+        "validation_flight": validation_flight.stats(),
+        "history_coalescer": history_coalescer.stats(),
+    }
+
+
+@router.post("/banks/reload")
+async def reload_banks():
+    """
+    Reload bank directory file of the worker serving the request, requests are served by the old index meanwhile.
+    Other workers of the server keep their index until they are reloaded or restarted
+    """
+    return {"size": await bank_directory.reload()}
@@ -1,16 +1,22 @@
-import os
-
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
+from server.core.crud import iban_history_buffer, raw_iban_history
+from server.core.metrics import registry
+from server.core.middleware import MetricsMiddleware
+from server.core.settings import SettingsServer
 from server.iban.api.router import router as iban_router
+from server.iban.services import job_worker, validation_pool
+from server.internal.api import router as internal_router
 
 origins = [
     "*"
 ]
 middlewares = [
+    Middleware(MetricsMiddleware),
     Middleware(
         CORSMiddleware,
         allow_origins=origins,
@@ -20,9 +26,45 @@ middlewares = [
     )
 ]
 
-app = FastAPI(middleware=middlewares)
+app = FastAPI(middleware=middlewares, default_response_class=ORJSONResponse)
 
 app.include_router(iban_router, tags=['iban'])
+app.include_router(internal_router, tags=['internal'])
+
+
+@app.on_event("startup")
+async def start_history_buffer():
+    await iban_history_buffer.start()
+
+
+@app.on_event("startup")
+async def start_raw_iban_history():
+    await raw_iban_history.start()
+
+
+@app.on_event("startup")
+async def start_job_worker():
+    await job_worker.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_worker():
+    await job_worker.stop()
+
+
+@app.on_event("shutdown")
+async def drain_history_buffer():
+    await iban_history_buffer.stop()
+
+
+@app.on_event("shutdown")
+async def stop_raw_iban_history():
+    await raw_iban_history.stop()
+
+
+@app.on_event("shutdown")
+async def shutdown_validation_pool():
+    validation_pool.shutdown()
 
 
 @app.get("/")
@@ -33,9 +75,17 @@ async def root():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Metrics of the worker in prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == '__main__':
+    # a single process for development, see server.serving for production server
+    settings = SettingsServer()
     uvicorn.run(
-        "main:app",
-        host=os.getenv("APP_HOST", "0.0.0.0"),
-        port=os.getenv("APP_PORT", 8000)
+        "server.main:app",
+        host=settings.APP_HOST,
+        port=settings.APP_PORT
     )
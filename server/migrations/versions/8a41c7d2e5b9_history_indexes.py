@@ -0,0 +1,42 @@
+"""history indexes
+
+Revision ID: 8a41c7d2e5b9
+Revises: 6152d332ffe3
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8a41c7d2e5b9'
+down_revision: Union[str, None] = '6152d332ffe3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_iban_created_at_id': ['created_at', 'id'],
+    'ix_iban_iban_created_at_id': ['iban', 'created_at', 'id'],
+    'ix_iban_status_created_at_id': ['status', 'created_at', 'id'],
+}
+
+
+def upgrade() -> None:
+    # keyset pagination needs not null keys
+    op.execute("UPDATE iban SET created_at = now() AT TIME ZONE 'utc' WHERE created_at IS NULL")
+    op.alter_column('iban', 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+    # built concurrently, so the table is not locked for writes on large history
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(name, 'iban', columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name='iban', postgresql_concurrently=True, if_exists=True)
+
+    op.alter_column('iban', 'created_at', existing_type=sa.DateTime(), nullable=True)
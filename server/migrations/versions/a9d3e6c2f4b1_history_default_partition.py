@@ -0,0 +1,27 @@
+"""history default partition
+
+Revision ID: a9d3e6c2f4b1
+Revises: f1a8c5e3d9b4
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3e6c2f4b1'
+down_revision: Union[str, None] = 'f1a8c5e3d9b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # rows of months without a partition are kept here instead of failing the insert,
+    # server.core.maintenance moves them to the monthly partition when it is created
+    op.execute('CREATE TABLE iban_default PARTITION OF iban DEFAULT')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE iban DETACH PARTITION iban_default')
+    op.drop_table('iban_default')
@@ -0,0 +1,35 @@
+"""dedup history indexes
+
+Revision ID: b5e8f2a7c3d6
+Revises: a9d3e6c2f4b1
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8f2a7c3d6'
+down_revision: Union[str, None] = 'a9d3e6c2f4b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_iban_dedup_last_seen_key': ['last_seen', 'key'],
+    'ix_iban_dedup_status_last_seen_key': ['status', 'last_seen', 'key'],
+}
+
+
+def upgrade() -> None:
+    # built concurrently, so the table is not locked for writes of counters
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(name, 'iban_dedup', columns, unique=False, postgresql_concurrently=True,
+                            if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name='iban_dedup', postgresql_concurrently=True, if_exists=True)
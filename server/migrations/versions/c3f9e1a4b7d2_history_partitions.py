@@ -0,0 +1,115 @@
+"""history partitions
+
+Revision ID: c3f9e1a4b7d2
+Revises: 8a41c7d2e5b9
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9e1a4b7d2'
+down_revision: Union[str, None] = '8a41c7d2e5b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_iban_id': ['id'],
+    'ix_iban_created_at_id': ['created_at', 'id'],
+    'ix_iban_iban_created_at_id': ['iban', 'created_at', 'id'],
+    'ix_iban_status_created_at_id': ['status', 'created_at', 'id'],
+}
+
+# monthly partitions of existing rows and of the next months,
+# further partitions are created by server.core.maintenance
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    month date;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', coalesce((SELECT min(created_at) FROM iban_legacy), now() AT TIME ZONE 'utc')),
+            date_trunc('month', now() AT TIME ZONE 'utc') + interval '3 months',
+            interval '1 month'
+        )::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF iban FOR VALUES FROM (%L) TO (%L)',
+            'iban_' || to_char(month, '"y"YYYY"m"MM'), month, month + interval '1 month'
+        );
+    END LOOP;
+END $$
+"""
+
+
+def _drop_indexes():
+    for name in INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+def _create_indexes():
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'iban', columns, unique=False)
+
+
+def upgrade() -> None:
+    op.rename_table('iban', 'iban_legacy')
+    op.execute('ALTER TABLE iban_legacy RENAME CONSTRAINT iban_pkey TO iban_legacy_pkey')
+    _drop_indexes()
+    # sequence is kept for the new table
+    op.execute('ALTER SEQUENCE iban_id_seq OWNED BY NONE')
+
+    # partition key must be a part of the primary key
+    op.execute("""
+        CREATE TABLE iban (
+            id BIGINT NOT NULL DEFAULT nextval('iban_id_seq'),
+            iban VARCHAR,
+            status validationstatus,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT iban_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute('ALTER SEQUENCE iban_id_seq OWNED BY iban.id')
+    op.execute(CREATE_PARTITIONS)
+    op.execute('INSERT INTO iban (id, iban, status, created_at) SELECT id, iban, status, created_at FROM iban_legacy')
+    op.drop_table('iban_legacy')
+    _create_indexes()
+
+    op.create_table(
+        'iban_daily_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('country', sa.String(length=2), nullable=False),
+        sa.Column('status', sa.Enum('VALID', 'NOT_VALID', name='validationstatus', create_type=False),
+                  nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'country', 'status')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('iban_daily_stats')
+
+    op.rename_table('iban', 'iban_partitioned')
+    op.execute('ALTER TABLE iban_partitioned RENAME CONSTRAINT iban_pkey TO iban_partitioned_pkey')
+    _drop_indexes()
+    op.execute('ALTER SEQUENCE iban_id_seq OWNED BY NONE')
+
+    op.execute("""
+        CREATE TABLE iban (
+            id BIGINT NOT NULL DEFAULT nextval('iban_id_seq'),
+            iban VARCHAR,
+            status validationstatus,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT iban_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute('ALTER SEQUENCE iban_id_seq OWNED BY iban.id')
+    op.execute('INSERT INTO iban (id, iban, status, created_at) '
+               'SELECT id, iban, status, created_at FROM iban_partitioned')
+    # partitions are dropped with the parent table
+    op.drop_table('iban_partitioned')
+    _create_indexes()
@@ -0,0 +1,35 @@
+"""dedup history
+
+Revision ID: e7b2d4f6a8c1
+Revises: c3f9e1a4b7d2
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b2d4f6a8c1'
+down_revision: Union[str, None] = 'c3f9e1a4b7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'iban_dedup',
+        sa.Column('key', sa.LargeBinary(length=16), nullable=False),
+        sa.Column('iban', sa.String(), nullable=False),
+        sa.Column('status', sa.Enum('VALID', 'NOT_VALID', name='validationstatus', create_type=False),
+                  nullable=False),
+        sa.Column('first_seen', sa.DateTime(), nullable=False),
+        sa.Column('last_seen', sa.DateTime(), nullable=False),
+        sa.Column('hit_count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('iban_dedup')
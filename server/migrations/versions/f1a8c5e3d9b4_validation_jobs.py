@@ -0,0 +1,55 @@
+"""validation jobs
+
+Revision ID: f1a8c5e3d9b4
+Revises: e7b2d4f6a8c1
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a8c5e3d9b4'
+down_revision: Union[str, None] = 'e7b2d4f6a8c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'validation_job',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'DONE', 'FAILED', name='jobstatus'), nullable=False),
+        sa.Column('country', sa.String(length=2), nullable=True),
+        sa.Column('total', sa.BigInteger(), nullable=False),
+        sa.Column('processed', sa.BigInteger(), nullable=False),
+        sa.Column('valid', sa.BigInteger(), nullable=False),
+        sa.Column('total_chunks', sa.Integer(), nullable=False),
+        sa.Column('processed_chunks', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'validation_job_chunk',
+        sa.Column('job_id', sa.BigInteger(), nullable=False),
+        sa.Column('number', sa.Integer(), nullable=False),
+        sa.Column('ibans', sa.Text(), nullable=False),
+        sa.Column('results', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['validation_job.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('job_id', 'number')
+    )
+    op.create_index(
+        'ix_validation_job_chunk_pending', 'validation_job_chunk', ['job_id', 'number'],
+        postgresql_where=sa.text('results IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_validation_job_chunk_pending', table_name='validation_job_chunk')
+    op.drop_table('validation_job_chunk')
+    op.drop_table('validation_job')
+    sa.Enum(name='jobstatus').drop(op.get_bind())
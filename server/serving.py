@@ -0,0 +1,90 @@
+"""
+Production serving: a gunicorn master preloads the app and forks uvicorn
+workers running on uvloop and httptools.
+
+    gunicorn --config server/gunicorn_conf.py server.main:app
+
+Validation tables and the bank index are built before fork, so workers share
+them copy-on-write. Database connections are split between workers, so the
+host never opens more than POOL_BUDGET connections.
+"""
+import gc
+from typing import Any, Dict, Tuple
+
+from server.core.settings import (SettingsPostgres, SettingsServer,
+                                  SettingsValidation, available_cores)
+
+WORKER_CLASS = "server.workers.ProductionWorker"
+
+
+def worker_count(settings: SettingsServer) -> int:
+    return settings.WEB_WORKERS or available_cores()
+
+
+def worker_pool_size(settings: SettingsPostgres, workers: int) -> Tuple[int, int]:
+    """
+    Size and overflow of db pool of a worker, connections of the budget are split
+    between workers keeping the configured ratio of size and overflow.
+    The raw asyncpg pool of history (as large as the pool) is a part of the budget.
+    Raises ValueError when the budget has less than a connection of every pool of a worker
+    """
+    if not settings.POOL_BUDGET:
+        return settings.POOL_SIZE, settings.POOL_MAX_OVERFLOW
+
+    connections = settings.POOL_BUDGET // workers
+    raw_pools = 1 if settings.HISTORY_DRIVER == "asyncpg" else 0
+    if connections < 1 + raw_pools:
+        raise ValueError(
+            f"POOL_BUDGET={settings.POOL_BUDGET} is too small for {workers} workers, "
+            f"at least {workers * (1 + raw_pools)} connections are required"
+        )
+    configured = settings.POOL_SIZE * (1 + raw_pools) + settings.POOL_MAX_OVERFLOW
+    size = max(1, connections * settings.POOL_SIZE // configured)
+    return size, max(0, connections - size * (1 + raw_pools))
+
+
+def worker_environ(workers: int) -> Dict[str, str]:
+    """
+    Settings of a worker overridden by environment variables: db pool of the
+    connection budget and process pool sharing cores with other workers
+    """
+    pool_size, max_overflow = worker_pool_size(SettingsPostgres(), workers)
+    environ = {
+        "POOL_SIZE": str(pool_size),
+        "POOL_MAX_OVERFLOW": str(max_overflow),
+    }
+    if not SettingsValidation().VALIDATION_POOL_WORKERS:
+        environ["VALIDATION_POOL_WORKERS"] = str(max(1, available_cores() // workers))
+    return environ
+
+
+def gunicorn_options(settings: SettingsServer) -> Dict[str, Any]:
+    return {
+        "bind": f"{settings.APP_HOST}:{settings.APP_PORT}",
+        "workers": worker_count(settings),
+        "worker_class": WORKER_CLASS,
+        "preload_app": True,
+        "max_requests": settings.WEB_MAX_REQUESTS,
+        "max_requests_jitter": settings.WEB_MAX_REQUESTS_JITTER,
+        "timeout": settings.WEB_TIMEOUT,
+        "graceful_timeout": settings.WEB_GRACEFUL_TIMEOUT,
+        "keepalive": settings.WEB_KEEPALIVE,
+    }
+
+
+def preload():
+    """
+    Build state shared by workers in the master. Objects are moved to the permanent
+    generation of gc, so collections in workers do not touch (and copy) their pages
+    """
+    # imported with the app, after worker settings are put to the environment
+    from server.iban.services import bank_directory
+    from server.iban.validation import IBAN_REGISTRY
+    from server.iban.validation.partial import _FILLERS
+
+    IBAN_REGISTRY.preload()
+    for country_code in IBAN_REGISTRY:
+        # fillers of partial checks are built by the first lookup of the country
+        _FILLERS[country_code]
+    bank_directory.index
+    gc.freeze()
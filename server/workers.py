@@ -0,0 +1,6 @@
+from uvicorn.workers import UvicornWorker
+
+
+class ProductionWorker(UvicornWorker):
+    """Gunicorn worker serving the app by uvicorn on uvloop event loop with httptools parser"""
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from server.core.coalescing import SingleFlight, WriteCoalescer
+
+
+class TestSingleFlight:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_result(self):
+        calls = []
+
+        async def compute(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key.upper()
+
+        flight = SingleFlight("test-share")
+        results = await asyncio.gather(*[
+            flight.do(key, lambda key=key: compute(key)) for key in ("a", "a", "b", "a")
+        ])
+
+        assert results == [("A", False), ("A", True), ("B", False), ("A", True)]
+        assert calls == ["a", "b"]
+        assert flight.stats() == {"computations": 2, "coalesced_computations": 2, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_error_is_raised_to_joined_calls(self):
+        async def compute():
+            await asyncio.sleep(0.01)
+            raise ValueError("broken")
+
+        flight = SingleFlight("test-error")
+        results = await asyncio.gather(flight.do("a", compute), flight.do("a", compute), return_exceptions=True)
+
+        assert [str(result) for result in results] == ["broken", "broken"]
+        assert flight.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_is_executed_by_joined_call(self):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        flight = SingleFlight("test-cancel")
+        first = asyncio.ensure_future(flight.do("a", compute))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("a", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == (2, False)
+        assert first.cancelled()
+
+
+class TestWriteCoalescer:
+
+    @pytest.mark.asyncio
+    async def test_rows_written_during_write_are_folded(self):
+        batches = []
+
+        async def write(rows, context):
+            batches.append((rows, context))
+            await asyncio.sleep(0.01)
+
+        coalescer = WriteCoalescer("test-fold", write)
+        await asyncio.gather(coalescer.write([1], "first"), coalescer.write([2, 3], "second"), coalescer.write([4]))
+        await coalescer.write([5], "last")
+
+        # the first rows are written at once, without waiting for others
+        assert batches == [([1], "first"), ([2, 3, 4], "second"), ([5], "last")]
+        assert coalescer.stats() == {"writes": 3, "rows": 5}
+
+    @pytest.mark.asyncio
+    async def test_window(self):
+        batches = []
+
+        async def write(rows, context):
+            batches.append(rows)
+
+        coalescer = WriteCoalescer("test-window", write, window=0.01)
+        await asyncio.gather(coalescer.write([1]), coalescer.write([2]))
+
+        assert batches == [[1, 2]]
+
+    @pytest.mark.asyncio
+    async def test_error_is_raised_to_all_writers(self):
+        async def write(rows, context):
+            await asyncio.sleep(0.01)
+            raise ValueError("broken")
+
+        coalescer = WriteCoalescer("test-error", write)
+        results = await asyncio.gather(
+            coalescer.write([1]), coalescer.write([2]), coalescer.write([3]), return_exceptions=True
+        )
+
+        assert [str(result) for result in results] == ["broken", "broken", "broken"]
+        assert coalescer.stats() == {"writes": 0, "rows": 0}
@@ -0,0 +1,62 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import orjson
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from server.core.crud import IbanDedupDbService, iban_key
+from server.core.enums import ValidationStatus
+from server.iban.schemas import ValidateIbansSchema
+from server.iban.services import IbanController
+
+
+class TestIbanDedupDbService:
+
+    def test_iban_key(self):
+        assert len(iban_key("GB29NWBK60161331926819")) == 16
+        assert iban_key("GB29NWBK60161331926819") != iban_key("GB29NWBK60161331926818")
+
+    def test_fold(self):
+        first, second = datetime(2023, 9, 21, 12), datetime(2023, 9, 21, 13)
+        rows = IbanDedupDbService.fold([
+            {"iban": "gb29 nwbk 6016 1331 9268 19", "status": ValidationStatus.VALID, "created_at": second},
+            {"iban": "ME25505000012345678951", "status": ValidationStatus.VALID, "created_at": first},
+            {"iban": "GB29NWBK60161331926819", "status": ValidationStatus.NOT_VALID, "created_at": first},
+        ])
+
+        assert rows[0] == {
+            "key": iban_key("GB29NWBK60161331926819"), "iban": "GB29NWBK60161331926819",
+            "status": ValidationStatus.NOT_VALID, "first_seen": first, "last_seen": second, "hit_count": 2,
+        }
+        assert rows[1]["hit_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_upserts_folded_rows(self):
+        session = MagicMock(execute=AsyncMock(), commit=AsyncMock())
+
+        await IbanDedupDbService.bulk_insert(
+            values=[{"iban": "GB29NWBK60161331926819", "status": ValidationStatus.VALID}] * 3,
+            session=session,
+            returning=False
+        )
+
+        query, values = session.execute.call_args.args
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (key) DO UPDATE SET" in sql
+        assert "hit_count = (iban_dedup.hit_count + excluded.hit_count)" in sql
+        assert "greatest(iban_dedup.last_seen, excluded.last_seen)" in sql
+        assert len(values) == 1 and values[0]["hit_count"] == 3
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stream_ibans_dedup(self):
+        ibans = ["GB29NWBK60161331926819", "GB29NWBK60161331926819", "GB28NWBK60161331926819"]
+        with patch("server.iban.services.iban.history_db_service", IbanDedupDbService), \
+                patch.object(IbanDedupDbService, "bulk_upsert") as upsert_mock:
+            chunks = [chunk async for chunk in await IbanController.stream_ibans(
+                payload=ValidateIbansSchema(ibans=ibans), session=None
+            )]
+
+        assert [item["iban"] for item in orjson.loads(b"".join(chunks))] == ibans
+        assert [row["hit_count"] for row in upsert_mock.call_args.kwargs["values"]] == [2, 1]
@@ -0,0 +1,81 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from server.core.crud import HistoryBuffer
+
+
+class FakeDbService:
+    batches = []
+
+    @classmethod
+    async def bulk_insert(cls, values, session, returning=True):
+        cls.batches.append(values)
+        return []
+
+
+@asynccontextmanager
+async def fake_session():
+    yield None
+
+
+@pytest.fixture
+def db_service():
+    FakeDbService.batches = []
+    return FakeDbService
+
+
+class TestHistoryBuffer:
+
+    @pytest.mark.asyncio
+    async def test_flush_by_batch_size(self, db_service):
+        buffer = HistoryBuffer(db_service, fake_session, batch_size=2, flush_interval=60)
+        await buffer.start()
+
+        for i in range(4):
+            await buffer.put({"iban": str(i)})
+        await asyncio.sleep(0.01)
+
+        assert db_service.batches == [[{"iban": "0"}, {"iban": "1"}], [{"iban": "2"}, {"iban": "3"}]]
+        await buffer.stop()
+
+    @pytest.mark.asyncio
+    async def test_flush_by_interval(self, db_service):
+        buffer = HistoryBuffer(db_service, fake_session, batch_size=100, flush_interval=0.01)
+        await buffer.start()
+
+        await buffer.put({"iban": "0"})
+        await asyncio.sleep(0.05)
+
+        assert db_service.batches == [[{"iban": "0"}]]
+        await buffer.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_drains(self, db_service):
+        buffer = HistoryBuffer(db_service, fake_session, batch_size=100, flush_interval=60)
+        await buffer.start()
+
+        await buffer.put({"iban": "0"})
+        await buffer.put({"iban": "1"})
+        await asyncio.wait_for(buffer.stop(), timeout=1)
+
+        assert db_service.batches == [[{"iban": "0"}, {"iban": "1"}]]
+        assert not buffer.running
+
+    @pytest.mark.asyncio
+    async def test_backpressure(self, db_service):
+        buffer = HistoryBuffer(db_service, fake_session, max_size=1, enabled=True)
+        await buffer.start()
+        buffer._task.cancel()  # nothing consumes the queue
+
+        await buffer.put({"iban": "0"})
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(buffer.put({"iban": "1"}), timeout=0.01)
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, db_service):
+        buffer = HistoryBuffer(db_service, fake_session, enabled=False)
+        await buffer.start()
+
+        assert not buffer.running
@@ -0,0 +1,147 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import declarative_base
+
+from server.core.crud.mixins import CreateUpdateMixin, DeleteMixin
+from server.core.enums import ValidationStatus
+from server.core.models import IbanModel
+from server.iban.schemas import UpdateIbanCheck
+
+
+class IbanCrud(CreateUpdateMixin, DeleteMixin):
+    table = IbanModel
+    update_scheme = UpdateIbanCheck
+    in_chunk_size = 2
+
+
+# own metadata, so the table is not a part of migrations
+BankBase = declarative_base()
+
+
+class BankModel(BankBase):
+    __tablename__ = 'bank'
+    id = Column(Integer, primary_key=True)
+    code = Column(String(11), unique=True, nullable=False)
+    name = Column(String(255))
+
+    @classmethod
+    def pk_name(cls):
+        return 'id'
+
+
+class UpdateBank(BaseModel):
+    code: str = None
+    name: str = None
+
+
+class BankCrud(CreateUpdateMixin):
+    table = BankModel
+    update_scheme = UpdateBank
+
+
+def fake_session(*objs):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = list(objs)
+    result.scalars.return_value.first.return_value = objs[0] if objs else None
+    result.scalars.return_value.one.return_value = objs[0] if objs else None
+    result.first.return_value = objs[0] if objs else None
+    return MagicMock(execute=AsyncMock(return_value=result), commit=AsyncMock(), refresh=AsyncMock())
+
+
+def compiled(session, call=-1) -> str:
+    query = session.execute.call_args_list[call].args[0]
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+UPDATE_DATA = UpdateIbanCheck(iban="GB29NWBK60161331926819", status=ValidationStatus.VALID)
+
+
+class TestMixins:
+
+    def test_chunks(self):
+        assert list(IbanCrud._chunks([1, 2, 2, 3, 1, 4, 5])) == [[1, 2], [3, 4], [5]]
+
+    @pytest.mark.asyncio
+    async def test_bulk_retrieve_without_refresh(self):
+        session = fake_session("obj")
+
+        objs = await IbanCrud.bulk_retrieve([1, 2, 3], session)
+
+        assert objs == ["obj", "obj"]
+        assert session.execute.await_count == 2
+        session.refresh.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_update_returning(self):
+        session = fake_session("updated")
+
+        assert await IbanCrud.update(1, UPDATE_DATA, session) == "updated"
+        assert session.execute.await_count == 1
+        assert compiled(session).startswith("UPDATE iban SET")
+        assert "RETURNING iban.id" in compiled(session)
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_update_not_found(self):
+        session = fake_session()
+
+        with pytest.raises(HTTPException) as error:
+            await IbanCrud.update(1, UPDATE_DATA, session)
+
+        assert error.value.status_code == 404
+        session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_chunks(self):
+        session = fake_session("updated")
+
+        objs = await IbanCrud.bulk_update([1, 2, 3], UPDATE_DATA, session)
+
+        assert objs == ["updated", "updated"]
+        assert session.execute.await_count == 2
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_update_or_create_upserts(self):
+        session = fake_session("upserted")
+
+        assert await BankCrud.update_or_create(1, UpdateBank(name="Bank"), session) == "upserted"
+        sql = compiled(session)
+        assert "INSERT INTO bank (id, name)" in sql
+        assert "ON CONFLICT (id) DO UPDATE SET name = excluded.name" in sql
+        assert "RETURNING" in sql
+
+    @pytest.mark.asyncio
+    async def test_update_or_create_by_unique_field(self):
+        session = fake_session("upserted")
+
+        await BankCrud.update_or_create("NWBKGB2L", UpdateBank(code="NWBKGB2L", name="Bank"), session, field="code")
+
+        sql = compiled(session)
+        assert "INSERT INTO bank (code, name)" in sql
+        assert "ON CONFLICT (code) DO UPDATE" in sql
+
+    @pytest.mark.asyncio
+    async def test_update_or_create_without_unique_key(self):
+        session = fake_session("upserted")
+
+        with pytest.raises(ValueError):
+            await BankCrud.update_or_create("Bank", UpdateBank(), session, field="name")
+        # primary key of partitioned history is (id, created_at)
+        with pytest.raises(ValueError):
+            await IbanCrud.update_or_create(1, UPDATE_DATA, session)
+        session.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_delete_not_found(self):
+        session = fake_session()
+
+        with pytest.raises(HTTPException):
+            await IbanCrud.delete(1, session)
+
+        assert compiled(session) == "DELETE FROM iban WHERE iban.id = %(id_1)s RETURNING iban.id"
@@ -0,0 +1,56 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from server.core.crud import RawIbanHistory, raw_iban_history
+from server.core.crud.raw import INSERT_HISTORY, asyncpg_dsn
+from server.core.enums import ValidationStatus
+from server.iban.schemas import ValidateIbanSchema
+from server.iban.services import IbanController
+
+
+class TestRawIbanHistory:
+
+    def test_asyncpg_dsn(self):
+        assert asyncpg_dsn("postgresql+asyncpg://user:pass@db/iban") == "postgresql://user:pass@db/iban"
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        history = RawIbanHistory("postgresql://db/iban", enabled=False)
+        with patch("asyncpg.create_pool", AsyncMock()) as create_pool_mock:
+            await history.start()
+
+        assert not history.running
+        create_pool_mock.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_start_insert_stop(self):
+        pool = MagicMock(execute=AsyncMock(), close=AsyncMock())
+        history = RawIbanHistory("postgresql://db/iban", max_size=3, statement_cache_size=0)
+        created_at = datetime(2023, 9, 21)
+
+        with patch("asyncpg.create_pool", AsyncMock(return_value=pool)) as create_pool_mock:
+            await history.start()
+            await history.insert("GB29NWBK60161331926819", ValidationStatus.VALID, created_at)
+            await history.stop()
+
+        create_pool_mock.assert_awaited_once_with(
+            "postgresql://db/iban", min_size=1, max_size=3, statement_cache_size=0
+        )
+        pool.execute.assert_awaited_once_with(INSERT_HISTORY, "GB29NWBK60161331926819", "VALID", created_at)
+        pool.close.assert_awaited_once()
+        assert not history.running
+
+    @pytest.mark.asyncio
+    async def test_validate_iban_without_orm(self):
+        pool = MagicMock(executemany=AsyncMock())
+        with patch.object(raw_iban_history, "_pool", pool), \
+                patch("server.core.crud.IbanDbService.create") as create_mock:
+            response = await IbanController.validate_iban(
+                payload=ValidateIbanSchema(iban="GB29NWBK60161331926819"), session=None
+            )
+
+        create_mock.assert_not_called()
+        assert response.status == ValidationStatus.VALID
+        assert pool.executemany.call_args.args[1] == [("GB29NWBK60161331926819", "VALID", response.created_at)]
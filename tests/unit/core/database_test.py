@@ -0,0 +1,63 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from server.core import database
+from server.core.database import PoolStats, get_pool_stats, session_context
+from server.core.metrics import Histogram
+
+
+class TestHistogram:
+
+    def test_observe(self):
+        histogram = Histogram(buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+
+        assert histogram.snapshot() == {
+            "count": 4, "sum": 3.65, "buckets": {"0.1": 2, "1": 3, "+Inf": 4}
+        }
+
+
+class TestPoolStats:
+
+    def test_checkout_time(self):
+        stats = PoolStats()
+        record = MagicMock(info={})
+
+        stats.on_checkout(None, record, None)
+        stats.on_checkin(None, record)
+        stats.on_checkin(None, record)
+
+        assert stats.checkouts == 1
+        assert stats.checkout_time.count == 1
+
+    def test_snapshot(self):
+        snapshot = get_pool_stats()
+
+        assert snapshot["size"] == database.settings.POOL_SIZE
+        assert snapshot["checked_out"] == 0
+        assert set(snapshot["wait_time"]) == {"count", "sum", "buckets"}
+
+
+class TestSessionContext:
+
+    @pytest.mark.asyncio
+    async def test_rollback_on_error(self):
+        session = AsyncMock()
+
+        @asynccontextmanager
+        async def factory():
+            yield session
+
+        with patch.object(database, "async_session", factory):
+            async with session_context() as current:
+                assert current is session
+
+            with pytest.raises(ValueError):
+                async with session_context():
+                    raise ValueError
+
+        session.rollback.assert_awaited_once()
+        assert session.close.await_count == 2
@@ -0,0 +1,56 @@
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from server.core.maintenance import (add_months, create_partitions,
+                                     expired_partitions, future_partitions,
+                                     partition_month, partition_name)
+
+
+class TestMaintenance:
+
+    @pytest.mark.parametrize(
+        "month,months,expected",
+        [
+            (date(2026, 10, 1), 3, date(2027, 1, 1)),
+            (date(2026, 1, 1), -1, date(2025, 12, 1)),
+            (date(2026, 12, 1), 0, date(2026, 12, 1)),
+        ]
+    )
+    def test_add_months(self, month, months, expected):
+        assert add_months(month, months) == expected
+
+    def test_partition_name(self):
+        assert partition_name(date(2026, 3, 1)) == "iban_y2026m03"
+        assert partition_month("iban_y2026m03") == date(2026, 3, 1)
+        assert partition_month("iban_legacy") is None
+
+    def test_future_partitions(self):
+        assert future_partitions(date(2026, 11, 18), ahead=2) == [
+            date(2026, 11, 1), date(2026, 12, 1), date(2027, 1, 1)
+        ]
+
+    def test_expired_partitions(self):
+        names = ["iban_y2026m01", "iban_y2026m04", "iban_y2026m03", "iban_y2026m05", "iban_default"]
+
+        assert expired_partitions(names, date(2026, 7, 18), retention_months=3) == ["iban_y2026m01", "iban_y2026m03"]
+        assert expired_partitions(names, date(2026, 7, 18), retention_months=0) == []
+
+    @pytest.mark.asyncio
+    async def test_create_partitions(self):
+        connection = AsyncMock()
+        connection.execute.return_value = MagicMock(**{
+            "scalars.return_value.all.return_value": ["iban_y2026m11", "iban_default"]
+        })
+
+        names = await create_partitions(connection, date(2026, 11, 18), ahead=1)
+
+        assert names == ["iban_y2026m11", "iban_y2026m12"]
+        statements = [str(call.args[0]) for call in connection.execute.call_args_list[1:]]
+        assert statements[0] == "CREATE TABLE iban_y2026m12 (LIKE iban INCLUDING DEFAULTS)"
+        assert "DELETE FROM iban_default WHERE created_at >= '2026-12-01' AND created_at < '2027-01-01'" in statements[1]
+        assert "INSERT INTO iban_y2026m12" in statements[1]
+        assert statements[2] == (
+            "ALTER TABLE iban ATTACH PARTITION iban_y2026m12 FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+        )
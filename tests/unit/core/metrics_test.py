@@ -0,0 +1,81 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from server.core.metrics import MetricsRegistry
+from server.core.middleware import MetricsMiddleware, http_request_duration, http_requests
+
+
+class TestMetricsRegistry:
+
+    def test_render_counter(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('requests_total', 'Requests', labels=('route',))
+        counter.inc('/a')
+        counter.inc('/a')
+        counter.inc('/"b"')
+
+        assert registry.render() == (
+            '# HELP requests_total Requests\n'
+            '# TYPE requests_total counter\n'
+            'requests_total{route="/a"} 2\n'
+            'requests_total{route="/\\"b\\""} 1\n'
+        )
+
+    def test_render_histogram(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency_seconds', 'Latency', labels=('stage',), buckets=(0.1, 1))
+        histogram.observe(0.5, 'db')
+
+        assert registry.render().splitlines()[2:] == [
+            'latency_seconds_bucket{stage="db",le="0.1"} 0',
+            'latency_seconds_bucket{stage="db",le="1"} 1',
+            'latency_seconds_bucket{stage="db",le="+Inf"} 1',
+            'latency_seconds_sum{stage="db"} 0.5',
+            'latency_seconds_count{stage="db"} 1',
+        ]
+
+    def test_render_collector(self):
+        registry = MetricsRegistry()
+        registry.register_collector(lambda: [('pool_size', 'gauge', 'Pool size', [('pool_size', {}, 5)])])
+
+        assert registry.render().splitlines()[-1] == 'pool_size 5'
+
+
+async def _call(app, path: str):
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': path, 'root_path': '', 'query_string': b'',
+        'headers': [], 'scheme': 'http', 'server': ('test', 80), 'http_version': '1.1',
+    }
+    await app(scope, receive, send)
+    return messages[0]['status']
+
+
+class TestMetricsMiddleware:
+
+    @pytest.mark.asyncio
+    async def test_counts_requests_by_route(self):
+        async def item(request):
+            return PlainTextResponse('ok')
+
+        app = MetricsMiddleware(Starlette(routes=[Route('/items/{item_id}', item)]))
+        requests = http_requests.get('GET', '/items/{item_id}', '200')
+        latency = http_request_duration.get('GET', '/items/{item_id}').count
+        unmatched = http_requests.get('GET', 'unmatched', '404')
+
+        assert await _call(app, '/items/1') == 200
+        assert await _call(app, '/items/2') == 200
+        assert await _call(app, '/missing') == 404
+
+        assert http_requests.get('GET', '/items/{item_id}', '200') == requests + 2
+        assert http_request_duration.get('GET', '/items/{item_id}').count == latency + 2
+        assert http_requests.get('GET', 'unmatched', '404') == unmatched + 1
@@ -0,0 +1,109 @@
+import io
+import json
+import os
+import subprocess
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from server.core import database
+from server.core.crud import IbanDbService
+from server.core.enums import ValidationStatus
+from server.iban import cli
+from server.iban.pool import ValidationPool
+
+
+class TestCli:
+
+    def test_read_csv(self):
+        file = io.StringIO("name,iban\na,ME25505000012345678951\nb,\nc,GB29NWBK60161331926819\n")
+        assert list(cli.read_ibans(file, "csv")) == ["ME25505000012345678951", "GB29NWBK60161331926819"]
+
+    def test_read_ndjson(self):
+        file = io.StringIO('{"iban": "ME25505000012345678951"}\n\n"GB29NWBK60161331926819"\n')
+        assert list(cli.read_ibans(file, "ndjson")) == ["ME25505000012345678951", "GB29NWBK60161331926819"]
+
+    def test_chunked(self):
+        assert list(cli.chunked(iter("abcde"), 2)) == [["a", "b"], ["c", "d"], ["e"]]
+
+    @patch.object(IbanDbService, "bulk_insert")
+    @pytest.mark.asyncio
+    async def test_validate_stream(self, bulk_insert_mock):
+        @asynccontextmanager
+        async def session():
+            yield "session"
+
+        output = io.StringIO()
+        ibans = ["ME25505000012345678951", "GB28NWBK60161331926819", "XX"]
+
+        with patch.object(database, "async_session", session):
+            total = await cli.validate_stream(
+                ibans=iter(ibans),
+                writer=cli.ResultWriter(output, "ndjson"),
+                chunk_size=2,
+                persist=True,
+            )
+
+        assert total == 3
+        assert [json.loads(line) for line in output.getvalue().splitlines()] == [
+            {"iban": ibans[0], "status": "Valid", "suggested_iban": None},
+            {"iban": ibans[1], "status": "Not valid", "suggested_iban": "GB29NWBK60161331926819"},
+            {"iban": ibans[2], "status": "Not valid", "suggested_iban": None},
+        ]
+        assert [len(call.kwargs["values"]) for call in bulk_insert_mock.call_args_list] == [2, 1]
+        assert bulk_insert_mock.call_args_list[1].kwargs["values"] == [
+            {"iban": "XX", "status": ValidationStatus.NOT_VALID}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_validate_chunk_at_once(self):
+        chunk = ["ME25505000012345678951", " gb29 nwbk 6016 1331 9268 19"]
+        pool = ValidationPool(workers=-1)
+
+        with patch.object(pool, "validate", wraps=pool.validate) as mock:
+            results = await cli.validate_chunk(chunk, country="GB", pool=pool)
+
+        mock.assert_called_once_with(chunk, "GB")
+        assert [(result["iban"], result["status"]) for result in results] == [
+            (chunk[0], ValidationStatus.NOT_VALID), (chunk[1], ValidationStatus.VALID)
+        ]
+
+    def test_validate_without_db_settings(self, tmp_path):
+        path = tmp_path / "ibans.ndjson"
+        path.write_text('"ME25505000012345678951"\n')
+        env = {
+            key: value for key, value in os.environ.items()
+            if not key.startswith("POSTGRES_") and key != "SQLALCHEMY_DATABASE_URI"
+        }
+        env["PYTHONPATH"] = str(Path(cli.__file__).parents[2])
+
+        # no .env in the working directory
+        process = subprocess.run(
+            [sys.executable, "-m", "server.iban.cli", "validate", str(path)],
+            cwd=tmp_path, env=env, capture_output=True, text=True,
+        )
+
+        assert process.returncode == 0, process.stderr
+        assert json.loads(process.stdout)["status"] == "Valid"
+
+    def test_invalid_ndjson_line(self, tmp_path):
+        path = tmp_path / "ibans.ndjson"
+        path.write_text('"ME25505000012345678951"\n{"iban": \n')
+
+        with pytest.raises(SystemExit) as error:
+            cli.main(["validate", str(path), "--output", str(tmp_path / "results.ndjson")])
+
+        assert str(error.value) == "Invalid ndjson input: Invalid json at line 2: Expecting value"
+
+    def test_main_csv(self, tmp_path, capsys):
+        path = tmp_path / "ibans.csv"
+        path.write_text("iban\nME25505000012345678951\n")
+
+        assert cli.main(["validate", str(path)]) == 0
+        assert capsys.readouterr().out.splitlines() == [
+            "iban,status,suggested_iban",
+            "ME25505000012345678951,Valid,",
+        ]
@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from server.core.crud import IbanDbService
+from server.core.models import IbanModel
+from server.iban.schemas import ValidateIbanSchema
+from server.iban.services import (Bank, BankDirectory, BankIndex,
+                                  IbanController)
+from server.iban.validation import get_bank_code
+
+
+class TestBankIndex:
+
+    def test_lookup(self):
+        index = BankIndex([
+            ("GB", "NWBK", "NWBKGB2LXXX", "National Westminster Bank"),
+            ("de", "37040044", "COBADEFFXXX", "Commerzbank"),
+            ("GB", "BARC", "", ""),
+        ])
+
+        assert len(index) == 3
+        assert index.lookup("DE", "37040044") == Bank("37040044", "COBADEFFXXX", "Commerzbank")
+        assert index.lookup("GB", "BARC") == Bank("BARC", None, None)
+        assert index.lookup("GB", "MIDL") is None
+        assert index.lookup("ZZ", "0") is None
+
+    @pytest.mark.parametrize(
+        "iban,bank_code",
+        [
+            ("GB29NWBK60161331926819", "NWBK"),
+            ("IT60X0542811101000000123456", "05428"),
+            ("ME25505000012345678951", "505"),
+            ("SC18SSCB11010000000000001497USD", None),
+        ]
+    )
+    def test_bank_code(self, iban, bank_code):
+        assert get_bank_code(iban) == bank_code
+
+
+class TestBankDirectory:
+
+    def test_lazy_load(self):
+        directory = BankDirectory()
+        assert directory.stats() == {"loaded": False, "size": 0}
+
+        bank = directory.lookup_iban("gb29 nwbk 6016 1331 9268 19")
+
+        assert bank.bic == "NWBKGB2LXXX"
+        assert directory.stats()["loaded"]
+
+    @pytest.mark.asyncio
+    async def test_reload(self, tmp_path):
+        path = tmp_path / "banks.csv"
+        path.write_text("country,bank_code,bic,name\nGB,NWBK,NWBKGB2LXXX,NatWest\n")
+        directory = BankDirectory()
+        old_index = directory.index
+
+        assert await directory.reload(path) == 1
+        assert directory.index is not old_index
+        assert directory.lookup_iban("GB29NWBK60161331926819").name == "NatWest"
+        assert directory.lookup_iban("DE89370400440532013000") is None
+
+    @patch.object(IbanDbService, "create")
+    @pytest.mark.asyncio
+    async def test_validate_iban_bank(self, create_mock):
+        create_mock.side_effect = lambda input_data, session: IbanModel(
+            id=1, created_at=datetime.utcnow(), **input_data.dict()
+        )
+
+        valid, not_valid = await asyncio.gather(*[
+            IbanController.validate_iban(payload=ValidateIbanSchema(iban=iban), session=None)
+            for iban in ("GB29NWBK60161331926819", "GB28NWBK60161331926819")
+        ])
+
+        assert (valid.bank_code, valid.bic, valid.bank_name) == ("NWBK", "NWBKGB2LXXX", "National Westminster Bank")
+        assert (not_valid.bank_code, not_valid.bic, not_valid.bank_name) == (None, None, None)
@@ -0,0 +1,69 @@
+from unittest.mock import patch
+
+import pytest
+
+from server.core.enums import ValidationStatus
+from server.iban.services import (IbanController, LocalCacheBackend,
+                                  ValidationCache)
+from server.iban.services import cache as cache_module
+
+
+class TestLocalCacheBackend:
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        backend = LocalCacheBackend(max_size=2)
+        await backend.set("a", (True, None))
+        await backend.set("b", (True, None))
+        await backend.get("a")
+        await backend.set("c", (True, None))
+
+        assert await backend.get("b") is None
+        assert await backend.get("a") == (True, None)
+        assert backend.stats() == {"size": 2, "evictions": 1, "expirations": 0}
+
+    @pytest.mark.asyncio
+    async def test_ttl(self):
+        backend = LocalCacheBackend(ttl=10)
+        with patch.object(cache_module.time, "monotonic", return_value=100):
+            await backend.set("a", (False, "b"))
+        with patch.object(cache_module.time, "monotonic", return_value=105):
+            assert await backend.get("a") == (False, "b")
+        with patch.object(cache_module.time, "monotonic", return_value=111):
+            assert await backend.get("a") is None
+
+        assert backend.stats()["expirations"] == 1
+
+
+class TestValidationCache:
+
+    @pytest.mark.asyncio
+    async def test_normalized_key(self):
+        cache = ValidationCache(LocalCacheBackend())
+        await cache.set("me25 5050 0001 2345 6789 51", "me", (True, None))
+
+        assert await cache.get("ME25505000012345678951", "ME") == (True, None)
+        assert await cache.get("ME25505000012345678951") is None
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1, "evictions": 0, "expirations": 0}
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        cache = ValidationCache()
+        await cache.set("ME25505000012345678951", None, (True, None))
+
+        assert await cache.get("ME25505000012345678951") is None
+        assert cache.stats() == {"hits": 0, "misses": 0}
+
+    @pytest.mark.asyncio
+    async def test_controller_uses_cache(self):
+        cache = ValidationCache(LocalCacheBackend())
+        with patch("server.iban.services.iban.validation_cache", cache), \
+                patch.object(IbanController, "_check_value", wraps=IbanController._check_value) as check_mock:
+            first = await IbanController.validate_value("GB28NWBK60161331926819", None)
+            second = await IbanController.validate_value("gb28 nwbk 6016 1331 9268 19", None)
+            batch = await IbanController.validate_values(["GB28NWBK60161331926819", "ME25505000012345678951"], None)
+
+        assert first == second == (ValidationStatus.NOT_VALID, "GB29NWBK60161331926819")
+        assert batch == [first, (ValidationStatus.VALID, None)]
+        assert check_mock.call_count == 1
+        assert cache.stats()["hits"] == 2
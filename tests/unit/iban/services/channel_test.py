@@ -0,0 +1,102 @@
+import asyncio
+from unittest.mock import patch
+
+import orjson
+import pytest
+
+from server.core.enums import ValidationStatus
+from server.iban.services import IbanController, ValidationChannel
+
+
+class FakeWebSocket:
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.received = 0
+        self.sent = []
+
+    async def receive(self):
+        if not self.messages:
+            return {"type": "websocket.disconnect", "code": 1000}
+        self.received += 1
+        message = self.messages.pop(0)
+        key = "bytes" if isinstance(message, bytes) else "text"
+        return {"type": "websocket.receive", key: message}
+
+    async def send_text(self, data):
+        self.sent.append(orjson.loads(data))
+
+
+@pytest.fixture
+def history_mock():
+    with patch.object(IbanController, "write_history") as write_history_mock:
+        yield write_history_mock
+
+
+class TestValidationChannel:
+
+    @pytest.mark.asyncio
+    async def test_messages(self, history_mock):
+        websocket = FakeWebSocket([
+            "GB29NWBK60161331926819",
+            b'"GB28NWBK60161331926819"',
+            '{"id": 1, "iban": "ME25505000012345678951", "country": "GB"}',
+            '{"id": 2, "ibans": ["GB29NWBK60161331926819", "XX"]}',
+        ])
+
+        await ValidationChannel(websocket, session="session").run()
+
+        first, second, third, fourth = websocket.sent
+        assert (first["status"], first["bank_code"]) == ("Valid", "NWBK")
+        assert (second["status"], second["suggested_iban"]) == ("Not valid", "GB29NWBK60161331926819")
+        assert (third["id"], third["status"]) == (1, "Not valid")
+        assert fourth["id"] == 2
+        assert [item["status"] for item in fourth["results"]] == ["Valid", "Not valid"]
+
+        assert history_mock.await_count == 4
+        rows, session = history_mock.call_args.args
+        assert session == "session"
+        assert [row["status"] for row in rows] == [ValidationStatus.VALID, ValidationStatus.NOT_VALID]
+
+    @pytest.mark.parametrize(
+        "message,error",
+        [
+            ("{not json", "Invalid json"),
+            ("[1, 2]", "Message must be an iban or an object"),
+            ('{"id": 3}', "Message must have iban or ibans"),
+            ('{"id": 3, "ibans": ["A", "B", "C"]}', "Batch is larger than 2 ibans"),
+            (b"\xff", "Message must be utf-8"),
+            ("", "Message is empty"),
+            (" \r\n", "Message is empty"),
+            ('" "', "Message is empty"),
+            ('{"id": 3, "iban": ""}', "iban is empty"),
+        ]
+    )
+    @pytest.mark.asyncio
+    async def test_invalid_message(self, history_mock, message, error):
+        websocket = FakeWebSocket([message, "GB29NWBK60161331926819"])
+
+        await ValidationChannel(websocket, session=None, max_batch_size=2).run()
+
+        assert websocket.sent[0]["error"] == error
+        assert websocket.sent[1]["status"] == "Valid"
+        assert history_mock.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_flow_control(self, history_mock):
+        websocket = FakeWebSocket(["GB29NWBK60161331926819"] * 10)
+        validated = asyncio.Event()
+
+        async def write_history(rows, session):
+            await validated.wait()
+
+        history_mock.side_effect = write_history
+
+        task = asyncio.create_task(ValidationChannel(websocket, session=None, queue_size=2).run())
+        await asyncio.sleep(0.01)
+
+        # one message is validated, two are queued and one waits for the queue
+        assert websocket.received == 4
+        validated.set()
+        await task
+        assert len(websocket.sent) == 10
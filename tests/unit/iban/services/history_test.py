@@ -0,0 +1,115 @@
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from server.core.crud import IbanDbService, IbanDedupDbService, iban_key
+from server.core.enums import ValidationStatus
+from server.core.models import IbanModel
+from server.iban.schemas import IbanHistoryFilters
+from server.iban.services import HistoryController
+from server.iban.services import history as history_services
+from server.iban.services.history import decode_cursor, encode_cursor
+
+ROWS = [
+    SimpleNamespace(id=3, iban="GB29NWBK60161331926819", status=ValidationStatus.VALID,
+                    created_at=datetime(2023, 9, 21, 12, 0, 2)),
+    SimpleNamespace(id=2, iban="GB28NWBK60161331926819", status=ValidationStatus.NOT_VALID,
+                    created_at=datetime(2023, 9, 21, 12, 0, 1)),
+]
+
+DEDUP_ROWS = [
+    SimpleNamespace(key=iban_key("GB29NWBK60161331926819"), iban="GB29NWBK60161331926819",
+                    status=ValidationStatus.VALID, first_seen=datetime(2023, 9, 20, 8, 0, 0),
+                    last_seen=datetime(2023, 9, 21, 12, 0, 2), hit_count=7),
+]
+
+
+def _stream_page(rows):
+    async def stream_page(session, filters, after, limit):
+        for row in rows[:limit]:
+            yield row
+    return stream_page
+
+
+async def _read(filters: IbanHistoryFilters):
+    chunks = [chunk async for chunk in HistoryController.stream_history(filters=filters, session=None)]
+    return json.loads("".join(chunks))
+
+
+class TestHistory:
+
+    def test_cursor(self):
+        created_at = datetime(2023, 9, 21, 12, 0, 1, 5)
+        assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+    @pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor(datetime(2023, 1, 1), 1)[:-4]])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(HTTPException) as error:
+            HistoryController.stream_history(filters=IbanHistoryFilters(cursor=cursor), session=None)
+        assert error.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_page(self):
+        with patch.object(IbanDbService, "stream_page", _stream_page(ROWS)):
+            page = await _read(IbanHistoryFilters(limit=2))
+
+        assert [item["id"] for item in page["items"]] == [3, 2]
+        assert page["items"][1] == {
+            "id": 2, "iban": "GB28NWBK60161331926819", "status": "Not valid", "created_at": "2023-09-21T12:00:01"
+        }
+        assert decode_cursor(page["next_cursor"]) == (ROWS[1].created_at, 2)
+
+    @pytest.mark.asyncio
+    async def test_last_page(self):
+        with patch.object(IbanDbService, "stream_page", _stream_page(ROWS)):
+            page = await _read(IbanHistoryFilters(limit=3))
+        with patch.object(IbanDbService, "stream_page", _stream_page([])):
+            empty_page = await _read(IbanHistoryFilters())
+
+        assert len(page["items"]) == 2
+        assert page["next_cursor"] is None
+        assert empty_page == {"items": [], "next_cursor": None}
+
+    def test_filters(self):
+        filters = IbanHistoryFilters(
+            iban="GB29NWBK60161331926819", status=ValidationStatus.VALID,
+            created_from=datetime(2023, 9, 1), created_to=datetime(2023, 10, 1),
+        )
+        assert len(HistoryController._conditions(filters)) == 4
+        assert HistoryController._conditions(IbanHistoryFilters()) == []
+
+    def test_created_at_default(self):
+        default = IbanModel.__table__.c.created_at.default
+        assert default.is_callable
+
+    @pytest.mark.asyncio
+    async def test_dedup_page(self):
+        with patch.object(history_services, "history_db_service", IbanDedupDbService), \
+                patch.object(IbanDedupDbService, "stream_page", _stream_page(DEDUP_ROWS)), \
+                patch.object(IbanDbService, "stream_page") as log_stream_page:
+            page = await _read(IbanHistoryFilters(limit=1))
+
+        log_stream_page.assert_not_called()
+        assert page["items"] == [{
+            "iban": "GB29NWBK60161331926819", "status": "Valid", "first_seen": "2023-09-20T08:00:00",
+            "last_seen": "2023-09-21T12:00:02", "hit_count": 7,
+        }]
+        assert decode_cursor(page["next_cursor"], bytes.fromhex) == (DEDUP_ROWS[0].last_seen, DEDUP_ROWS[0].key)
+
+    def test_dedup_filters(self):
+        filters = IbanHistoryFilters(iban="gb29 nwbk 6016 1331 9268 19", created_from=datetime(2023, 9, 1))
+
+        with patch.object(history_services, "history_db_service", IbanDedupDbService):
+            conditions = HistoryController._conditions(filters)
+            with pytest.raises(HTTPException):
+                HistoryController.stream_history(filters=IbanHistoryFilters(cursor=encode_cursor(datetime.now(), 1)),
+                                                 session=None)
+
+        assert [str(condition) for condition in conditions] == [
+            "iban_dedup.key = :key_1", "iban_dedup.last_seen >= :last_seen_1"
+        ]
+        assert conditions[0].right.value == iban_key("GB29NWBK60161331926819")
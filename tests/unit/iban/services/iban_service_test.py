@@ -1,11 +1,19 @@
+import asyncio
+
+import orjson
 import pytest
 from datetime import datetime
 from unittest.mock import patch
 
-from server.iban.services import IbanController, MontenegroIbanService
-from server.iban.schemas import ValidateIbanSchema
+from server.iban.services import (IbanController, MontenegroIbanService,
+                                  history_coalescer)
+from server.iban.services import iban as iban_services
+from server.iban.services.cache import LocalCacheBackend, ValidationCache
+from server.iban.services.metrics import stage_duration, validations
+from server.iban.schemas import ValidateIbanSchema, ValidateIbansSchema
 from server.core.enums import ValidationStatus
-from server.core.crud import IbanDbService
+from server.core.crud import (IbanDbService, IbanDedupDbService,
+                              iban_history_buffer)
 from server.core.models import IbanModel
 
 
@@ -42,7 +50,8 @@ class TestIbanService:
         [
             ("ME2550500001234567895100", "ME25505000012345678951"),
             ("LE2550500001234567895100", "ME25505000012345678951"),
-            ("ME25505000012345638951", None),
+            ("ME25505000012345638951", "ME25505800012345638951"),
+            ("ME52505000012345678951", "ME25505000012345678951"),
             ("LE255050wer1234567895100", None)
         ]
     )
@@ -80,12 +89,187 @@ class TestIbanController:
 
         assert response.status == status
 
+    @pytest.mark.parametrize(
+        "iban,country,status,suggested_iban",
+        [
+            ("GB29 NWBK 6016 1331 9268 19", None, ValidationStatus.VALID, None),
+            ("GB29NWBK60161331926819", "gb", ValidationStatus.VALID, None),
+            ("GB29NWBK60161331926819", "ME", ValidationStatus.NOT_VALID, None),
+            ("GB28NWBK60161331926819", None, ValidationStatus.NOT_VALID, "GB29NWBK60161331926819"),
+            ("XX29NWBK60161331926819", None, ValidationStatus.NOT_VALID, None),
+        ]
+    )
+    @patch.object(IbanDbService, "create")
+    @pytest.mark.asyncio
+    async def test_validate_iban_country(self, create_mock, iban, country, status, suggested_iban):
+        create_mock.side_effect = lambda input_data, session: IbanModel(
+            id=1, created_at=datetime.utcnow(), **input_data.dict()
+        )
+
+        response = await IbanController.validate_iban(
+            payload=ValidateIbanSchema(iban=iban, country=country),
+            session=None
+        )
+
+        assert response.status == status
+        assert response.suggested_iban == suggested_iban
+
+    @patch.object(IbanDbService, "create")
+    @pytest.mark.asyncio
+    async def test_validate_iban_buffered(self, create_mock):
+        with patch.object(iban_history_buffer, "_task", True), \
+                patch.object(iban_history_buffer, "put") as put_mock:
+            response = await IbanController.validate_iban(
+                payload=ValidateIbanSchema(iban="GB28NWBK60161331926819"),
+                session=None
+            )
+
+        create_mock.assert_not_called()
+        put_mock.assert_called_once_with({
+            "iban": "GB28NWBK60161331926819",
+            "status": ValidationStatus.NOT_VALID,
+            "created_at": response.created_at,
+        })
+        assert response.suggested_iban == "GB29NWBK60161331926819"
+
+    @patch.object(IbanDbService, "create")
+    @patch.object(IbanDbService, "bulk_insert")
+    @pytest.mark.asyncio
+    async def test_validate_iban_coalesced(self, bulk_insert_mock, create_mock):
+        async def slow_insert(values, session, **kwargs):
+            await asyncio.sleep(0.01)
+
+        bulk_insert_mock.side_effect = slow_insert
+        ibans = ["GB82WEST12345698765432", "GB82WEST12345698765432", "ME25505000012345678951"]
+        coalesced = iban_services.validation_flight.stats()["coalesced_computations"]
+
+        with patch.object(history_coalescer, "enabled", True), \
+                patch.object(IbanController, "_check_value", wraps=IbanController._check_value) as check_mock, \
+                patch.object(iban_services.validation_cache, "backend", None):
+            responses = await asyncio.gather(*[
+                IbanController.validate_iban(payload=ValidateIbanSchema(iban=iban), session=None)
+                for iban in ibans
+            ])
+
+        create_mock.assert_not_called()
+        assert [response.status for response in responses] == [ValidationStatus.VALID] * 3
+        # the second request shares the validation of the first one, but writes its own row
+        assert check_mock.call_count == 2
+        assert iban_services.validation_flight.stats()["coalesced_computations"] == coalesced + 1
+        rows = [value["iban"] for call in bulk_insert_mock.call_args_list for value in call.kwargs["values"]]
+        assert sorted(rows) == sorted(ibans)
+
+    @patch.object(IbanDbService, "create")
+    @pytest.mark.asyncio
+    async def test_validate_iban_metrics(self, create_mock):
+        create_mock.side_effect = lambda input_data, session: IbanModel(
+            id=1, created_at=datetime.utcnow(), **input_data.dict()
+        )
+        valid = validations.get("GB", "Valid")
+        not_valid = validations.get("unknown", "Not valid")
+        db_writes = stage_duration.get("db_write").count
+
+        for iban in ("GB29NWBK60161331926819", "XX29NWBK60161331926819"):
+            await IbanController.validate_iban(payload=ValidateIbanSchema(iban=iban), session=None)
+
+        assert validations.get("GB", "Valid") == valid + 1
+        assert validations.get("unknown", "Not valid") == not_valid + 1
+        assert stage_duration.get("db_write").count == db_writes + 2
+
+    @pytest.mark.asyncio
+    async def test_validate_value_metrics_not_normalized(self):
+        valid = validations.get("ME", "Valid")
+
+        for iban in (" me25 5050 0001 2345 6789 51", "me25505000012345678951"):
+            await IbanController.validate_value(iban, None)
+
+        assert validations.get("ME", "Valid") == valid + 2
+
+    @patch.object(IbanDbService, "bulk_insert")
+    @pytest.mark.asyncio
+    async def test_stream_ibans_country(self, bulk_insert_mock):
+        ibans = ["ME25505000012345678951", "LE25505000012345678951", "ME2550500001234567895100"]
+
+        chunks = [chunk async for chunk in await IbanController.stream_ibans(
+            payload=ValidateIbansSchema(ibans=ibans, country="ME"), session=None
+        )]
+
+        bulk_insert_mock.assert_called_once()
+        response = orjson.loads(b"".join(chunks))
+        assert [item["iban"] for item in response] == ibans
+        assert [item["status"] for item in response] == ["Valid", "Not valid", "Not valid"]
+        assert [item["suggested_iban"] for item in response] == [
+            None, "ME25505000012345678951", "ME25505000012345678951"
+        ]
+
+    @patch.object(IbanDedupDbService, "bulk_insert")
+    @patch.object(IbanDbService, "bulk_insert")
+    @pytest.mark.asyncio
+    async def test_stream_ibans_dedup(self, bulk_insert_mock, dedup_insert_mock):
+        ibans = ["ME25505000012345678951", "ME25505000012345678951"]
+
+        with patch.object(iban_services, "history_db_service", IbanDedupDbService):
+            await IbanController.stream_ibans(payload=ValidateIbansSchema(ibans=ibans), session=None)
+
+        bulk_insert_mock.assert_not_called()
+        dedup_insert_mock.assert_called_once()
+        values = dedup_insert_mock.call_args.kwargs["values"]
+        assert [value["iban"] for value in values] == ibans
+        assert [value["status"] for value in values] == [ValidationStatus.VALID] * 2
+
+    @patch.object(IbanDbService, "bulk_insert")
+    @pytest.mark.asyncio
+    async def test_stream_ibans_buffered(self, bulk_insert_mock):
+        ibans = ["GB29NWBK60161331926819", "LE25505000012345678951"]
+
+        with patch.object(iban_history_buffer, "_task", True), \
+                patch.object(iban_history_buffer, "put") as put_mock:
+            await IbanController.stream_ibans(payload=ValidateIbansSchema(ibans=ibans), session=None)
+
+        bulk_insert_mock.assert_not_called()
+        assert [call.args[0]["iban"] for call in put_mock.call_args_list] == ibans
+
+    @pytest.mark.asyncio
+    async def test_validate_values_not_normalized(self):
+        cache = ValidationCache(LocalCacheBackend())
+        with patch.object(iban_services, "validation_cache", cache):
+            results = await IbanController.validate_values([" ME25505000012345678951", "me25505000012345678951"], None)
+            status, _ = await IbanController.validate_value("ME25505000012345678951", None)
+
+        assert results == [(ValidationStatus.VALID, None)] * 2
+        assert status == ValidationStatus.VALID
+        assert cache.stats()["size"] == 1
+
+    @patch.object(IbanDbService, "bulk_insert")
+    @pytest.mark.asyncio
+    async def test_stream_ibans(self, bulk_insert_mock):
+        ibans = ["GB29NWBK60161331926819", "LE25505000012345678951", "ME2550500001234567895100"]
+
+        with patch.object(IbanController, "stream_chunk_size", 2):
+            chunks = [chunk async for chunk in await IbanController.stream_ibans(
+                payload=ValidateIbansSchema(ibans=ibans), session=None
+            )]
+
+        values = bulk_insert_mock.call_args.kwargs["values"]
+        assert bulk_insert_mock.call_args.kwargs["returning"] is False
+        assert len(chunks) == 4
+        response = orjson.loads(b"".join(chunks))
+        assert [item["iban"] for item in response] == ibans
+        assert [item["status"] for item in response] == ["Valid", "Not valid", "Not valid"]
+        assert response[0]["bank_code"] == "NWBK"
+        assert response[2]["suggested_iban"] == "ME25505000012345678951"
+        assert response[0]["created_at"] == values[0]["created_at"].isoformat()
+
     @pytest.mark.parametrize(
         "iban,expected",
         [
             ("ME05505000", ValidationStatus.VALID),
             ("LEF5505000012345678951", ValidationStatus.NOT_VALID),
             ("LE05505000000000000000000000000000", ValidationStatus.NOT_VALID),
+            ("", ValidationStatus.VALID),
+            ("G", ValidationStatus.VALID),
+            ("GB29 NWBK 60", ValidationStatus.VALID),
+            ("GB29 NW1K 60", ValidationStatus.NOT_VALID),
         ]
     )
     @pytest.mark.asyncio
@@ -94,3 +278,11 @@ class TestIbanController:
         response = await IbanController.validate_partial_iban(payload=payload)
 
         assert response.status == expected
+
+    @pytest.mark.asyncio
+    async def test_remaining_length(self):
+        payload = ValidateIbanSchema(iban="GB29 NWBK 60")
+        response = await IbanController.validate_partial_iban(payload=payload)
+
+        assert response.remaining_length == 12
+        assert response.next_char_class == "digit"
@@ -0,0 +1,162 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from server.core.crud import IbanDbService, ValidationJobDbService
+from server.core.enums import JobStatus, ValidationStatus
+from server.iban.formats import read_ibans_stream
+from server.iban.services import JobController, JobWorker
+
+
+async def body(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def collect(stream):
+    return [item async for item in stream]
+
+
+class TestReadIbansStream:
+
+    @pytest.mark.asyncio
+    async def test_csv_parts(self):
+        # lines and multibyte characters are split between parts
+        stream = body(b"name,iban\r\nZ\xc3", b"\xbcrich,ME25505000012345678951\r\nb,GB29NW", b"BK60161331926819")
+
+        assert await collect(read_ibans_stream(stream, "csv")) == [
+            ["ME25505000012345678951"], ["GB29NWBK60161331926819"]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_ndjson_parts(self):
+        stream = body(b'{"iban": "ME25505000012345678951"}\n\n"GB29', b'NWBK60161331926819"\n')
+
+        assert await collect(read_ibans_stream(stream, "ndjson")) == [
+            ["ME25505000012345678951"], ["GB29NWBK60161331926819"]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_control_characters(self):
+        stream = body(b'"ME25505000\\n012345678951"\n"\\r\\n"\n"GB29NWBK60161331926819\\u0000"\n')
+
+        assert await collect(read_ibans_stream(stream, "ndjson")) == [
+            ["ME25505000012345678951", "GB29NWBK60161331926819"]
+        ]
+
+
+class TestJobController:
+
+    @pytest.mark.asyncio
+    async def test_upload_chunks(self):
+        stream = body(b"iban\nA1\nA2\n", b"A3\nA4\nA5\n")
+        with patch.object(ValidationJobDbService, "create_job", AsyncMock(return_value=7)), \
+                patch.object(ValidationJobDbService, "add_chunk") as add_chunk_mock, \
+                patch.object(ValidationJobDbService, "finish_upload") as finish_mock, \
+                patch.object(ValidationJobDbService, "retrieve", AsyncMock(return_value="job")):
+            job = await JobController.upload(stream, "csv", session="session", chunk_size=2)
+
+        assert job == "job"
+        assert [call.args[:3] for call in add_chunk_mock.call_args_list] == [
+            (7, 0, ["A1", "A2"]), (7, 1, ["A3", "A4"]), (7, 2, ["A5"])
+        ]
+        finish_mock.assert_awaited_once_with(7, total=5, total_chunks=3, session="session")
+
+    @pytest.mark.asyncio
+    async def test_upload_invalid_file(self):
+        session = MagicMock(rollback=AsyncMock())
+        with patch.object(ValidationJobDbService, "create_job", AsyncMock(return_value=7)), \
+                patch.object(ValidationJobDbService, "finish_upload") as finish_mock:
+            with pytest.raises(HTTPException) as error:
+                await JobController.upload(body(b'{"iban": "ME25505000012345678951"}\n[1, 2]\n'), "ndjson", session=session)
+
+        assert error.value.status_code == 400
+        session.rollback.assert_awaited_once()
+        finish_mock.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("country", ["XX", "m"])
+    async def test_upload_unknown_country(self, country):
+        with patch.object(ValidationJobDbService, "create_job") as create_mock:
+            with pytest.raises(HTTPException) as error:
+                await JobController.upload(body(b"iban\nA1\n"), "csv", session=None, country=country)
+
+        assert error.value.status_code == 400
+        create_mock.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_results_of_running_job(self):
+        job = SimpleNamespace(status=JobStatus.RUNNING)
+        with patch.object(ValidationJobDbService, "retrieve", AsyncMock(return_value=job)):
+            with pytest.raises(HTTPException) as error:
+                await JobController.stream_results(1, session=None)
+
+        assert error.value.status_code == 409
+
+
+class TestJobWorker:
+
+    @staticmethod
+    def worker(session):
+        @asynccontextmanager
+        async def session_factory():
+            yield session
+
+        return JobWorker(session_factory=session_factory, poll_interval=0.01)
+
+    @pytest.mark.asyncio
+    async def test_claim_chunk_skips_locked(self):
+        session = MagicMock(execute=AsyncMock(return_value=MagicMock()))
+        await ValidationJobDbService.claim_chunk(session)
+
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "WHERE validation_job_chunk.results IS NULL" in sql
+        assert sql.endswith("FOR UPDATE OF validation_job_chunk SKIP LOCKED")
+
+    @patch.object(IbanDbService, "bulk_insert")
+    @pytest.mark.asyncio
+    async def test_process_chunk(self, bulk_insert_mock):
+        session = MagicMock(commit=AsyncMock())
+        chunk = SimpleNamespace(job_id=7, number=3, country=None, ibans="GB29NWBK60161331926819\nGB28NWBK60161331926819")
+        with patch.object(ValidationJobDbService, "claim_chunk", AsyncMock(return_value=chunk)), \
+                patch.object(ValidationJobDbService, "complete_chunk") as complete_mock:
+            assert await self.worker(session).process_chunk() is True
+
+        kwargs = complete_mock.call_args.kwargs
+        assert (kwargs["job_id"], kwargs["number"], kwargs["count"], kwargs["valid"]) == (7, 3, 2, 1)
+        lines = [orjson.loads(line) for line in kwargs["results"].splitlines()]
+        assert [line["status"] for line in lines] == ["Valid", "Not valid"]
+        assert lines[1]["suggested_iban"] == "GB29NWBK60161331926819"
+        assert [value["status"] for value in bulk_insert_mock.call_args.kwargs["values"]] == [
+            ValidationStatus.VALID, ValidationStatus.NOT_VALID
+        ]
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_fails_job(self):
+        session = MagicMock(commit=AsyncMock(), rollback=AsyncMock())
+        chunk = SimpleNamespace(job_id=7, number=0, country=None, ibans="GB29NWBK60161331926819")
+        with patch.object(ValidationJobDbService, "claim_chunk", AsyncMock(return_value=chunk)), \
+                patch.object(ValidationJobDbService, "complete_chunk", AsyncMock(side_effect=RuntimeError("lost"))), \
+                patch.object(ValidationJobDbService, "fail_job") as fail_mock:
+            assert await self.worker(session).process_chunk() is True
+
+        session.rollback.assert_awaited_once()
+        fail_mock.assert_awaited_once_with(7, "lost", session)
+
+    @pytest.mark.asyncio
+    async def test_start_stop_on_empty_queue(self):
+        worker = self.worker(None)
+        with patch.object(ValidationJobDbService, "claim_chunk", AsyncMock(return_value=None)) as claim_mock:
+            await worker.start()
+            await asyncio.sleep(0.05)
+            await worker.stop()
+
+        assert not worker.running
+        assert claim_mock.await_count >= 2
@@ -0,0 +1,47 @@
+import pytest
+
+from server.iban.services import ValidationPool
+from server.iban.validation import validate_ibans
+
+IBANS = ["ME25505000012345678951", "GB28NWBK60161331926819", "XX", "ME2550500001234567895100"] * 5
+
+
+class TestValidationPool:
+
+    def test_chunks(self):
+        pool = ValidationPool(workers=2, chunk_size=4)
+        assert [len(chunk) for chunk in pool.chunks(IBANS)] == [4, 4, 4, 4, 4]
+        assert [len(chunk) for chunk in pool.chunks(IBANS[:6])] == [3, 3]
+
+    @pytest.mark.asyncio
+    async def test_small_batch_inline(self):
+        pool = ValidationPool(workers=2, threshold=100)
+
+        assert await pool.validate(IBANS, country="ME") == validate_ibans(IBANS, country="ME")
+        assert pool._executor is None
+
+    @pytest.mark.asyncio
+    async def test_large_batch_in_order(self):
+        pool = ValidationPool(workers=2, threshold=10, chunk_size=3)
+        try:
+            assert await pool.validate(IBANS) == validate_ibans(IBANS)
+            assert pool._executor is not None
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        pool = ValidationPool(workers=-1, threshold=1)
+
+        assert await pool.validate(IBANS) == validate_ibans(IBANS)
+        assert pool._executor is None
+
+    @pytest.mark.asyncio
+    async def test_not_normalized_ibans(self):
+        pool = ValidationPool(workers=2, threshold=2, chunk_size=1)
+        ibans = [" ME25505000012345678951", "me25 5050 0001 2345 6789 51", "gb28nwbk60161331926819"]
+        try:
+            assert await pool.validate(ibans) == [(True, None), (True, None), (False, "GB29NWBK60161331926819")]
+            assert validate_ibans(ibans) == await pool.validate(ibans)
+        finally:
+            pool.shutdown()
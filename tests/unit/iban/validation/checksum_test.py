@@ -0,0 +1,43 @@
+import pytest
+
+from server.iban.validation import (calculate_check_digits, iban_remainder,
+                                    is_valid_checksum, mod97)
+
+
+class TestChecksum:
+
+    @pytest.mark.parametrize(
+        "value",
+        ["0", "97", "505000012345678951", "NWBK60161331926819", "0013M02606ME25"]
+    )
+    def test_mod97(self, value):
+        numeric = "".join(str(int(char, 36)) for char in value)
+        assert mod97(value) == int(numeric) % 97
+
+    def test_mod97_continues_remainder(self):
+        assert mod97("60161331926819", mod97("NWBK")) == mod97("NWBK60161331926819")
+
+    @pytest.mark.parametrize(
+        "iban,expected",
+        [
+            ("ME25505000012345678951", True),
+            ("GB29NWBK60161331926819", True),
+            ("FR1420041010050500013M02606", True),
+            ("ME25505000012345638951", False),
+            ("GB29NWBK60161331926818", False),
+        ]
+    )
+    def test_is_valid_checksum(self, iban, expected):
+        assert is_valid_checksum(iban) == expected
+        assert (iban_remainder(iban) == 1) == expected
+
+    @pytest.mark.parametrize(
+        "country_code,bban,expected",
+        [
+            ("ME", "505000012345678951", "25"),
+            ("GB", "NWBK60161331926819", "29"),
+            ("FR", "20041010050500013M02606", "14"),
+        ]
+    )
+    def test_calculate_check_digits(self, country_code, bban, expected):
+        assert calculate_check_digits(country_code, bban) == expected
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from server.iban.validation import IBAN_REGISTRY, suggest_corrections
+from server.iban.validation.correction import (CHECK_DIGITS, FORMAT,
+                                               SUBSTITUTION, TRANSPOSITION,
+                                               _substitutions)
+
+from .registry_test import REGISTRY_EXAMPLES
+
+
+def _substitute(rnd: random.Random, iban: str) -> str:
+    spec = IBAN_REGISTRY[iban[:2]]
+    position = rnd.randrange(4, len(iban))
+    chars = "0123456789" if spec.structure[position] == "n" else "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return iban[:position] + rnd.choice(chars.replace(iban[position], "")) + iban[position + 1:]
+
+
+class TestSuggestCorrections:
+
+    @pytest.mark.parametrize(
+        "iban,expected,kind",
+        [
+            ("ME2550500001234567895100", "ME25505000012345678951", FORMAT),
+            ("GB28NWBK60161331926819", "GB29NWBK60161331926819", CHECK_DIGITS),
+            ("GB29NWBK6O161331926819", "GB29NWBK60161331926819", SUBSTITUTION),
+            ("ME52505000012345678951", "ME25505000012345678951", TRANSPOSITION),
+            ("GB92NWBK60161331926819", "GB29NWBK60161331926819", TRANSPOSITION),
+        ]
+    )
+    def test_best_correction(self, iban, expected, kind):
+        corrections = suggest_corrections(iban, IBAN_REGISTRY[expected[:2]])
+
+        assert corrections[0].iban == expected
+        assert corrections[0].kind == kind
+
+    @pytest.mark.parametrize("iban", ["ME255050wer1234567895100", "ME2550500001", "ME25505000012345?78951"])
+    def test_no_corrections(self, iban):
+        assert suggest_corrections(iban, IBAN_REGISTRY["ME"]) == []
+
+    def test_corrections_are_valid_and_ranked(self):
+        spec = IBAN_REGISTRY["GB"]
+        corrections = suggest_corrections("GB29NWBK60161331962819", spec, limit=3)
+
+        assert len(corrections) == 3
+        assert all(spec.is_valid(correction.iban) for correction in corrections)
+        assert [correction.rank for correction in corrections] == sorted(correction.rank for correction in corrections)
+        assert "GB29NWBK60161331926819" in [correction.iban for correction in corrections]
+
+    def test_substitution_typo_is_found(self):
+        rnd = random.Random(97)
+        for iban in REGISTRY_EXAMPLES:
+            mistyped = _substitute(rnd, iban)
+            if IBAN_REGISTRY[iban[:2]].is_valid(mistyped):
+                continue
+            corrections = suggest_corrections(mistyped, IBAN_REGISTRY[iban[:2]], limit=100)
+            assert iban in [correction.iban for correction in corrections], mistyped
+
+    def test_transposition_typo_is_found(self):
+        for iban in REGISTRY_EXAMPLES:
+            position = next(i for i in range(4, len(iban) - 1) if iban[i] != iban[i + 1])
+            mistyped = iban[:position] + iban[position + 1] + iban[position] + iban[position + 2:]
+            if IBAN_REGISTRY[iban[:2]].is_valid(mistyped):
+                continue
+            corrections = suggest_corrections(mistyped, IBAN_REGISTRY[iban[:2]], limit=100)
+            assert iban in [correction.iban for correction in corrections], mistyped
+
+    def test_check_digit_and_bban_transposition_is_generated_once(self):
+        candidates = _substitutions("GB2N9WBK60161331926819", IBAN_REGISTRY["GB"])
+
+        assert [(candidate.kind, candidate.position) for candidate in candidates].count((TRANSPOSITION, 3)) == 1
+        assert suggest_corrections("GB2N9WBK60161331926819", IBAN_REGISTRY["GB"])[0].iban == "GB29NWBK60161331926819"
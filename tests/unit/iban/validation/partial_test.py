@@ -0,0 +1,37 @@
+import pytest
+
+from server.iban.validation import PartialCheck, check_partial_iban
+
+from .registry_test import REGISTRY_EXAMPLES
+
+
+class TestCheckPartialIban:
+
+    @pytest.mark.parametrize(
+        "iban,country,expected",
+        [
+            ("", None, PartialCheck(True, None, None, "letter")),
+            ("m", None, PartialCheck(True, None, None, "letter")),
+            ("W", None, PartialCheck(False)),
+            ("", "me", PartialCheck(True, "ME", 22, "letter")),
+            ("G", "ME", PartialCheck(False)),
+            ("GB29 NWBK 60", None, PartialCheck(True, "GB", 12, "digit")),
+            ("GB29 NW", None, PartialCheck(True, "GB", 16, "letter")),
+            ("GB29 NW1K 60", None, PartialCheck(False, "GB")),
+            ("GB29 NWBK 60", "ME", PartialCheck(False)),
+            ("ME00", None, PartialCheck(False, "ME")),
+            ("ME25505000012345678951", None, PartialCheck(True, "ME", 0)),
+            ("ME25505000012345678952", None, PartialCheck(False, "ME", 0)),
+            ("ME255050000123456789510", None, PartialCheck(False, "ME")),
+        ]
+    )
+    def test_check(self, iban, country, expected):
+        assert check_partial_iban(iban, country) == expected
+
+    @pytest.mark.parametrize("iban", REGISTRY_EXAMPLES)
+    def test_every_prefix_of_valid_iban(self, iban):
+        for length in range(len(iban) + 1):
+            result = check_partial_iban(iban[:length])
+            assert result.is_valid
+            if length >= 2:
+                assert result.remaining_length == len(iban) - length
@@ -0,0 +1,118 @@
+import subprocess
+import sys
+
+import pytest
+
+from server.iban.validation import (IBAN_REGISTRY, CountryRegistry,
+                                    get_country_spec, is_valid_iban)
+from server.iban.validation.registry import BBAN_FORMATS
+
+# examples of the SWIFT iban registry
+REGISTRY_EXAMPLES = [
+    "AD1200012030200359100100", "AE070331234567890123456", "AL47212110090000000235698741",
+    "AT611904300234573201", "AZ21NABZ00000000137010001944", "BA391290079401028494",
+    "BE68539007547034", "BG80BNBG96611020345678", "BH67BMAG00001299123456",
+    "BI4210000100010000332045181", "BR1800360305000010009795493C1", "BY13NBRB3600900000002Z00AB00",
+    "CH9300762011623852957", "CR05015202001026284066", "CY17002001280000001200527600",
+    "CZ6508000000192000145399", "DE89370400440532013000", "DJ2100010000000154000100186",
+    "DK5000400440116243", "DO28BAGR00000001212453611324", "EE382200221020145685",
+    "EG380019000500000000263180002", "ES9121000418450200051332", "FI2112345600000785",
+    "FK88SC123456789012", "FO6264600001631634", "FR1420041010050500013M02606",
+    "GB29NWBK60161331926819", "GE29NB0000000101904917", "GI75NWBK000000007099453",
+    "GL8964710001000206", "GR1601101250000000012300695", "GT82TRAJ01020000001210029690",
+    "HR1210010051863000160", "HU42117730161111101800000000", "IE29AIBK93115212345678",
+    "IL620108000000099999999", "IQ98NBIQ850123456789012", "IS140159260076545510730339",
+    "IT60X0542811101000000123456", "JO94CBJO0010000000000131000302", "KW81CBKU0000000000001234560101",
+    "KZ86125KZT5004100100", "LB62099900000001001901229114", "LC55HEMM000100010012001200023015",
+    "LI21088100002324013AA", "LT121000011101001000", "LU280019400644750000",
+    "LV80BANK0000435195001", "LY83002048000020100120361", "MC5811222000010123456789030",
+    "MD24AG000225100013104168", "ME25505000012345678951", "MK07250120000058984",
+    "MN121234123456789123", "MR1300020001010000123456753", "MT84MALT011000012345MTLCAST001S",
+    "MU17BOMM0101101030300200000MUR", "NI45BAPR00000013000003558124", "NL91ABNA0417164300",
+    "NO9386011117947", "OM810180000001299123456", "PK36SCBL0000001123456702",
+    "PL61109010140000071219812874", "PS92PALS000000000400123456702", "PT50000201231234567890154",
+    "QA58DOHB00001234567890ABCDEFG", "RO49AAAA1B31007593840000", "RS35260005601001611379",
+    "RU0304452522540817810538091310419", "SA0380000000608010167519", "SC18SSCB11010000000000001497USD",
+    "SD2129010501234001", "SE4550000000058398257466", "SI56263300012039086",
+    "SK3112000000198742637541", "SM86U0322509800000000270100", "SO211000001001000100141",
+    "ST68000100010051845310112", "SV62CENR00000000000000700025", "TL380080012345678910157",
+    "TN5910006035183598478831", "TR330006100519786457841326", "UA213223130000026007233566001",
+    "VA59001123000012345678", "VG96VPVG0000012345678901", "XK051212012345678906",
+]
+
+
+class TestRegistry:
+
+    def test_registry_covers_examples(self):
+        assert {iban[:2] for iban in REGISTRY_EXAMPLES} == set(IBAN_REGISTRY)
+
+    @pytest.mark.parametrize("iban", REGISTRY_EXAMPLES)
+    def test_registry_examples_are_valid(self, iban):
+        spec = get_country_spec(iban[:2])
+        assert spec.length == len(iban)
+        assert is_valid_iban(iban)
+        assert is_valid_iban(iban.lower(), country=iban[:2].lower())
+
+    @pytest.mark.parametrize(
+        "iban,country",
+        [
+            ("ME25505000012345678951", "RS"),
+            ("GB29NWBK6016133192681", None),
+            ("GB29NWBK601613319268190", None),
+            ("GB29NWB160161331926819", None),
+            ("XX29NWBK60161331926819", None),
+        ]
+    )
+    def test_not_valid(self, iban, country):
+        assert not is_valid_iban(iban, country=country)
+
+    @pytest.mark.parametrize(
+        "iban",
+        [
+            # checksum is fine but national check digits are broken
+            "BE41539007547035",
+            "ES2121000418450200051331",
+            "FR0630006000011234567890188",
+            "IT40S0542811101000000123456",
+            "NO6686011117948",
+        ]
+    )
+    def test_national_check_digits(self, iban):
+        spec = get_country_spec(iban[:2])
+        assert spec.matches(iban)
+        assert not is_valid_iban(iban)
+
+
+class TestCountryRegistry:
+
+    def test_spec_is_compiled_on_lookup(self):
+        registry = CountryRegistry(BBAN_FORMATS)
+
+        assert "GB" in registry and "XX" not in registry
+        assert len(registry) == len(BBAN_FORMATS)
+        assert registry.compiled == 0
+
+        spec = registry["GB"]
+        assert registry.get("GB") is spec
+        assert registry.get("XX") is None
+        assert registry.compiled == 1
+
+        with pytest.raises(KeyError):
+            registry["XX"]
+
+    def test_preload(self):
+        registry = CountryRegistry(BBAN_FORMATS)
+        registry.preload()
+
+        assert registry.compiled == len(BBAN_FORMATS)
+
+    def test_import_without_app_dependencies(self):
+        code = (
+            "import sys\n"
+            "from server.iban.validation import IBAN_REGISTRY, validate_iban\n"
+            "assert validate_iban('GB28NWBK60161331926819') == (False, 'GB29NWBK60161331926819')\n"
+            "assert IBAN_REGISTRY.compiled == 1, IBAN_REGISTRY.compiled\n"
+            "heavy = {'sqlalchemy', 'fastapi', 'pydantic', 'asyncpg', 'numpy'} & set(sys.modules)\n"
+            "assert not heavy, heavy\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
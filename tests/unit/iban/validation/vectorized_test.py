@@ -0,0 +1,74 @@
+import pytest
+
+from server.iban.validation import CheckCode, calculate_check_digits, check_iban
+
+from .registry_test import REGISTRY_EXAMPLES
+
+np = pytest.importorskip("numpy")
+hypothesis = pytest.importorskip("hypothesis")
+st = pytest.importorskip("hypothesis.strategies")
+
+from server.iban.validation.vectorized import check_ibans, is_valid_ibans  # noqa: E402
+
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz -_#"
+
+
+def mutate(iban: str, position: int, char: str) -> str:
+    position %= len(iban)
+    return iban[:position] + char + iban[position + 1:]
+
+
+def mutate_bban(iban: str, position: int, char: str) -> str:
+    """Typo in BBAN with recalculated check digits, so only national check can fail"""
+    bban = mutate(iban[4:], position, char)
+    return iban[:2] + calculate_check_digits(iban[:2], bban) + bban
+
+
+ibans = st.one_of(
+    st.text(alphabet=ALPHABET, max_size=40),
+    st.sampled_from(REGISTRY_EXAMPLES),
+    st.builds(mutate, st.sampled_from(REGISTRY_EXAMPLES), st.integers(0, 40), st.sampled_from(ALPHABET)),
+    st.builds(mutate_bban, st.sampled_from(REGISTRY_EXAMPLES), st.integers(0, 40), st.sampled_from("0123456789")),
+    st.builds(lambda iban, cut: iban[:cut], st.sampled_from(REGISTRY_EXAMPLES), st.integers(0, 40)),
+    st.builds(lambda iban: " ".join(iban[i:i + 4] for i in range(0, len(iban), 4)).lower(),
+              st.sampled_from(REGISTRY_EXAMPLES)),
+)
+
+
+class TestVectorizedCheck:
+
+    def test_registry_examples(self):
+        assert is_valid_ibans(REGISTRY_EXAMPLES).all()
+
+    @pytest.mark.parametrize(
+        "iban,expected",
+        [
+            ("ME25 5050 0001 2345 6789 51", CheckCode.VALID),
+            ("XX25505000012345678951", CheckCode.UNKNOWN_COUNTRY),
+            ("ME2550500001234567895", CheckCode.INVALID_LENGTH),
+            ("ME25505000012345678A51", CheckCode.INVALID_STRUCTURE),
+            ("ME26505000012345678951", CheckCode.INVALID_CHECKSUM),
+            ("ME95505000012345678952", CheckCode.INVALID_NATIONAL_CHECK),
+            ("BE41539007547035", CheckCode.INVALID_NATIONAL_CHECK),
+        ]
+    )
+    def test_codes(self, iban, expected):
+        assert check_iban(iban) == expected
+        assert check_ibans([iban]).tolist() == [expected]
+
+    def test_fixed_width_buffer(self):
+        buffer = b"".join(iban.encode().ljust(34, b"\0") for iban in REGISTRY_EXAMPLES[:5])
+        assert is_valid_ibans(buffer, width=34).all()
+
+    def test_country(self):
+        codes = check_ibans(["ME25505000012345678951", "GB29NWBK60161331926819"], country="me")
+        assert codes.tolist() == [CheckCode.VALID, CheckCode.COUNTRY_MISMATCH]
+
+    def test_empty(self):
+        assert check_ibans([]).tolist() == []
+
+    @hypothesis.settings(max_examples=300, deadline=None)
+    @hypothesis.given(st.lists(ibans, min_size=1, max_size=50), st.sampled_from([None, "ME", "GB", "XX"]))
+    def test_equivalent_to_scalar(self, ibans, country):
+        expected = [check_iban(iban, country=country) for iban in ibans]
+        assert check_ibans(np.array(ibans), country=country).tolist() == expected
@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from server.internal import api
+from server.internal.api import require_internal_token
+
+
+class TestRequireInternalToken:
+
+    @pytest.mark.asyncio
+    async def test_valid_token(self):
+        with patch.object(api.settings, "INTERNAL_TOKEN", "secret"):
+            assert await require_internal_token("secret") is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "configured,token",
+        [
+            ("secret", "wrong"),
+            ("secret", None),
+            ("secret", "sécret"),
+            (None, None),
+            (None, ""),
+        ]
+    )
+    async def test_forbidden(self, configured, token):
+        with patch.object(api.settings, "INTERNAL_TOKEN", configured):
+            with pytest.raises(HTTPException) as error:
+                await require_internal_token(token)
+
+        assert error.value.status_code == 403
+
+    @pytest.mark.parametrize("path", ["/internal/stats", "/internal/banks/reload"])
+    def test_routes_require_token(self, path):
+        route = next(route for route in api.router.routes if route.path == path)
+
+        assert [dependency.call for dependency in route.dependant.dependencies] == [require_internal_token]
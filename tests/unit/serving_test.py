@@ -0,0 +1,78 @@
+import gc
+from unittest.mock import patch
+
+import pytest
+
+from server import serving
+from server.core.settings import SettingsPostgres, SettingsServer
+from server.iban.services import bank_directory
+from server.iban.validation import IBAN_REGISTRY
+from server.iban.validation.partial import _FILLERS
+
+
+def postgres_settings(**values) -> SettingsPostgres:
+    return SettingsPostgres(
+        POSTGRES_HOST="db", POSTGRES_USER="user", POSTGRES_PASSWORD="password", POSTGRES_DB="db", **values
+    )
+
+
+class TestServing:
+
+    @pytest.mark.parametrize(
+        "values,workers,expected",
+        [
+            ({"POOL_SIZE": 5, "POOL_MAX_OVERFLOW": 10}, 4, (5, 10)),
+            ({"POOL_SIZE": 5, "POOL_MAX_OVERFLOW": 10, "POOL_BUDGET": 60}, 4, (5, 10)),
+            ({"POOL_SIZE": 5, "POOL_MAX_OVERFLOW": 10, "POOL_BUDGET": 100}, 8, (4, 8)),
+            ({"POOL_SIZE": 5, "POOL_MAX_OVERFLOW": 10, "POOL_BUDGET": 16}, 16, (1, 0)),
+            ({"POOL_SIZE": 5, "POOL_MAX_OVERFLOW": 10, "POOL_BUDGET": 40, "HISTORY_DRIVER": "asyncpg"}, 2, (5, 10)),
+        ]
+    )
+    def test_worker_pool_size(self, values, workers, expected):
+        size, max_overflow = serving.worker_pool_size(postgres_settings(**values), workers)
+
+        assert (size, max_overflow) == expected
+
+    def test_worker_pool_size_fits_budget(self):
+        for workers in range(1, 33):
+            size, max_overflow = serving.worker_pool_size(postgres_settings(POOL_BUDGET=100), workers)
+            assert size >= 1
+            assert (size + max_overflow) * workers <= 100
+
+    @pytest.mark.parametrize(
+        "values,workers",
+        [
+            ({"POOL_BUDGET": 4}, 16),
+            ({"POOL_BUDGET": 16, "HISTORY_DRIVER": "asyncpg"}, 16),
+        ]
+    )
+    def test_worker_pool_size_over_budget(self, values, workers):
+        with pytest.raises(ValueError):
+            serving.worker_pool_size(postgres_settings(**values), workers)
+
+    def test_worker_environ(self):
+        with patch.object(serving, "SettingsPostgres", lambda: postgres_settings(POOL_BUDGET=30)), \
+                patch.object(serving, "available_cores", lambda: 8):
+            environ = serving.worker_environ(workers=3)
+
+        assert environ == {"POOL_SIZE": "3", "POOL_MAX_OVERFLOW": "7", "VALIDATION_POOL_WORKERS": "2"}
+
+    def test_gunicorn_options(self):
+        with patch.object(serving, "available_cores", lambda: 4):
+            options = serving.gunicorn_options(SettingsServer(WEB_WORKERS=0, APP_PORT=9000, WEB_MAX_REQUESTS=500))
+
+        assert options["bind"] == "0.0.0.0:9000"
+        assert options["workers"] == 4
+        assert options["preload_app"] is True
+        assert options["max_requests"] == 500
+        assert options["worker_class"] == "server.workers.ProductionWorker"
+
+    def test_preload(self):
+        try:
+            serving.preload()
+        finally:
+            gc.unfreeze()
+
+        assert IBAN_REGISTRY.compiled == len(IBAN_REGISTRY)
+        assert set(_FILLERS) == set(IBAN_REGISTRY)
+        assert bank_directory.stats()["loaded"]